@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Response Post-Processing Benchmark
+Times the compiled ResponsePostProcessor against the legacy per-call re.sub chain on GPT-OSS style rambles
+"""
+import os
+import re
+import sys
+import time
+import random
+import logging
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from response_processor import ResponsePostProcessor
+
+PLANNING_SENTENCES = [
+    "We need to produce a memo on pregnancy accommodation.",
+    "Let me think about which statutes apply here.",
+    "I'll draft the analysis section after the facts.",
+    "The user wants citations from the database, so let me create a list.",
+    "First, let me check whether the PDA or the ADA controls.",
+    "<|start|>assistant<|channel|>analysis",
+]
+
+MEMO_SENTENCES = [
+    "The Pregnancy Discrimination Act amended Title VII, 42 U.S.C. § 2000e(k).",
+    "Young v. United Parcel Service, 575 U.S. 206 (2015), addressed light duty.",
+    "Under 29 U.S.C. § 2612 an eligible employee may take 12 weeks of FMLA leave.",
+    "The employer must engage in the interactive process in good faith.",
+]
+
+def legacy_extract(processor: ResponsePostProcessor, response: str) -> str:
+    """The original extract_final_content (uncompiled patterns, one re.sub each)"""
+    cleaned_response = response
+    for pattern in [r'<\|end\|>', r'<\|im_end\|>', r'<\|im_start\|>', r'<\|endoftext\|>', r'<\|eot\|>', r'<\|eos\|>']:
+        cleaned_response = re.sub(pattern, '', cleaned_response, flags=re.IGNORECASE)
+    cleaned_response = re.sub(r'[^\x00-\x7F]+', '', cleaned_response)
+    for pattern in processor.planning_patterns:
+        cleaned_response = re.sub(pattern, '', cleaned_response, flags=re.IGNORECASE | re.DOTALL)
+
+    memo_start = -1
+    for indicator in processor.memo_indicators:
+        match = re.search(indicator, cleaned_response, re.IGNORECASE | re.DOTALL)
+        if match:
+            memo_start = match.start()
+            break
+    if memo_start == -1:
+        for indicator in processor.legal_indicators:
+            match = re.search(indicator, cleaned_response, re.IGNORECASE)
+            if match:
+                memo_start = max(0, match.start() - 100)
+                break
+    if memo_start >= 0:
+        cleaned_response = cleaned_response[memo_start:]
+
+    cleaned_response = re.sub(r'\n{3,}', '\n\n', cleaned_response)
+    cleaned_response = re.sub(r'^\s+', '', cleaned_response)
+    return cleaned_response.strip()
+
+def build_ramble(words: int, profile: str = "ramble", seed: int = 42) -> str:
+    """Synthetic response of roughly ``words`` words.
+
+    ``ramble`` is a planning monologue that never reaches a paragraph break,
+    the worst case for lazy ``.*?`` patterns; ``memo`` is a short plan
+    followed by a structured memo with ordinary paragraph breaks.
+    """
+    rng = random.Random(seed)
+    parts = []
+    count = 0
+    if profile == "memo":
+        parts.append("We need to write the memo. Let me think.\n\nTo: Partner\nFrom: Associate\nDate: today\nSubject: PDA\n\n")
+    while count < words:
+        sentence = rng.choice(MEMO_SENTENCES if profile == "memo" else PLANNING_SENTENCES)
+        parts.append(sentence + ("\n\n" if profile == "memo" and rng.random() < 0.2 else " "))
+        count += len(sentence.split())
+    return "".join(parts)
+
+def time_call(func, *args, repeats: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response post-processing")
+    parser.add_argument('--words', default="1000,10000", help="Comma-separated response sizes in words")
+    parser.add_argument('--profiles', default="memo,ramble", help="Comma-separated response profiles")
+    parser.add_argument('--skip-legacy', action='store_true', help="Only time the compiled engine")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    processor = ResponsePostProcessor()
+
+    print("🧹 Response Post-Processing Benchmark")
+    print("=" * 60)
+    print("| Profile | Words | Compiled | Legacy | Same output |")
+    print("|---------|-------|----------|--------|-------------|")
+
+    for profile in args.profiles.split(','):
+        for words in [int(w) for w in args.words.split(',')]:
+            response = build_ramble(words, profile)
+            engine_time = time_call(processor.extract_final_content, response)
+            if args.skip_legacy:
+                legacy, same = "skipped", "-"
+            else:
+                legacy = f"{time_call(legacy_extract, processor, response, repeats=1) * 1000:.1f}ms"
+                same = "yes" if legacy_extract(processor, response) == processor.extract_final_content(response) else "NO"
+            print(f"| {profile} | {words} | {engine_time * 1000:.1f}ms | {legacy} | {same} |")
+
+if __name__ == "__main__":
+    main()
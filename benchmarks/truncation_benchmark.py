@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Context Truncation Benchmark
+Times the relevance-ranked ContextTruncator against the legacy two-pass truncation on 1MB+ contexts
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from prompts.truncation import ContextTruncator, PRIORITY_KEYWORDS
+
+QUESTION = ("Analyze the legal requirements for reasonable accommodations for pregnant employees "
+            "under FMLA. Cite specific cases and regulations from the database.")
+
+SENTENCES = [
+    "The Pregnancy Discrimination Act amended Title VII, 42 U.S.C. § 2000e(k), to cover pregnancy.",
+    "Under 29 U.S.C. § 2612 an eligible employee may take 12 weeks of FMLA leave.",
+    "Young v. United Parcel Service, 575 U.S. 206 (2015), addressed light duty accommodation.",
+    "The New York State Human Rights Law requires reasonable accommodation of pregnancy-related conditions.",
+    "Plaintiff sought back pay, compensatory damages and injunctive relief.",
+    "The court reviewed the employer's handbook and the deposition transcripts.",
+    "Counsel filed the motion on the twelfth day following service of the complaint.",
+    "The record contains the parties' correspondence regarding scheduling.",
+]
+
+def legacy_truncate(context: str, max_tokens: int = 2000) -> str:
+    """The original PromptTemplates.truncate_context (two passes, list membership check)"""
+    if len(context) // 4 <= max_tokens:
+        return context
+
+    lines = context.split('\n')
+    truncated_lines = []
+    current_tokens = 0
+
+    for line in lines:
+        line_tokens = len(line) // 4
+        if any(keyword.lower() in line.lower() for keyword in PRIORITY_KEYWORDS):
+            if current_tokens + line_tokens <= max_tokens:
+                truncated_lines.append(line)
+                current_tokens += line_tokens
+
+    for line in lines:
+        if line not in truncated_lines:
+            line_tokens = len(line) // 4
+            if current_tokens + line_tokens <= max_tokens:
+                truncated_lines.append(line)
+                current_tokens += line_tokens
+            else:
+                break
+
+    return '\n'.join(truncated_lines)
+
+CITATIONS = [
+    "42 U.S.C. § 2000e(k)", "29 U.S.C. § 2612", "29 C.F.R. § 825.120", "N.Y. Exec. Law § 296",
+    "575 U.S. 206 (2015)", "499 U.S. 187 (1991)", "Id. at 210.", "See id.", "Cf. FMLA § 102."
+]
+
+def build_context(size_bytes: int, profile: str = "prose", seed: int = 42) -> str:
+    """Synthetic legal context of roughly size_bytes.
+
+    ``prose`` has one to three sentences per line; ``citations`` is a
+    citation-dense table of authorities with many short lines, which is the
+    worst case for the legacy membership check.
+    """
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    while total < size_bytes:
+        if profile == "citations":
+            line = rng.choice(CITATIONS)
+        else:
+            line = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 3)))
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)
+
+def time_call(func, *args, repeats: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark context truncation")
+    parser.add_argument('--sizes-mb', default="1,4,16", help="Comma-separated context sizes in MB")
+    parser.add_argument('--max-tokens', type=int, default=2000)
+    parser.add_argument('--profiles', default="prose,citations", help="Comma-separated context profiles")
+    parser.add_argument('--skip-legacy', action='store_true', help="Only time the new engine")
+    args = parser.parse_args()
+
+    truncator = ContextTruncator()
+
+    print("📏 Context Truncation Benchmark")
+    print("=" * 60)
+    print("| Profile | Size | Lines | Engine | Legacy | Engine tokens kept |")
+    print("|---------|------|-------|--------|--------|--------------------|")
+
+    for profile in args.profiles.split(','):
+        for size_mb in [float(s) for s in args.sizes_mb.split(',')]:
+            context = build_context(int(size_mb * 1024 * 1024), profile)
+            engine_time = time_call(truncator.truncate, context, args.max_tokens, QUESTION)
+            kept = truncator.truncate(context, args.max_tokens, QUESTION)
+            legacy = "skipped" if args.skip_legacy else \
+                f"{time_call(legacy_truncate, context, args.max_tokens, repeats=1) * 1000:.0f}ms"
+            print(f"| {profile} | {size_mb:g}MB | {context.count(chr(10)) + 1} | {engine_time * 1000:.0f}ms | "
+                  f"{legacy} | {len(kept) // 4} |")
+
+if __name__ == "__main__":
+    main()
@@ -36,6 +36,13 @@ class Config:
     OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT", "120"))
     OLLAMA_ENABLE_METAL = os.getenv("OLLAMA_ENABLE_METAL", "true").lower() == "true"
     
+    # Async client connection pool (comma-separated hosts for multi-host runs)
+    OLLAMA_HOSTS = [h.strip() for h in os.getenv("OLLAMA_HOSTS", OLLAMA_BASE_URL).split(",") if h.strip()]
+    OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "100"))
+    OLLAMA_PER_HOST_LIMIT = int(os.getenv("OLLAMA_PER_HOST_LIMIT", "16"))
+    OLLAMA_KEEPALIVE_TIMEOUT = int(os.getenv("OLLAMA_KEEPALIVE_TIMEOUT", "60"))
+    OLLAMA_CONNECT_TIMEOUT = int(os.getenv("OLLAMA_CONNECT_TIMEOUT", "10"))
+    
     # Legacy support
     GPU_ENABLED = True
     AUTO_LOAD_MODEL = True
@@ -57,6 +64,15 @@ class Config:
     ENABLE_COREML_ACCELERATION = os.getenv("ENABLE_COREML_ACCELERATION", "true").lower() == "true"
     THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "4"))
     MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "2"))
+    ASYNC_MAX_IN_FLIGHT = int(os.getenv("ASYNC_MAX_IN_FLIGHT", "64"))
+    
+    # Approximate resident size per benchmark model (GB) for model-affinity scheduling
+    MODEL_MEMORY_FOOTPRINTS_GB = {
+        "llama3.1:8b": 4.9,
+        "gpt-oss:20b-q6": 13.0,
+        "qwen2.5:14b": 9.0
+    }
+    MODEL_MEMORY_BUDGET_GB = float(os.getenv("MODEL_MEMORY_BUDGET_GB", "16"))
     
     # ========================================
     # LEGAL RESEARCH CONFIGURATION
@@ -122,11 +138,88 @@ Structure responses as professional memos with To/From/Date/Subject, Introductio
     
     # Processing flags
     PARALLEL_THREADS = int(os.getenv("PARALLEL_THREADS", "4"))
-    PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "2000"))
+    PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "2000"))  # real model tokens when a tokenizer is present
     MIN_TEMP_GPT = float(os.getenv("MIN_TEMP_GPT", "0.7"))
     MAX_TEMP_LLAMA = float(os.getenv("MAX_TEMP_LLAMA", "0.7"))
     RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "2"))
     
+    # Abort and re-issue a stream whose first tokens are planning (restarts count against RETRY_ATTEMPTS)
+    ENABLE_PLANNING_GUARD = os.getenv("ENABLE_PLANNING_GUARD", "true").lower() == "true"
+    PLANNING_GUARD_TOKENS = int(os.getenv("PLANNING_GUARD_TOKENS", "64"))
+    BENCHMARK_SEED = int(os.getenv("BENCHMARK_SEED", "42"))
+    
+    # Local tokenizer files (tokenizer.json, relative to TOKENIZER_DIR) per benchmark model
+    TOKENIZER_DIR = Path(os.getenv("TOKENIZER_DIR", "tokenizers"))
+    MODEL_TOKENIZERS = {
+        "llama3.1:8b": "llama3.1-8b/tokenizer.json",
+        "gpt-oss:20b-q6": "gpt-oss-20b/tokenizer.json",
+        "qwen2.5:14b": "qwen2.5-14b/tokenizer.json"
+    }
+    TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "200000"))
+    
+    # Content-addressed response cache (replay runs re-score without regenerating)
+    ENABLE_RESPONSE_CACHE = os.getenv("ENABLE_RESPONSE_CACHE", "true").lower() == "true"
+    RESPONSE_CACHE_DIR = Path(os.getenv("RESPONSE_CACHE_DIR", str(CACHE_DIR / "responses")))
+    RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", "512"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "20000"))
+    
+    # Crash-safe per-run journals of completed tasks (resume with --resume <run_id>)
+    RUN_JOURNAL_DIR = Path(os.getenv("RUN_JOURNAL_DIR", str(OUTPUTS_DIR / "journals")))
+    
+    # Incremental runs: reuse journaled results whose task fingerprint is unchanged (--incremental)
+    ENABLE_INCREMENTAL_RUNS = os.getenv("ENABLE_INCREMENTAL_RUNS", "false").lower() == "true"
+    # Fingerprint tasks of non-incremental runs too, so a later --incremental run can reuse them
+    RECORD_TASK_FINGERPRINTS = os.getenv("RECORD_TASK_FINGERPRINTS", "false").lower() == "true"
+    
+    # Latency reporting: percentiles and fixed histogram bucket upper bounds (seconds)
+    LATENCY_PERCENTILES = [50, 90, 95, 99]
+    LATENCY_HISTOGRAM_BOUNDS = [float(b) for b in os.getenv(
+        "LATENCY_HISTOGRAM_BOUNDS", "0.1,0.25,0.5,1,2,5,10,20,30,60,120,300").split(",")]
+    
+    # Open-loop load testing (src/load_generator.py): arrival rates (req/s), seconds per rate, saturation thresholds
+    LOAD_TEST_RATES = [float(r) for r in os.getenv("LOAD_TEST_RATES", "0.02,0.05,0.1,0.2,0.5").split(",")]
+    LOAD_TEST_DURATION = float(os.getenv("LOAD_TEST_DURATION", "300"))
+    LOAD_TEST_KNEE_LATENCY_FACTOR = float(os.getenv("LOAD_TEST_KNEE_LATENCY_FACTOR", "2.0"))
+    LOAD_TEST_MAX_ERROR_RATE = float(os.getenv("LOAD_TEST_MAX_ERROR_RATE", "0.01"))
+    LOAD_TEST_MAX_CONNECTIONS = int(os.getenv("LOAD_TEST_MAX_CONNECTIONS", "256"))
+    
+    # Per-task stage spans, exported as a Chrome trace-event file per run
+    ENABLE_TRACING = os.getenv("ENABLE_TRACING", "true").lower() == "true"
+    
+    # Concurrency sweep (benchmarking.py --sweep-concurrency) and the tuned per-model profile it writes
+    CONCURRENCY_SWEEP_LEVELS = [int(c) for c in os.getenv("CONCURRENCY_SWEEP_LEVELS", "1,2,4,8,16").split(",")]
+    CONCURRENCY_SWEEP_TASKS = int(os.getenv("CONCURRENCY_SWEEP_TASKS", "32"))
+    CONCURRENCY_SWEEP_MAX_P95_FACTOR = float(os.getenv("CONCURRENCY_SWEEP_MAX_P95_FACTOR", "2.0"))
+    TUNED_PROFILE_PATH = Path(os.getenv("TUNED_PROFILE_PATH", str(OUTPUTS_DIR / "tuned_profile.json")))
+    USE_TUNED_PROFILE = os.getenv("USE_TUNED_PROFILE", "true").lower() == "true"
+    
+    # Adaptive (AIMD) in-flight limit for threaded runs; starts from the tuned or static concurrency
+    ENABLE_ADAPTIVE_CONCURRENCY = os.getenv("ENABLE_ADAPTIVE_CONCURRENCY", "true").lower() == "true"
+    ADAPTIVE_MIN_CONCURRENCY = int(os.getenv("ADAPTIVE_MIN_CONCURRENCY", "1"))
+    ADAPTIVE_MAX_CONCURRENCY = int(os.getenv("ADAPTIVE_MAX_CONCURRENCY", "16"))
+    ADAPTIVE_LATENCY_TOLERANCE = float(os.getenv("ADAPTIVE_LATENCY_TOLERANCE", "2.0"))
+    ADAPTIVE_BACKOFF = float(os.getenv("ADAPTIVE_BACKOFF", "0.75"))
+    ADAPTIVE_MAX_ERROR_RATE = float(os.getenv("ADAPTIVE_MAX_ERROR_RATE", "0.05"))
+    ADAPTIVE_MIN_WINDOW = int(os.getenv("ADAPTIVE_MIN_WINDOW", "4"))
+    
+    # Runtime memory admission for threaded runs: defer dispatch that would leave less than the
+    # reserve available or while the system swaps out (footprints from Ollama /api/show)
+    ENABLE_MEMORY_ADMISSION = os.getenv("ENABLE_MEMORY_ADMISSION", "true").lower() == "true"
+    ADMISSION_RESERVE_GB = float(os.getenv("ADMISSION_RESERVE_GB", "1.5"))
+    ADMISSION_MAX_SWAP_OUT_MB_S = float(os.getenv("ADMISSION_MAX_SWAP_OUT_MB_S", "4"))
+    ADMISSION_CONTEXT_TOKENS = int(os.getenv("ADMISSION_CONTEXT_TOKENS", "4096"))
+    ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "60"))
+    ADMISSION_POLL_INTERVAL = float(os.getenv("ADMISSION_POLL_INTERVAL", "0.5"))
+    
+    # Background resource timeline per run (CPU, Ollama RSS, memory, swap, disk I/O)
+    ENABLE_RESOURCE_SAMPLING = os.getenv("ENABLE_RESOURCE_SAMPLING", "true").lower() == "true"
+    RESOURCE_SAMPLE_INTERVAL = float(os.getenv("RESOURCE_SAMPLE_INTERVAL", "1.0"))
+    OLLAMA_PROCESS_NAME = os.getenv("OLLAMA_PROCESS_NAME", "ollama")
+    
+    # Cross-run benchmark history (SQLite; query with src/benchmark_database.py)
+    ENABLE_BENCHMARK_DB = os.getenv("ENABLE_BENCHMARK_DB", "true").lower() == "true"
+    BENCHMARK_DB_PATH = Path(os.getenv("BENCHMARK_DB_PATH", str(DATABASE_DIR / "benchmark_history.sqlite")))
+    
     # Metric weights for evaluation
     METRIC_WEIGHTS = {
         'completeness': 0.25,
@@ -211,6 +304,7 @@ Structure responses as professional memos with To/From/Date/Subject, Introductio
     def get_system_info(cls) -> Dict[str, Any]:
         """Get current system information"""
         mem = psutil.virtual_memory()
+        swap = psutil.swap_memory()
         
         return {
             'memory': {
@@ -218,6 +312,14 @@ Structure responses as professional memos with To/From/Date/Subject, Introductio
                 'available_gb': mem.available / (1024**3),
                 'used_percent': mem.percent,
             },
+            'swap': {
+                'total_gb': swap.total / (1024**3),
+                'used_gb': swap.used / (1024**3),
+            },
+            'cpu': {
+                'logical_cores': psutil.cpu_count(),
+                'physical_cores': psutil.cpu_count(logical=False),
+            },
             'config': {
                 'metal_acceleration': cls.ENABLE_METAL_ACCELERATION,
                 'thread_pool_size': cls.THREAD_POOL_SIZE,
@@ -10,8 +10,10 @@ import torch
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
 
 from config import Config
+from chat_payload import build_chat_payload
 
 # Set up logging
 logging.basicConfig(
@@ -45,23 +47,7 @@ class OllamaClient:
     def generate_response(self, model: str, prompt: str, system_prompt: str = "", stream: bool = False, temperature: float = 0.7):
         """Generate response from Ollama using chat API"""
         try:
-            # Build messages array
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
-            
-            payload = {
-                "model": model,
-                "messages": messages,
-                "stream": stream,
-                "options": {
-                    "temperature": temperature,
-                    "top_p": 0.9,
-                    "num_predict": 2048,
-                    "seed": self.seed
-                }
-            }
+            payload = build_chat_payload(model, prompt, system_prompt, temperature, self.seed, stream)
             
             logger.info(f"Generating response with model: {model}, temperature: {temperature}, stream: {stream}")
             
@@ -102,6 +88,51 @@ class OllamaClient:
             logger.error(f"Unexpected error in generate_response: {e}")
             return "Sorry, an unexpected error occurred while processing your request."
 
+    def stream_chat(self, model: str, prompt: str, system_prompt: str = "", temperature: float = 0.7):
+        """Stream raw /api/chat chunks, including Ollama's final timing fields.
+        
+        Unlike generate_response, request errors are raised so callers (e.g. the
+        benchmark runner) can record them instead of scoring an apology string.
+        """
+        # Same builder as the response cache key, so a cached entry matches what was sent
+        payload = build_chat_payload(model, prompt, system_prompt, temperature, self.seed, stream=True)
+        
+        response = self.session.post(
+            f"{self.base_url}/api/chat",
+            json=payload,
+            timeout=self.timeout,
+            stream=True
+        )
+        response.raise_for_status()
+        
+        try:
+            for line in response.iter_lines():
+                if line:
+                    try:
+                        chunk = json.loads(line.decode('utf-8'))
+                    except json.JSONDecodeError:
+                        continue
+                    yield chunk
+                    if chunk.get("done"):
+                        break
+        finally:
+            response.close()
+
+    def unload_model(self, model: str) -> bool:
+        """Ask Ollama to evict a model from memory (keep_alive=0)"""
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/generate",
+                json={"model": model, "keep_alive": 0},
+                timeout=30
+            )
+            response.raise_for_status()
+            logger.info(f"Unloaded model: {model}")
+            return True
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Could not unload {model}: {e}")
+            return False
+
     def generate_multiple_responses(self, model: str, prompt: str, system_prompt: str = "", 
                                   temperatures: list = [0.3, 0.7, 1.0], max_responses: int = 3):
         """Generate multiple responses with different temperatures for comparison"""
@@ -48,6 +48,12 @@ try:
 except ImportError:
     DOCUMENT_UPLOADER_AVAILABLE = False
 
+try:
+    from response_processor import StreamingResponsePostProcessor
+    STREAM_CLEANER_AVAILABLE = True
+except ImportError:
+    STREAM_CLEANER_AVAILABLE = False
+
 try:
     from legal_bert_classifier_enhanced import EnhancedLegalClassifier
     CLASSIFIER_AVAILABLE = True
@@ -140,8 +146,16 @@ def main():
                                 prompt, context, mode="research_memo", stream=True
                             )
                         
+                            # Strip special tokens and planning preambles as chunks arrive; a short
+                            # preamble window (and no lookback for long planning) keeps replies appearing promptly
+                            if STREAM_CLEANER_AVAILABLE:
+                                legal_response = StreamingResponsePostProcessor(
+                                    preamble_chars=400, max_planning_chars=0
+                                ).stream(legal_response)
+                            
                             # Display the streaming response
                             full_response = classification_text
+                            message_placeholder.markdown(full_response + "▌")
                             for chunk in legal_response:  # Now it's iterable since stream=True
                                 full_response += chunk
                                 message_placeholder.markdown(full_response + "▌")  # Shows a cursor while typing
@@ -12,6 +12,11 @@ from pathlib import Path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from config import Config
+from prompts.truncation import ContextTruncator
+from token_counter import get_token_counter
+
+# Shared engine: keyword patterns are compiled once
+_TRUNCATOR = ContextTruncator()
 
 class PromptTemplates:
     """Uniform prompt templates with model tweaks"""
@@ -22,64 +27,40 @@ class PromptTemplates:
         return Config.SYSTEM_PROMPT
     
     @staticmethod
-    def get_model_tweak(model: str) -> str:
-        """Get model-specific tweaks (no temperature-specific)"""
+    def get_model_tweak(model: str, escalation: int = 0) -> str:
+        """Get model-specific tweaks (no temperature-specific)
+
+        ``escalation`` > 0 appends a stronger anti-planning instruction, used
+        when a previous attempt was aborted for opening with planning.
+        """
         tweaks = {
             "gpt-oss:20b-q6": "\n\nCRITICAL: Skip internal thoughts—avoid phrases like 'We need to', 'Let me craft', or 'I'll produce'. Output only the complete final memo.",
             "qwen2.5:14b": "\n\nOUTPUT FORMAT: Provide complete memo with proper legal structure and citations.",
             "llama3.1:8b": "\n\nCOMPLETENESS REQUIREMENT: Ensure the memo is complete and professional in format."
         }
-        return tweaks.get(model, "")
+        escalations = [
+            "\n\nIMPORTANT: Your previous answer began with planning notes and was discarded. Do not describe what you will do. Begin directly with the memo header (To:, From:, Date:, Subject:).",
+            "\n\nFINAL ATTEMPT: The first characters of your reply must be 'To:'. Any planning, reasoning or commentary before the memo will be rejected."
+        ]
+        tweak = tweaks.get(model, "")
+        if escalation > 0:
+            tweak += escalations[min(escalation, len(escalations)) - 1]
+        return tweak
     
     @staticmethod
-    def truncate_context(context: str, max_tokens: int = 2000) -> str:
-        """Intelligently truncate context to stay within token limit"""
-        
-        # Rough token estimation (1 token ≈ 4 characters)
-        estimated_tokens = len(context) // 4
-        
-        if estimated_tokens <= max_tokens:
-            return context
-        
-        # Priority keywords to preserve
-        priority_keywords = [
-            'pregnancy discrimination', 'PDA', 'FMLA', 'Title VII', 
-            '42 U.S.C.', '29 U.S.C.', 'reasonable accommodation',
-            'New York', 'NY', 'damages', 'injunctive relief'
-        ]
-        
-        # Truncate intelligently by keeping most relevant parts
-        lines = context.split('\n')
-        truncated_lines = []
-        current_tokens = 0
-        
-        # First pass: keep lines with priority keywords
-        for line in lines:
-            line_tokens = len(line) // 4
-            if any(keyword.lower() in line.lower() for keyword in priority_keywords):
-                if current_tokens + line_tokens <= max_tokens:
-                    truncated_lines.append(line)
-                    current_tokens += line_tokens
-        
-        # Second pass: add remaining lines if space allows
-        for line in lines:
-            if line not in truncated_lines:
-                line_tokens = len(line) // 4
-                if current_tokens + line_tokens <= max_tokens:
-                    truncated_lines.append(line)
-                    current_tokens += line_tokens
-                else:
-                    break
-        
-        return '\n'.join(truncated_lines)
+    def truncate_context(context: str, max_tokens: int = 2000, question: str = "",
+                         model: str = None) -> str:
+        """Intelligently truncate context to stay within token limit (model tokens when known)"""
+        return _TRUNCATOR.truncate(context, max_tokens, question, get_token_counter(model))
     
     @staticmethod
-    def build_prompt(model: str, context: str, max_tokens: int = 2000) -> str:
+    def build_prompt(model: str, context: str, max_tokens: int = 2000, question: str = "",
+                     escalation: int = 0) -> str:
         """Build complete prompt with model tweaks and context truncation"""
         
         base_prompt = PromptTemplates.get_base_prompt()
-        model_tweak = PromptTemplates.get_model_tweak(model)
-        truncated_context = PromptTemplates.truncate_context(context, max_tokens)
+        model_tweak = PromptTemplates.get_model_tweak(model, escalation)
+        truncated_context = PromptTemplates.truncate_context(context, max_tokens, question, model)
         
         return f"{base_prompt}{model_tweak}\n\nDB Context:\n{truncated_context}"
     
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Context Truncation Engine for Legal AI Benchmarking
+Relevance-ranked selection of context lines under a token budget
+"""
+import re
+import math
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
+from token_counter import estimate_tokens
+
+# Default priority keywords (shared by PromptTemplates)
+PRIORITY_KEYWORDS = [
+    'pregnancy discrimination', 'PDA', 'FMLA', 'Title VII',
+    '42 U.S.C.', '29 U.S.C.', 'reasonable accommodation',
+    'New York', 'NY', 'damages', 'injunctive relief'
+]
+
+# Words too common in questions to signal relevance
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'in',
+    'include', 'is', 'it', 'of', 'on', 'or', 'relevant', 'specific', 'that', 'the',
+    'these', 'this', 'to', 'under', 'what', 'which', 'with', 'database', 'cite'
+}
+
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?;])\s+')
+
+class ContextTruncator:
+    """Scores context segments once and keeps the best set under the budget.
+
+    Each line (lines over ``max_segment_tokens`` are split into sentences)
+    is scored as ``priority_weight * distinct priority keywords +
+    BM25(question)``. Segments are ranked once (O(n log n)) and greedily
+    packed into the budget, each charged its tokens plus one separator
+    token, skipping any that do not fit and stopping once the budget is
+    full. Kept segments are emitted in their original order.
+    """
+
+    def __init__(self, priority_keywords: Optional[List[str]] = None,
+                 count_tokens: Callable[[str], int] = estimate_tokens,
+                 priority_weight: float = 3.0, max_segment_tokens: int = 256,
+                 k1: float = 1.2, b: float = 0.75):
+        keywords = priority_keywords if priority_keywords is not None else PRIORITY_KEYWORDS
+        # Longest first so overlapping keywords prefer the specific match
+        ordered = sorted({k.lower() for k in keywords}, key=len, reverse=True)
+        self.priority_pattern = re.compile('|'.join(re.escape(k) for k in ordered)) if ordered else None
+        self.count_tokens = count_tokens
+        self.priority_weight = priority_weight
+        self.max_segment_tokens = max_segment_tokens
+        self.k1 = k1
+        self.b = b
+
+    def segment(self, context: str, count_tokens: Optional[Callable[[str], int]] = None) -> List[Tuple[int, str]]:
+        """Split into (line number, text) segments; overlong lines become sentences"""
+        count_tokens = count_tokens or self.count_tokens
+        segments = []
+        for line_no, line in enumerate(context.split('\n')):
+            if count_tokens(line) > self.max_segment_tokens:
+                segments.extend((line_no, sentence) for sentence in SENTENCE_BOUNDARY.split(line))
+            else:
+                segments.append((line_no, line))
+        return segments
+
+    def score(self, texts: List[str], question: str = "") -> List[float]:
+        """Priority-keyword hits plus BM25 relevance of each segment to the question"""
+        query = {w for w in WORD_PATTERN.findall(question.lower()) if w not in STOPWORDS}
+
+        lowered = [text.lower() for text in texts]
+        priority = [
+            len(set(self.priority_pattern.findall(text))) if self.priority_pattern else 0
+            for text in lowered
+        ]
+        if not query:
+            return [self.priority_weight * hits for hits in priority]
+
+        # One alternation scan per segment for just the query terms
+        query_pattern = re.compile(r'\b(?:' + '|'.join(sorted(query, key=len, reverse=True)) + r')\b')
+        term_counts = []
+        lengths = []
+        document_frequency = Counter()
+        for text in lowered:
+            found = query_pattern.findall(text)
+            counts = Counter(found) if found else {}
+            term_counts.append(counts)
+            lengths.append(text.count(' ') + 1)
+            document_frequency.update(counts.keys())
+
+        n = len(texts)
+        avg_length = (sum(lengths) / n) if n else 0.0
+        idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+        scores = []
+        for hits, counts, length in zip(priority, term_counts, lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / avg_length) if avg_length else self.k1
+            bm25 = sum(idf[term] * tf * (self.k1 + 1) / (tf + norm) for term, tf in counts.items())
+            scores.append(self.priority_weight * hits + bm25)
+        return scores
+
+    def truncate(self, context: str, max_tokens: int, question: str = "",
+                 count_tokens: Optional[Callable[[str], int]] = None) -> str:
+        """Keep the highest-scoring segments that fit, in document order.
+
+        ``count_tokens`` overrides the engine's counter, e.g. with a model's
+        memoized TokenCounter so the budget is in real tokens.
+        """
+        count_tokens = count_tokens or self.count_tokens
+        if count_tokens(context) <= max_tokens:
+            return context
+
+        segments = self.segment(context, count_tokens)
+        texts = [text for _, text in segments]
+        scores = self.score(texts, question)
+
+        # Rank once; ties keep earlier segments first
+        ranked = sorted(range(len(segments)), key=lambda i: (-scores[i], i))
+
+        # Every kept segment after the first is joined by a space or newline
+        separator = max(1, count_tokens('\n'))
+        kept = []
+        used = 0
+        for i in ranked:
+            if used + (separator if kept else 0) >= max_tokens:
+                break
+            cost = count_tokens(texts[i]) + (separator if kept else 0)
+            if used + cost <= max_tokens:
+                kept.append(i)
+                used += cost
+
+        # Tokens need not add up exactly across joins; drop the lowest-ranked segments until it fits
+        result = self._join(segments, kept)
+        while kept and count_tokens(result) > max_tokens:
+            kept.pop()
+            result = self._join(segments, kept)
+        return result
+
+    @staticmethod
+    def _join(segments: List[Tuple[int, str]], kept: List[int]) -> str:
+        """Kept segments in document order; sentences of one line rejoin with a space"""
+        parts = []
+        previous_line = None
+        for i in sorted(kept):
+            line_no, text = segments[i]
+            if parts:
+                parts.append(' ' if line_no == previous_line else '\n')
+            parts.append(text)
+            previous_line = line_no
+        return ''.join(parts)
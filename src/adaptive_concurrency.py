@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Adaptive Concurrency for Legal AI Benchmarking
+AIMD in-flight limit driven by queueing latency, errors and timeouts
+"""
+import math
+import logging
+from typing import Dict, List, Any, Optional
+
+from config import Config
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+def latency_signal(result: Dict[str, Any]) -> Optional[float]:
+    """Latency the limiter reacts to: TTFT without model load time, else response time.
+
+    When Ollama has more requests than slots, the extra ones wait before
+    prefill, so queueing shows up in TTFT first; output length (which
+    dominates response_time) says nothing about load.
+    """
+    generation = result.get('generation_metrics') or {}
+    ttft = generation.get('ttft')
+    if ttft is not None:
+        return max(0.0, ttft - (generation.get('load_duration') or 0.0))
+    return result.get('response_time')
+
+def is_timeout(result: Dict[str, Any]) -> bool:
+    error = str(result.get('error', '')).lower()
+    return result.get('status') == 'error' and ('timeout' in error or 'timed out' in error)
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase / multiplicative-decrease limit on in-flight requests.
+
+    Results are judged in windows of max(limit, min_window) completions.
+    A healthy window (error rate and median latency within bounds) raises
+    the limit by one; a window whose median latency exceeds
+    latency_tolerance x the baseline (the best window median seen), or
+    whose error rate exceeds max_error_rate, multiplies it by backoff. A
+    timeout cuts at once. Only one cut happens per window, since requests
+    already in flight were admitted under the old limit. Called from the
+    dispatching thread only.
+    """
+
+    def __init__(self, initial: int, min_limit: Optional[int] = None, max_limit: Optional[int] = None,
+                 latency_tolerance: Optional[float] = None, backoff: Optional[float] = None,
+                 max_error_rate: Optional[float] = None, min_window: Optional[int] = None):
+        self.min_limit = max(1, min_limit or Config.ADAPTIVE_MIN_CONCURRENCY)
+        self.max_limit = max(self.min_limit, max_limit or Config.ADAPTIVE_MAX_CONCURRENCY, initial)
+        self.latency_tolerance = latency_tolerance or Config.ADAPTIVE_LATENCY_TOLERANCE
+        self.backoff = backoff or Config.ADAPTIVE_BACKOFF
+        self.max_error_rate = max_error_rate if max_error_rate is not None else Config.ADAPTIVE_MAX_ERROR_RATE
+        self.min_window = min_window or Config.ADAPTIVE_MIN_WINDOW
+
+        self.initial = min(max(initial, self.min_limit), self.max_limit)
+        self.limit = self.initial
+        self.baseline: Optional[float] = None
+        self.completed = 0
+        self.changes: List[Dict[str, Any]] = []
+        self._window: List[float] = []
+        self._window_errors = 0
+        self._cut_this_window = False
+
+    def _set_limit(self, limit: int, reason: str):
+        limit = min(max(limit, self.min_limit), self.max_limit)
+        if limit != self.limit:
+            logger.info(f"In-flight limit {self.limit} -> {limit} ({reason})")
+            self.changes.append({'completed': self.completed, 'limit': limit, 'reason': reason})
+            self.limit = limit
+
+    def _decrease(self, reason: str):
+        if not self._cut_this_window:
+            self._cut_this_window = True
+            self._set_limit(math.floor(self.limit * self.backoff), reason)
+
+    def record(self, latency: Optional[float], error: bool = False, timeout: bool = False):
+        self.completed += 1
+        if timeout:
+            self._decrease("timeout")
+        if error or timeout:
+            self._window_errors += 1
+        elif latency is not None:
+            self._window.append(latency)
+
+        size = len(self._window) + self._window_errors
+        if size < max(self.limit, self.min_window):
+            return
+
+        median = sorted(self._window)[len(self._window) // 2] if self._window else None
+        if self._window_errors / size > self.max_error_rate:
+            self._decrease(f"error rate {self._window_errors}/{size}")
+        elif median is not None and self.baseline is not None and median > self.latency_tolerance * self.baseline:
+            self._decrease(f"median latency {median:.2f}s > {self.latency_tolerance:g}x baseline {self.baseline:.2f}s")
+        elif not self._cut_this_window:
+            self._set_limit(self.limit + 1, "healthy window")
+        if median is not None:
+            self.baseline = median if self.baseline is None else min(self.baseline, median)
+
+        self._window, self._window_errors, self._cut_this_window = [], 0, False
+
+    def record_result(self, result: Dict[str, Any]):
+        """Feed one benchmark result (success or error dict) to the limiter"""
+        self.record(latency_signal(result), error=result.get('status') != 'success', timeout=is_timeout(result))
+
+    def stats(self) -> Dict[str, Any]:
+        limits = [self.initial] + [change['limit'] for change in self.changes]
+        return {
+            'initial_limit': self.initial,
+            'final_limit': self.limit,
+            'min_limit_reached': min(limits),
+            'max_limit_reached': max(limits),
+            'increases': sum(1 for a, b in zip(limits, limits[1:]) if b > a),
+            'decreases': sum(1 for a, b in zip(limits, limits[1:]) if b < a),
+            'baseline_latency': self.baseline,
+            'changes': self.changes
+        }
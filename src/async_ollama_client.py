@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Async Ollama Client for Legal AI Benchmarking
+Pooled keep-alive connections with per-host limits across several Ollama hosts
+"""
+import asyncio
+import logging
+import json
+from typing import Dict, List, Any, Optional, AsyncIterator
+
+import aiohttp
+
+from config import Config
+# Re-exported: callers build cache keys from the same payload the clients send
+from chat_payload import build_chat_payload
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+class AsyncOllamaClient:
+    """asyncio chat client sharing one bounded keep-alive connection pool"""
+
+    def __init__(self, hosts: Optional[List[str]] = None, pool_size: Optional[int] = None,
+                 per_host_limit: Optional[int] = None, timeout: Optional[int] = None, seed: int = 42):
+        self.hosts = [h.rstrip('/') for h in (hosts or Config.OLLAMA_HOSTS)]
+        if not self.hosts:
+            raise ValueError("AsyncOllamaClient needs at least one Ollama host")
+
+        self.pool_size = pool_size or Config.OLLAMA_POOL_SIZE
+        self.per_host_limit = per_host_limit or Config.OLLAMA_PER_HOST_LIMIT
+        self.timeout = timeout or Config.OLLAMA_TIMEOUT
+        self.seed = seed
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._in_flight = {host: 0 for host in self.hosts}
+        self._next_host = 0
+
+    async def __aenter__(self) -> "AsyncOllamaClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Open the shared connection pool (idempotent)"""
+        if self._session is not None and not self._session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.per_host_limit,
+            keepalive_timeout=Config.OLLAMA_KEEPALIVE_TIMEOUT
+        )
+        # OLLAMA_TIMEOUT bounds idle time between reads, not a whole (possibly long) streamed generation
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=Config.OLLAMA_CONNECT_TIMEOUT,
+                                          sock_read=self.timeout)
+        )
+        logger.info(f"AsyncOllamaClient pool opened: {len(self.hosts)} hosts, "
+                    f"{self.pool_size} connections, {self.per_host_limit} per host")
+
+    async def close(self):
+        """Close the connection pool"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _acquire_host(self) -> str:
+        """Pick the least-loaded host, rotating between ties"""
+        count = len(self.hosts)
+        order = [self.hosts[(self._next_host + i) % count] for i in range(count)]
+        host = min(order, key=lambda h: self._in_flight[h])
+        self._next_host = (self.hosts.index(host) + 1) % count
+        self._in_flight[host] += 1
+        return host
+
+    def _release_host(self, host: str):
+        self._in_flight[host] -= 1
+
+    def build_payload(self, model: str, prompt: str, system_prompt: str = "",
+                      temperature: float = 0.7, stream: bool = False) -> Dict[str, Any]:
+        """Build the /api/chat payload for this client's seed"""
+        return build_chat_payload(model, prompt, system_prompt, temperature, self.seed, stream)
+
+    async def generate_response(self, model: str, prompt: str, system_prompt: str = "",
+                                temperature: float = 0.7) -> str:
+        """Generate a complete (non-streaming) chat response"""
+        await self.start()
+        payload = self.build_payload(model, prompt, system_prompt, temperature)
+        host = self._acquire_host()
+
+        try:
+            async with self._session.post(f"{host}/api/chat", json=payload) as response:
+                response.raise_for_status()
+                result = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Ollama request to {host} failed: {e}")
+            raise
+        finally:
+            self._release_host(host)
+
+        content = result.get("message", {}).get("content", "")
+        logger.info(f"Generated response length: {len(content)} characters ({model} @ {host})")
+        return content
+
+    async def stream_chat(self, model: str, prompt: str, system_prompt: str = "",
+                          temperature: float = 0.7) -> AsyncIterator[Dict[str, Any]]:
+        """Stream raw /api/chat chunks, including Ollama's final timing fields"""
+        await self.start()
+        payload = self.build_payload(model, prompt, system_prompt, temperature, stream=True)
+        host = self._acquire_host()
+
+        try:
+            async with self._session.post(f"{host}/api/chat", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        chunk = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    yield chunk
+                    if chunk.get("done"):
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Ollama stream from {host} failed: {e}")
+            raise
+        finally:
+            self._release_host(host)
+
+    async def unload_model(self, model: str):
+        """Ask every host to evict a model from memory (keep_alive=0)"""
+        await self.start()
+
+        async def unload(host: str):
+            async with self._session.post(f"{host}/api/generate",
+                                          json={"model": model, "keep_alive": 0}) as response:
+                response.raise_for_status()
+
+        await asyncio.gather(*(unload(host) for host in self.hosts))
+        logger.info(f"Unloaded model {model} on {len(self.hosts)} host(s)")
+
+    async def is_available(self) -> bool:
+        """Check that every configured host answers /api/tags"""
+        await self.start()
+
+        async def check(host: str) -> bool:
+            try:
+                async with self._session.get(f"{host}/api/tags",
+                                             timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    return response.status == 200
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Ollama host {host} not available: {e}")
+                return False
+
+        checks = await asyncio.gather(*(check(host) for host in self.hosts))
+        return all(checks)
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Cross-Run Benchmark Database for Legal AI Benchmarking
+SQLite history of runs, tasks, metrics and stage timings with indexed trend queries
+"""
+import os
+import sys
+import json
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import Config
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    mode TEXT,
+    total_tests INTEGER,
+    completed_tests INTEGER,
+    failed_tests INTEGER,
+    avg_comprehensive_score REAL,
+    best_model TEXT,
+    store_path TEXT,
+    config TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    model TEXT NOT NULL,
+    temperature REAL,
+    category TEXT,
+    question TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    response_time REAL,
+    comprehensive_score REAL,
+    planning_detected INTEGER,
+    cache_hit INTEGER,
+    context_id TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    task_id INTEGER NOT NULL REFERENCES tasks(task_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (task_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stage_timings (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    task_id INTEGER REFERENCES tasks(task_id) ON DELETE CASCADE,
+    model TEXT,
+    stage TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resource_samples (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    t REAL NOT NULL,
+    cpu_percent REAL,
+    ollama_cpu_percent REAL,
+    ollama_rss_gb REAL,
+    memory_used_percent REAL,
+    available_gb REAL,
+    swap_used_gb REAL,
+    swap_out_mb_s REAL,
+    disk_read_mb_s REAL,
+    disk_write_mb_s REAL
+);
+CREATE INDEX IF NOT EXISTS idx_resource_samples_run ON resource_samples(run_id, t);
+CREATE INDEX IF NOT EXISTS idx_tasks_model_temp_category_run ON tasks(model, temperature, category, run_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_run ON tasks(run_id);
+CREATE INDEX IF NOT EXISTS idx_metrics_name ON metrics(name, task_id);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_stage_timings_run ON stage_timings(run_id, stage);
+"""
+
+# Per-task values stored on the tasks row; anything else numeric goes to metrics
+TASK_COLUMNS = ['response_time', 'comprehensive_score']
+
+# Nested result dicts whose numeric entries are recorded as '<prefix>.<name>' metrics
+METRIC_GROUPS = ['metrics', 'generation_metrics', 'planning_guard', 'resources', 'task_window']
+
+# Sampled resource fields kept per run (see resource_sampler.ResourceSampler)
+RESOURCE_FIELDS = ['cpu_percent', 'ollama_cpu_percent', 'ollama_rss_gb', 'memory_used_percent', 'available_gb',
+                   'swap_used_gb', 'swap_out_mb_s', 'disk_read_mb_s', 'disk_write_mb_s']
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+class BenchmarkDatabase:
+    """Every benchmark run in one local SQLite file.
+
+    runs has one row per run, tasks one per (model, temperature, scenario)
+    result, metrics the numeric scores and streaming latencies of each task
+    in long form, stage_timings per-model phases and per-task traced stages,
+    and resource_samples the run's resource timeline (epoch seconds, the
+    same clock as each task's task_window.start/end metrics).
+    Trend queries filter tasks through the (model, temperature, category,
+    run_id) index, so they stay in the millisecond range as history grows.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or Config.BENCHMARK_DB_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def _delete_run(self, run_id: str):
+        """Drop an earlier recording of run_id; its tasks, metrics, timings and samples cascade"""
+        if self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,)).rowcount:
+            logger.info(f"Replacing earlier recording of run {run_id}")
+
+    def record_run(self, run_id: str, results: Iterable[Dict[str, Any]], summary: Dict[str, Any],
+                   started_at: datetime, finished_at: Optional[datetime] = None, mode: str = "sync",
+                   store_path: Optional[Path] = None, config: Optional[Dict[str, Any]] = None,
+                   stage_timings: Optional[Dict[str, Dict[str, float]]] = None,
+                   resource_samples: Optional[Iterable[Dict[str, Any]]] = None) -> str:
+        """Insert one finished run in a single transaction; returns the run_id.
+
+        Recording is idempotent per run_id: a run recorded again (a resumed
+        run, a re-imported store) replaces its earlier rows instead of
+        adding a second copy of its tasks. results may be a generator (e.g.
+        ResultsStore.records()); it is consumed once and never held in memory.
+        """
+        overall = summary.get('overall', {})
+        counts = {'total': 0, 'success': 0, 'error': 0}
+
+        with self._lock, self._conn:
+            self._delete_run(run_id)
+            self._conn.execute(
+                "INSERT INTO runs (run_id, started_at, finished_at, mode, avg_comprehensive_score, "
+                "best_model, store_path, config) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, started_at.isoformat(), (finished_at or datetime.now()).isoformat(), mode,
+                 overall.get('avg_comprehensive_score'), overall.get('best_model'),
+                 str(store_path) if store_path else None, json.dumps(config or {}))
+            )
+
+            for result in results:
+                counts['total'] += 1
+                if result.get('status') in counts:
+                    counts[result['status']] += 1
+                cursor = self._conn.execute(
+                    "INSERT INTO tasks (run_id, model, temperature, category, question, status, error, "
+                    "response_time, comprehensive_score, planning_detected, cache_hit, context_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, result.get('model', 'unknown'), result.get('temperature'), result.get('category'),
+                     result.get('question'), result.get('status', 'success'), result.get('error'),
+                     _number(result.get('response_time')), _number(result.get('comprehensive_score')),
+                     int(bool(result.get('planning_detected'))), int(bool(result.get('cache_hit'))),
+                     result.get('context_id'))
+                )
+                task_id = cursor.lastrowid
+
+                metrics = []
+                for group in METRIC_GROUPS:
+                    for name, value in (result.get(group) or {}).items():
+                        if _number(value) is not None:
+                            metrics.append((task_id, f"{group}.{name}", _number(value)))
+                self._conn.executemany("INSERT INTO metrics (task_id, name, value) VALUES (?, ?, ?)", metrics)
+                self._conn.executemany(
+                    "INSERT INTO stage_timings (run_id, task_id, model, stage, seconds) VALUES (?, ?, ?, ?, ?)",
+                    [(run_id, task_id, result.get('model', 'unknown'), stage, _number(seconds))
+                     for stage, seconds in (result.get('stage_timings') or {}).items()
+                     if _number(seconds) is not None]
+                )
+
+            self._conn.execute(
+                "UPDATE runs SET total_tests = ?, completed_tests = ?, failed_tests = ? WHERE run_id = ?",
+                (counts['total'], counts['success'], counts['error'], run_id)
+            )
+
+            for model, stages in (stage_timings or {}).items():
+                self._conn.executemany(
+                    "INSERT INTO stage_timings (run_id, model, stage, seconds) VALUES (?, ?, ?, ?)",
+                    [(run_id, model, stage, float(seconds)) for stage, seconds in stages.items()
+                     if _number(seconds) is not None]
+                )
+
+            self._conn.executemany(
+                f"INSERT INTO resource_samples (run_id, t, {', '.join(RESOURCE_FIELDS)}) "
+                f"VALUES (?, ?, {', '.join('?' for _ in RESOURCE_FIELDS)})",
+                [(run_id, sample['t'], *(_number(sample.get(field)) for field in RESOURCE_FIELDS))
+                 for sample in resource_samples or []]
+            )
+
+        logger.info(f"Recorded run {run_id} ({counts['total']} tasks) in {self.path}")
+        return run_id
+
+    def _metric_source(self, metric: str):
+        """(join clause, value expression, params) for a task column or a metrics name"""
+        if metric in TASK_COLUMNS:
+            return "", f"t.{metric}", []
+        if '.' in metric:
+            return "JOIN metrics m ON m.task_id = t.task_id AND m.name = ?", "m.value", [metric]
+        # Bare names match any group, e.g. 'ttft' -> 'generation_metrics.ttft'
+        return ("JOIN metrics m ON m.task_id = t.task_id AND m.name IN (" +
+                ", ".join("?" for _ in METRIC_GROUPS) + ")", "m.value",
+                [f"{group}.{metric}" for group in METRIC_GROUPS])
+
+    def trend(self, metric: str, model: Optional[str] = None, temperature: Optional[float] = None,
+              category: Optional[str] = None, last: int = 20) -> List[Dict[str, Any]]:
+        """Per-run average of a metric over the last runs that have matching tasks, oldest first"""
+        join, value, params = self._metric_source(metric)
+        filters = ["t.status = 'success'"]
+        filter_params = []
+        for column, wanted in [('model', model), ('temperature', temperature), ('category', category)]:
+            if wanted is not None:
+                filters.append(f"t.{column} = ?")
+                filter_params.append(wanted)
+        where = ' AND '.join(filters)
+
+        # Pick the newest matching runs first so only their tasks are aggregated
+        # (CROSS JOIN keeps SQLite from driving the join from every matching task)
+        query = (
+            f"WITH recent AS (SELECT r.run_id, r.started_at FROM runs r WHERE EXISTS "
+            f"(SELECT 1 FROM tasks t WHERE t.run_id = r.run_id AND {where}) "
+            f"ORDER BY r.started_at DESC LIMIT ?) "
+            f"SELECT recent.run_id, recent.started_at, AVG({value}) AS average, MIN({value}) AS minimum, "
+            f"MAX({value}) AS maximum, COUNT({value}) AS tasks "
+            f"FROM recent CROSS JOIN tasks t ON t.run_id = recent.run_id {join} "
+            f"WHERE {where} "
+            f"GROUP BY recent.run_id HAVING COUNT({value}) > 0 ORDER BY recent.started_at DESC"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, filter_params + [last] + params + filter_params).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def runs(self, last: int = 20) -> List[Dict[str, Any]]:
+        """Most recent runs, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, started_at, finished_at, mode, total_tests, completed_tests, failed_tests, "
+                "avg_comprehensive_score, best_model, store_path FROM runs ORDER BY started_at DESC LIMIT ?",
+                (last,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stage_timings(self, run_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, stage, SUM(seconds) AS seconds, COUNT(*) AS samples FROM stage_timings "
+                "WHERE run_id = ? GROUP BY model, stage ORDER BY model, stage", (run_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def import_store(self, store_dir: Path) -> str:
+        """Backfill a run from a results store written by BenchmarkRunner"""
+        from results_store import ResultsStore
+
+        store = ResultsStore(store_dir)
+        summary = store.metadata.get('summary', {})
+        run_id = Path(store_dir).name.replace('enhanced_benchmark_results_', '')
+        try:
+            started_at = datetime.strptime(run_id[:15], "%Y%m%d_%H%M%S")
+        except ValueError:
+            started_at = datetime.fromtimestamp(Path(store_dir).stat().st_mtime)
+
+        timings = {model: {stage: value for stage, value in timing.items() if stage != 'tasks'}
+                   for model, timing in summary.get('model_scheduling', {}).items()}
+        return self.record_run(run_id, store.records(), summary, started_at, started_at, mode="import",
+                               store_path=store_dir, config=store.metadata.get('config'), stage_timings=timings)
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse benchmark database command-line options"""
+    parser = argparse.ArgumentParser(description="Query the cross-run benchmark database")
+    parser.add_argument('--db', type=Path, default=None, help="SQLite file (default: Config.BENCHMARK_DB_PATH)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    trend = commands.add_parser('trend', help="Per-run average of a metric over recent runs")
+    trend.add_argument('metric', help="response_time, comprehensive_score or a metric name (e.g. ttft, accuracy)")
+    trend.add_argument('--model', default=None)
+    trend.add_argument('--temperature', type=float, default=None)
+    trend.add_argument('--category', default=None)
+    trend.add_argument('--last', type=int, default=20, help="Number of most recent matching runs")
+
+    runs = commands.add_parser('runs', help="List recent runs")
+    runs.add_argument('--last', type=int, default=20)
+
+    stages = commands.add_parser('stages', help="Stage timings of one run")
+    stages.add_argument('run_id')
+
+    backfill = commands.add_parser('import', help="Record existing results store directories")
+    backfill.add_argument('stores', type=Path, nargs='+')
+    return parser.parse_args(argv)
+
+def main():
+    """Main entry point for benchmark database queries"""
+
+    args = parse_args()
+    database = BenchmarkDatabase(args.db)
+
+    if args.command == 'trend':
+        rows = database.trend(args.metric, args.model, args.temperature, args.category, args.last)
+        label = " ".join(f"{k}={v}" for k, v in [('model', args.model), ('temperature', args.temperature),
+                                                 ('category', args.category)] if v is not None)
+        print(f"📈 {args.metric} over the last {len(rows)} runs {label}".rstrip())
+        print("| Run | Started | Avg | Min | Max | Tasks |")
+        print("|-----|---------|-----|-----|-----|-------|")
+        for row in rows:
+            print(f"| {row['run_id']} | {row['started_at'][:19]} | {row['average']:.4f} | "
+                  f"{row['minimum']:.4f} | {row['maximum']:.4f} | {row['tasks']} |")
+    elif args.command == 'runs':
+        print("| Run | Started | Mode | Completed | Failed | Avg Score | Best Model |")
+        print("|-----|---------|------|-----------|--------|-----------|------------|")
+        for row in database.runs(args.last):
+            score = row['avg_comprehensive_score']
+            print(f"| {row['run_id']} | {row['started_at'][:19]} | {row['mode']} | {row['completed_tests']} | "
+                  f"{row['failed_tests']} | {score if score is None else f'{score:.2f}'} | {row['best_model']} |")
+    elif args.command == 'stages':
+        for row in database.stage_timings(args.run_id):
+            print(f"⏱️ {row['model']} {row['stage']}: {row['seconds']:.2f}s")
+    elif args.command == 'import':
+        for store_dir in args.stores:
+            print(f"📥 Imported {store_dir} as run {database.import_store(store_dir)}")
+
+    database.close()
+
+if __name__ == "__main__":
+    main()
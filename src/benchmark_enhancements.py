@@ -8,7 +8,7 @@ import json
 import torch
 import numpy as np
 import logging
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -16,6 +16,8 @@ from pathlib import Path
 Path(__file__).parent.mkdir(parents=True, exist_ok=True)
 
 from config import Config
+from prompts.truncation import ContextTruncator
+from token_counter import get_token_counter
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -37,6 +39,11 @@ class BenchmarkMetrics:
     explaining: float  # Explanation quality
     comprehensiveness: float  # Coverage completeness
 
+# Priority keywords to preserve during truncation
+_TRUNCATOR = ContextTruncator(
+    priority_keywords=['pregnancy discrimination', 'PDA', 'FMLA', 'Title VII', '42 U.S.C.', '29 U.S.C.']
+)
+
 class EnhancedPromptEngineer:
     """Model-specific prompt engineering with uniform base prompt"""
     
@@ -56,51 +63,22 @@ class EnhancedPromptEngineer:
             base_prompt += "\n\nCOMPLETENESS REQUIREMENT: Ensure the memo is complete and professional in format."
         
         # Intelligent context truncation (2000 token limit)
-        truncated_context = EnhancedPromptEngineer._truncate_context(context, Config.PROMPT_MAX_TOKENS)
+        truncated_context = EnhancedPromptEngineer._truncate_context(context, Config.PROMPT_MAX_TOKENS, model)
         
         logger.info(f"Generated enhanced prompt for {model} (temp: {temperature}), context length: {len(truncated_context)} chars")
         
         return f"{base_prompt}\n\nDB Context:\n{truncated_context}"
     
     @staticmethod
-    def _truncate_context(context: str, max_tokens: int) -> str:
+    def _truncate_context(context: str, max_tokens: int, model: str = None) -> str:
         """Intelligently truncate context to stay within token limit"""
         
-        # Rough token estimation (1 token ≈ 4 characters)
-        estimated_tokens = len(context) // 4
-        
-        if estimated_tokens <= max_tokens:
-            return context
-        
-        logger.info(f"Truncating context from {estimated_tokens} to {max_tokens} tokens")
-        
-        # Truncate intelligently by keeping most relevant parts
-        lines = context.split('\n')
-        truncated_lines = []
-        current_tokens = 0
-        
-        # Priority keywords to preserve
-        priority_keywords = ['pregnancy discrimination', 'PDA', 'FMLA', 'Title VII', '42 U.S.C.', '29 U.S.C.']
-        
-        # First pass: keep lines with priority keywords
-        for line in lines:
-            line_tokens = len(line) // 4
-            if any(keyword.lower() in line.lower() for keyword in priority_keywords):
-                if current_tokens + line_tokens <= max_tokens:
-                    truncated_lines.append(line)
-                    current_tokens += line_tokens
-        
-        # Second pass: add remaining lines if space allows
-        for line in lines:
-            if line not in truncated_lines:
-                line_tokens = len(line) // 4
-                if current_tokens + line_tokens <= max_tokens:
-                    truncated_lines.append(line)
-                    current_tokens += line_tokens
-                else:
-                    break
+        count_tokens = get_token_counter(model)
+        context_tokens = count_tokens(context)
+        if context_tokens > max_tokens:
+            logger.info(f"Truncating context from {context_tokens} to {max_tokens} tokens")
         
-        return '\n'.join(truncated_lines)
+        return _TRUNCATOR.truncate(context, max_tokens, count_tokens=count_tokens)
 
 class ResponsePostProcessor:
     """Enhanced post-processing with retry logic and planning detection"""
@@ -261,21 +239,13 @@ class ResponsePostProcessor:
 class EnhancedEvaluator:
     """Updated evaluator without structure penalties"""
     
-    def __init__(self):
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
         # Set fixed seed for reproducibility
         torch.manual_seed(42)
         np.random.seed(42)
         
-        # Updated weights (no structure penalties)
-        self.weights = {
-            'completeness': 0.25,
-            'alignment': 0.15,
-            'zero_hallucination': 0.20,
-            'accuracy': 0.15,
-            'citations': 0.10,
-            'clarity': 0.10,
-            'aspect_coverage': 0.05
-        }
+        # Updated weights (no structure penalties); defaults to Config.METRIC_WEIGHTS
+        self.weights = dict(weights if weights is not None else Config.METRIC_WEIGHTS)
     
     def evaluate_response_completeness(self, response: str) -> float:
         """Evaluate completeness based on word count"""
@@ -6,38 +6,107 @@ Parallel execution with config integration and enhanced evaluation
 import sys
 import os
 import json
+import inspect
+import asyncio
+import argparse
 import time
 import csv
 import torch
 import numpy as np
 from datetime import datetime
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Optional, Tuple
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from config import Config
 from legal_ai_core import LegalAI
-from response_processor import ResponsePostProcessor
+from response_processor import StreamingResponsePostProcessor, PlanningStreamGuard
 from enhanced_evaluator import EnhancedEvaluator
+import async_ollama_client
+import chat_payload
+import generation_metrics as generation_metrics_module
+import response_processor
+from async_ollama_client import AsyncOllamaClient, build_chat_payload
+from response_cache import ResponseCache
+from results_store import COLUMNS as STORE_COLUMNS, ResultsStore
+from benchmark_database import BenchmarkDatabase
+from run_journal import RunJournal, task_id
+from task_fingerprint import PriorResults, code_version, task_fingerprint
+from tracer import Tracer
+from latency_histogram import LatencyReport, latency_rows
+from context_stage import ContextRetrievalStage
+from generation_metrics import StreamRecorder
+from task_scheduler import ModelAffinityScheduler
+from memory_admission import MemoryAdmissionController, ollama_loaded_models
+from resource_sampler import ResourceSampler, ResourceTimeline, outlier_report
+from concurrency_sweep import ConcurrencySweep, load_tuned_concurrency, plot_sweep, write_markdown, write_profile
 from prompts.prompts import PromptTemplates
 
 class BenchmarkRunner:
     """Main benchmark runner with parallel execution"""
     
-    def __init__(self):
+    def __init__(self, replay: bool = False, use_cache: bool = Config.ENABLE_RESPONSE_CACHE,
+                 contexts_file: Path = None, resume_run: Optional[str] = None,
+                 incremental: bool = Config.ENABLE_INCREMENTAL_RUNS, trace: bool = Config.ENABLE_TRACING,
+                 tuned_profile: bool = Config.USE_TUNED_PROFILE,
+                 adaptive: bool = Config.ENABLE_ADAPTIVE_CONCURRENCY,
+                 memory_admission: bool = Config.ENABLE_MEMORY_ADMISSION,
+                 resource_sampling: bool = Config.ENABLE_RESOURCE_SAMPLING):
         # Set fixed seeds for reproducibility
         torch.manual_seed(42)
         np.random.seed(42)
         
         # Initialize components
         self.legal_ai = LegalAI()
-        self.post_processor = ResponsePostProcessor()
+        self.legal_ai.ollama_client.seed = Config.BENCHMARK_SEED
         self.evaluator = EnhancedEvaluator()
         self.prompt_templates = PromptTemplates()
         
+        # Replay mode serves every generation from the response cache
+        self.replay = replay
+        self.response_cache = ResponseCache() if (use_cache or replay) else None
+        
+        # Each question is retrieved once and shared by every model/temperature
+        self.context_stage = ContextRetrievalStage(
+            self.legal_ai.retrieve_context,
+            lambda model, question, context: self.prompt_templates.build_prompt(
+                model, context, Config.PROMPT_MAX_TOKENS, question
+            )
+        )
+        if contexts_file:
+            self.context_stage.load(contexts_file)
+        # Restart prompts, built on first use per (model, question, escalation)
+        self._escalated_prompts: Dict[tuple, str] = {}
+        
+        # Completed tasks are journaled as they finish; resume_run continues a journal
+        self.resume_run = resume_run
+        self.run_id: Optional[str] = None
+        
+        # Incremental runs reuse journaled results whose task fingerprint is unchanged
+        self.prior_results = PriorResults() if incremental else None
+        # ... which needs fingerprints journaled; other runs only hash tasks when asked to
+        self.record_fingerprints = incremental or Config.RECORD_TASK_FINGERPRINTS
+        self.reused_tasks = 0
+        self.executed_tasks = 0
+        
+        # Stage spans per task; exported as a Chrome trace when enabled
+        self.tracer = Tracer(enabled=trace)
+        
+        # Per-model request concurrency from the last --sweep-concurrency, if any
+        self.model_concurrency = load_tuned_concurrency() if tuned_profile else {}
+        # Threaded runs then adapt each model's in-flight limit to latency, errors and timeouts
+        self.adaptive = adaptive
+        # ... and hold tasks back while this machine's memory could not absorb them
+        self.memory_admission = memory_admission
+        
+        # Resource timeline sampled in the background while tasks execute
+        self.resource_sampling = resource_sampling
+        
+        # Every run is also recorded in the cross-run SQLite history
+        self.database = BenchmarkDatabase() if Config.ENABLE_BENCHMARK_DB else None
+        
         # Validate config before running
         self._validate_config()
     
@@ -50,40 +119,61 @@ class BenchmarkRunner:
         if validation['warnings']:
             print(f"⚠️ Configuration warnings: {validation['warnings']}")
     
-    def run_single_benchmark(self, model: str, temperature: float, scenario: Dict[str, Any]) -> Dict[str, Any]:
-        """Run a single benchmark test"""
+    def _apply_temperature_constraints(self, model: str, temperature: float) -> float:
+        """Clamp temperature to the per-model limits from config"""
+        if model == "gpt-oss:20b-q6" and temperature < Config.MIN_TEMP_GPT:
+            return Config.MIN_TEMP_GPT
+        elif model == "llama3.1:8b" and temperature > Config.MAX_TEMP_LLAMA:
+            return Config.MAX_TEMP_LLAMA
+        return temperature
+    
+    def _prepare_prompt(self, model: str, scenario: Dict[str, Any]):
+        """Shared database context and system prompt for a task"""
+        with self.tracer.span('retrieve'):
+            context = self.context_stage.get_context(scenario["question"])
+        with self.tracer.span('prompt'):
+            enhanced_prompt = self.context_stage.get_prompt(model, scenario["question"])
+        return context, enhanced_prompt
+    
+    def _generator_version(self) -> str:
+        """Code version of everything between the built prompt and the accepted stream"""
+        return code_version(
+            async_ollama_client, chat_payload, response_processor, generation_metrics_module,
+            inspect.getmodule(LegalAI),
+            BenchmarkRunner._stream_generation, BenchmarkRunner._stream_generation_async,
+            BenchmarkRunner._new_planning_guard
+        )
+    
+    def _fingerprint(self, model: str, temperature: float, scenario: Dict[str, Any],
+                     context: str, enhanced_prompt: str) -> str:
+        """Fingerprint of a task's generation inputs (temperature already constrained)"""
+        payload = build_chat_payload(model, scenario["question"], enhanced_prompt,
+                                     temperature, Config.BENCHMARK_SEED)
+        guard = self._new_planning_guard()
+        generation = {
+            'options': payload['options'],
+            'planning_guard': [Config.ENABLE_PLANNING_GUARD, Config.PLANNING_GUARD_TOKENS, guard.max_restarts],
+            # Restarted streams use escalated prompts, which are inputs too
+            'escalated_prompts': [self._escalated_prompt(model, scenario, context, escalation)
+                                  for escalation in range(1, guard.max_restarts + 1)]
+        }
+        return task_fingerprint(model, temperature, scenario, context, enhanced_prompt,
+                                self._generator_version(), generation)
+    
+    def _build_result(self, model: str, temperature: float, scenario: Dict[str, Any],
+                      context: str, response: str, response_time: float,
+                      generation_metrics: Dict[str, Any], cache_hit: bool = False,
+                      final_content: Optional[str] = None,
+                      planning_guard: Optional[Dict[str, Any]] = None,
+                      fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """Evaluate a generated response (cleaning it if the stream was not cleaned live)"""
         
-        try:
-            # Apply temperature constraints
-            if model == "gpt-oss:20b-q6" and temperature < Config.MIN_TEMP_GPT:
-                temperature = Config.MIN_TEMP_GPT
-            elif model == "llama3.1:8b" and temperature > Config.MAX_TEMP_LLAMA:
-                temperature = Config.MAX_TEMP_LLAMA
-            
-            # Get context from database
-            context = self.legal_ai.retrieve_context(scenario["question"])
-            
-            # Build enhanced prompt
-            enhanced_prompt = self.prompt_templates.build_prompt(
-                model, context, Config.PROMPT_MAX_TOKENS
-            )
-            
-            # Generate response
-            start_time = time.time()
-            response = self.legal_ai.ollama_client.generate_response(
-                prompt=scenario["question"],
-                system_prompt=enhanced_prompt,
-                model=model,
-                temperature=temperature
-            )
-            response_time = time.time() - start_time
-            
-            # Post-process with retries
-            final_content = self.post_processor.process_with_retries(
-                response, max_retries=Config.RETRY_ATTEMPTS
-            )
-            
-            # Evaluate response
+        if final_content is None:
+            with self.tracer.span('post_process'):
+                final_content = StreamingResponsePostProcessor.clean(response)
+        
+        # Evaluate response
+        with self.tracer.span('evaluate'):
             evaluation_result = self.evaluator.evaluate_benchmark_result(
                 final_content, 
                 scenario["question"], 
@@ -92,190 +182,673 @@ class BenchmarkRunner:
                 scenario["expected_aspects"], 
                 response_time
             )
-            
-            return {
-                'model': model,
-                'temperature': temperature,
-                'category': scenario["category"],
-                'question': scenario["question"],
-                'original_response': response,
-                'final_content': final_content,
+        
+        return {
+            'model': model,
+            'temperature': temperature,
+            'category': scenario["category"],
+            'question': scenario["question"],
+            'original_response': response,
+            'final_content': final_content,
+            'response_time': response_time,
+            'generation_metrics': generation_metrics,
+            'planning_guard': planning_guard or {},
+            'cache_hit': cache_hit,
+            'context_id': ContextRetrievalStage.context_id(context),
+            'context_length': len(context),
+            'fingerprint': fingerprint,
+            'status': 'success',
+            **evaluation_result
+        }
+    
+    def _lookup_cached(self, model: str, temperature: float, scenario: Dict[str, Any],
+                       enhanced_prompt: str):
+        """Return (cache_key, cached entry or None); a miss is an error in replay mode"""
+        if self.response_cache is None:
+            return None, None
+        
+        payload = build_chat_payload(model, scenario["question"], enhanced_prompt,
+                                     temperature, Config.BENCHMARK_SEED)
+        cache_key = ResponseCache.make_key(payload)
+        cached = self.response_cache.get(cache_key)
+        
+        if cached is None and self.replay:
+            raise LookupError(f"No cached response for {model} @ {temperature} "
+                              f"({scenario['category']}) in replay mode")
+        return cache_key, cached
+    
+    def _store_cached(self, cache_key: str, recorder: StreamRecorder, response_time: float,
+                      planning_guard: Dict[str, Any]):
+        if self.response_cache is not None and cache_key is not None:
+            self.response_cache.put(cache_key, {
+                'response': recorder.text,
                 'response_time': response_time,
-                'context_length': len(context),
-                'status': 'success',
-                **evaluation_result
-            }
-            
-        except Exception as e:
-            return {
-                'model': model,
-                'temperature': temperature,
-                'category': scenario["category"],
-                'question': scenario["question"],
-                'error': str(e),
-                'status': 'error'
-            }
+                'generation_metrics': recorder.metrics(),
+                'planning_guard': planning_guard
+            })
     
-    def run_parallel_benchmarks(self) -> Dict[str, Any]:
-        """Run all benchmarks in parallel"""
+    def _cached_result(self, model: str, temperature: float, scenario: Dict[str, Any],
+                       context: str, cached: Dict[str, Any], fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        return self._build_result(model, temperature, scenario, context, cached['response'],
+                                  cached['response_time'], cached['generation_metrics'], cache_hit=True,
+                                  planning_guard=cached.get('planning_guard'), fingerprint=fingerprint)
+    
+    def _reused_result(self, model: str, temperature: float, scenario: Dict[str, Any],
+                       context: str, prior: Dict[str, Any]) -> Dict[str, Any]:
+        """A prior run's generation for an unchanged fingerprint, scored with the current evaluator"""
+        result = self._build_result(model, temperature, scenario, context, prior['original_response'],
+                                    prior['response_time'], prior.get('generation_metrics', {}),
+                                    final_content=prior.get('final_content'),
+                                    planning_guard=prior.get('planning_guard'),
+                                    fingerprint=prior['fingerprint'])
+        result['reused_from'] = prior['reused_from']
+        return result
+    
+    def _error_result(self, model: str, temperature: float, scenario: Dict[str, Any],
+                      error: Exception) -> Dict[str, Any]:
+        return {
+            'model': model,
+            'temperature': temperature,
+            'category': scenario["category"],
+            'question': scenario["question"],
+            'error': str(error),
+            'status': 'error'
+        }
+    
+    def _build_tasks(self) -> List[tuple]:
+        """Expand the model x temperature x scenario matrix"""
+        tasks = []
+        for model in Config.BENCHMARK_MODELS:
+            for temperature in Config.BENCHMARK_TEMPERATURES:
+                for scenario in Config.BENCHMARK_SCENARIOS:
+                    tasks.append((model, temperature, scenario))
+        return tasks
+    
+    def _start_run(self) -> Tuple[RunJournal, List[tuple], int]:
+        """Open (or resume) the run journal; returns it, the tasks still to run and the matrix size"""
+        tasks = self._build_tasks()
+        if self.resume_run:
+            journal = RunJournal(self.resume_run, resume=True)
+            completed = journal.completed_ids()
+            remaining = [task for task in tasks if task_id(*task) not in completed]
+            print(f"⏭️ Resuming run {journal.run_id}: {len(tasks) - len(remaining)}/{len(tasks)} tasks already complete")
+        else:
+            journal = RunJournal(datetime.now().strftime("%Y%m%d_%H%M%S"))
+            remaining = tasks
+        self.run_id = journal.run_id
+        print(f"📓 Journal: {journal.path}")
+        if self.prior_results is not None:
+            remaining = self._reuse_unchanged(journal, remaining)
+        return journal, remaining, len(tasks)
+    
+    def _reuse_unchanged(self, journal: RunJournal, tasks: List[tuple]) -> List[tuple]:
+        """Journal prior results for tasks whose fingerprint is unchanged; returns the tasks to execute"""
+        to_run = []
+        for model, temperature, scenario in tasks:
+            try:
+                effective = self._apply_temperature_constraints(model, temperature)
+                context, enhanced_prompt = self._prepare_prompt(model, scenario)
+                prior = self.prior_results.get(
+                    self._fingerprint(model, effective, scenario, context, enhanced_prompt)
+                )
+            except Exception as e:
+                # Leave the task to the normal path, which records the error
+                print(f"⚠️ Could not fingerprint {model} @ {temperature} ({scenario['category']}): {e}")
+                prior = None
+            
+            if prior is None:
+                to_run.append((model, temperature, scenario))
+            else:
+                self._journaled(journal, (model, temperature, scenario),
+                                self._reused_result(model, effective, scenario, context, prior))
+                self.reused_tasks += 1
         
+        print(f"♻️ Incremental: reusing {len(tasks) - len(to_run)}/{len(tasks)} unchanged tasks "
+              f"from {len(self.prior_results)} indexed results, executing {len(to_run)}")
+        return to_run
+    
+    def _journaled(self, journal: RunJournal, task: tuple, result: Dict[str, Any],
+                   started: Optional[float] = None) -> Dict[str, Any]:
+        """Tag a result with its task ID, stage timings and wall-clock window and make it durable before reporting it"""
+        result = {**result, 'task_id': task_id(*task)}
+        if started is not None:
+            result['task_window'] = {'start': started, 'end': time.time()}
+        stages = self.tracer.task_stages()
+        if stages is not None:
+            result['stage_timings'] = stages
+        with self.tracer.span('journal'):
+            journal.append(result)
+        return result
+    
+    def _concurrency_label(self, scheduler: ModelAffinityScheduler) -> str:
+        if not scheduler.model_concurrency:
+            return str(scheduler.max_concurrency)
+        tuned = ", ".join(f"{model}={scheduler.concurrency_for(model)}" for model in Config.BENCHMARK_MODELS)
+        return f"{tuned} (tuned profile {Config.TUNED_PROFILE_PATH})"
+    
+    def _print_run_header(self, mode: str):
         print("🚀 Starting Enhanced Legal AI Benchmarking")
         print("=" * 60)
         print(f"📊 Models: {Config.BENCHMARK_MODELS}")
         print(f"🌡️ Temperatures: {Config.BENCHMARK_TEMPERATURES}")
         print(f"📝 Scenarios: {len(Config.BENCHMARK_SCENARIOS)}")
-        print(f"⚡ Parallel Threads: {Config.THREAD_POOL_SIZE}")
+        print(f"⚡ {mode}")
         print("=" * 60)
+    
+    def _new_planning_guard(self) -> PlanningStreamGuard:
+        max_restarts = Config.RETRY_ATTEMPTS if Config.ENABLE_PLANNING_GUARD else 0
+        return PlanningStreamGuard(Config.PLANNING_GUARD_TOKENS, max_restarts)
+    
+    def _escalated_prompt(self, model: str, scenario: Dict[str, Any], context: str, escalation: int) -> str:
+        """System prompt with a stronger anti-planning tweak for a restarted stream.
+        
+        Built once per model, question and escalation (the context is shared per
+        question); every task's fingerprint includes these prompts.
+        """
+        key = (model, scenario["question"], escalation)
+        prompt = self._escalated_prompts.get(key)
+        if prompt is None:
+            prompt = self._escalated_prompts[key] = self.prompt_templates.build_prompt(
+                model, context, Config.PROMPT_MAX_TOKENS, scenario["question"], escalation
+            )
+        return prompt
+    
+    def _stream_generation(self, model: str, temperature: float, scenario: Dict[str, Any],
+                           context: str, enhanced_prompt: str):
+        """Stream a response, restarting while it opens with planning.
         
-        # Get scenarios from config
-        scenarios = Config.BENCHMARK_SCENARIOS
+        Returns (recorder, cleaner, response_time, planning_guard stats) for the
+        accepted attempt; response_time includes the aborted attempts.
+        """
+        guard = self._new_planning_guard()
+        start_time = time.perf_counter()
+        system_prompt = enhanced_prompt
         
-        # Prepare all benchmark tasks
-        tasks = []
-        for model in Config.BENCHMARK_MODELS:
-            for temperature in Config.BENCHMARK_TEMPERATURES:
-                for scenario in scenarios:
-                    tasks.append((model, temperature, scenario))
+        while True:
+            recorder = StreamRecorder()
+            cleaner = StreamingResponsePostProcessor()
+            aborted = False
+            stream = self.legal_ai.ollama_client.stream_chat(
+                model=model,
+                prompt=scenario["question"],
+                system_prompt=system_prompt,
+                temperature=temperature
+            )
+            with self.tracer.span('stream_attempt', restarts=guard.restarts):
+                try:
+                    for chunk in stream:
+                        content = recorder.observe(chunk)
+                        cleaner.feed(content)
+                        if guard.observe(content):
+                            aborted = True
+                            break
+                finally:
+                    # Closing the generator drops the HTTP stream so Ollama stops decoding
+                    stream.close()
+            
+            if not aborted:
+                break
+            system_prompt = self._escalated_prompt(model, scenario, context, guard.restarts)
+        
+        recorder.finish()
+        cleaner.finish()
+        accepted_tokens = recorder.final_chunk.get('eval_count') or len(recorder.token_times)
+        return recorder, cleaner, time.perf_counter() - start_time, guard.stats(accepted_tokens)
+    
+    async def _stream_generation_async(self, client: AsyncOllamaClient, model: str, temperature: float,
+                                       scenario: Dict[str, Any], context: str, enhanced_prompt: str):
+        """Async counterpart of _stream_generation"""
+        guard = self._new_planning_guard()
+        start_time = time.perf_counter()
+        system_prompt = enhanced_prompt
+        
+        while True:
+            recorder = StreamRecorder()
+            cleaner = StreamingResponsePostProcessor()
+            aborted = False
+            stream = client.stream_chat(
+                model=model,
+                prompt=scenario["question"],
+                system_prompt=system_prompt,
+                temperature=temperature
+            )
+            with self.tracer.span('stream_attempt', restarts=guard.restarts):
+                try:
+                    async for chunk in stream:
+                        content = recorder.observe(chunk)
+                        cleaner.feed(content)
+                        if guard.observe(content):
+                            aborted = True
+                            break
+                finally:
+                    await stream.aclose()
+            
+            if not aborted:
+                break
+            system_prompt = await asyncio.to_thread(
+                self._escalated_prompt, model, scenario, context, guard.restarts
+            )
+        
+        recorder.finish()
+        cleaner.finish()
+        accepted_tokens = recorder.final_chunk.get('eval_count') or len(recorder.token_times)
+        return recorder, cleaner, time.perf_counter() - start_time, guard.stats(accepted_tokens)
+    
+    def run_single_benchmark(self, model: str, temperature: float, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a single benchmark test"""
+        
+        try:
+            temperature = self._apply_temperature_constraints(model, temperature)
+            context, enhanced_prompt = self._prepare_prompt(model, scenario)
+            fingerprint = None
+            if self.record_fingerprints:
+                with self.tracer.span('fingerprint'):
+                    fingerprint = self._fingerprint(model, temperature, scenario, context, enhanced_prompt)
+            
+            with self.tracer.span('cache_lookup'):
+                cache_key, cached = self._lookup_cached(model, temperature, scenario, enhanced_prompt)
+            if cached is not None:
+                return self._cached_result(model, temperature, scenario, context, cached, fingerprint)
+            
+            # Generate response over the streaming chat API
+            with self.tracer.span('generate'):
+                recorder, cleaner, response_time, planning_guard = self._stream_generation(
+                    model, temperature, scenario, context, enhanced_prompt
+                )
+            self._store_cached(cache_key, recorder, response_time, planning_guard)
+            
+            return self._build_result(model, temperature, scenario, context,
+                                      recorder.text, response_time, recorder.metrics(),
+                                      final_content=cleaner.text, planning_guard=planning_guard,
+                                      fingerprint=fingerprint)
+            
+        except Exception as e:
+            return self._error_result(model, temperature, scenario, e)
+    
+    async def run_single_benchmark_async(self, client: AsyncOllamaClient, model: str,
+                                         temperature: float, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a single benchmark test on the event loop"""
+        
+        try:
+            temperature = self._apply_temperature_constraints(model, temperature)
+            
+            # Retrieval is blocking; keep it off the event loop
+            context, enhanced_prompt = await asyncio.to_thread(self._prepare_prompt, model, scenario)
+            fingerprint = None
+            if self.record_fingerprints:
+                with self.tracer.span('fingerprint'):
+                    fingerprint = await asyncio.to_thread(
+                        self._fingerprint, model, temperature, scenario, context, enhanced_prompt
+                    )
+            
+            with self.tracer.span('cache_lookup'):
+                cache_key, cached = await asyncio.to_thread(
+                    self._lookup_cached, model, temperature, scenario, enhanced_prompt
+                )
+            if cached is not None:
+                return await asyncio.to_thread(self._cached_result, model, temperature, scenario, context,
+                                               cached, fingerprint)
+            
+            with self.tracer.span('generate'):
+                recorder, cleaner, response_time, planning_guard = await self._stream_generation_async(
+                    client, model, temperature, scenario, context, enhanced_prompt
+                )
+            await asyncio.to_thread(self._store_cached, cache_key, recorder, response_time, planning_guard)
+            
+            return await asyncio.to_thread(
+                self._build_result, model, temperature, scenario, context,
+                recorder.text, response_time, recorder.metrics(),
+                final_content=cleaner.text, planning_guard=planning_guard, fingerprint=fingerprint
+            )
+            
+        except Exception as e:
+            return self._error_result(model, temperature, scenario, e)
+    
+    def _progress_printer(self, total: int, scheduler: Optional[ModelAffinityScheduler] = None):
+        """Build an on_result callback that counts executed tasks and prints progress
+        (and any adaptive in-flight limit) every 4 tests"""
+        completed = [0]
+        
+        def on_result(result: Dict[str, Any]):
+            completed[0] += 1
+            self.executed_tasks += 1
+            if completed[0] % 4 == 0:
+                limit = ""
+                if scheduler is not None and result.get('model') in scheduler.limiters:
+                    limit = f" (in-flight limit {scheduler.current_limit(result['model'])})"
+                print(f"📈 Progress: {completed[0]}/{total} tests completed{limit}")
+        
+        return on_result
+    
+    def run_parallel_benchmarks(self) -> Dict[str, Any]:
+        """Run all benchmarks in parallel, one model at a time"""
+        
+        admission = None
+        # Replay serves every task from the cache, so no model is ever loaded
+        if self.memory_admission and not self.replay:
+            admission = MemoryAdmissionController(
+                get_model_info=self.legal_ai.ollama_client.get_model_info,
+                loaded_models=lambda: ollama_loaded_models(self.legal_ai.ollama_client.base_url)
+            )
+        scheduler = ModelAffinityScheduler(unload_model=self.legal_ai.ollama_client.unload_model,
+                                           tracer=self.tracer, model_concurrency=self.model_concurrency,
+                                           adaptive=self.adaptive, admission=admission)
+        limit = "Adaptive In-Flight Limit, starting at" if self.adaptive else "Concurrent Requests per Model:"
+        self._print_run_header(f"{limit} {self._concurrency_label(scheduler)}")
+        
+        # Prepare all benchmark tasks (minus those a resumed journal already holds)
+        journal, tasks, total_tests = self._start_run()
         
         print(f"🔄 Running {len(tasks)} benchmark tests...")
         
-        # Run benchmarks in parallel
-        results = []
-        with ThreadPoolExecutor(max_workers=Config.THREAD_POOL_SIZE) as executor:
-            # Submit all tasks
-            future_to_task = {
-                executor.submit(self.run_single_benchmark, model, temp, scenario): (model, temp, scenario)
-                for model, temp, scenario in tasks
-            }
+        def run_task(model, temp, scenario):
+            started = time.time()
+            return self._journaled(journal, (model, temp, scenario),
+                                   self.run_single_benchmark(model, temp, scenario), started)
+        
+        sampler = self._start_sampler(journal.run_id)
+        try:
+            scheduler.run(tasks, run_task, on_result=self._progress_printer(len(tasks), scheduler), collect=False)
+        finally:
+            journal.close()
+            if sampler is not None:
+                sampler.stop()
+        
+        return self._finalize_run(journal, total_tests, scheduler, mode="sync")
+    
+    async def run_async_benchmarks(self) -> Dict[str, Any]:
+        """Run all benchmarks on one event loop with a pooled async client"""
+        
+        hosts = Config.OLLAMA_HOSTS
+        
+        async with AsyncOllamaClient(hosts=hosts, seed=Config.BENCHMARK_SEED) as client:
+            # Each host serves the current model with its own request slots
+            scheduler = ModelAffinityScheduler(
+                max_concurrency=min(Config.MAX_CONCURRENT_REQUESTS * len(hosts), Config.ASYNC_MAX_IN_FLIGHT),
+                unload_model=client.unload_model,
+                tracer=self.tracer,
+                model_concurrency={model: min(concurrency * len(hosts), Config.ASYNC_MAX_IN_FLIGHT)
+                                   for model, concurrency in self.model_concurrency.items()}
+            )
+            self._print_run_header(f"Async In-Flight per Model: {self._concurrency_label(scheduler)} "
+                                   f"across {len(hosts)} host(s)")
+            journal, tasks, total_tests = self._start_run()
+            print(f"🔄 Running {len(tasks)} benchmark tests...")
+            
+            async def run_task(model, temp, scenario):
+                started = time.time()
+                result = await self.run_single_benchmark_async(client, model, temp, scenario)
+                return await asyncio.to_thread(self._journaled, journal, (model, temp, scenario), result, started)
             
-            # Collect results as they complete
-            completed = 0
-            for future in as_completed(future_to_task):
-                result = future.result()
-                results.append(result)
-                completed += 1
-                
-                # Progress update
-                if completed % 4 == 0:
-                    print(f"📈 Progress: {completed}/{len(tasks)} tests completed")
+            sampler = self._start_sampler(journal.run_id)
+            try:
+                await scheduler.run_async(tasks, run_task, on_result=self._progress_printer(len(tasks)),
+                                          collect=False)
+            finally:
+                journal.close()
+                if sampler is not None:
+                    sampler.stop()
+        
+        return self._finalize_run(journal, total_tests, scheduler, mode="async")
+    
+    def sweep_concurrency(self, levels: Optional[List[int]] = None,
+                          tasks_per_level: Optional[int] = None) -> Dict[str, Any]:
+        """Run a fixed task set per model at each concurrency level and write the tuned profile"""
+        
+        levels = levels or Config.CONCURRENCY_SWEEP_LEVELS
+        tasks_per_level = tasks_per_level or Config.CONCURRENCY_SWEEP_TASKS
+        self._print_run_header(f"Concurrency Sweep: levels {levels}, {tasks_per_level} tasks per level")
+        
+        sweep = ConcurrencySweep(self.run_single_benchmark, unload_model=self.legal_ai.ollama_client.unload_model)
+        report = sweep.run(Config.BENCHMARK_MODELS, levels, tasks_per_level,
+                           latency_factor=Config.CONCURRENCY_SWEEP_MAX_P95_FACTOR)
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        outputs = {
+            'profile': write_profile(report, hosts=[Config.OLLAMA_BASE_URL]),
+            'report': write_markdown(report, Config.OUTPUTS_DIR / f"concurrency_sweep_{timestamp}.md"),
+            'plot': plot_sweep(report, Config.OUTPUTS_DIR / f"concurrency_sweep_{timestamp}.png")
+        }
+        for model, entry in report.items():
+            chosen = entry['recommended']
+            if chosen:
+                print(f"🎯 {model}: concurrency {chosen['concurrency']} "
+                      f"({chosen['tasks_per_minute']:.1f} tasks/min, p95 {chosen['p95_latency']:.2f}s)")
+            else:
+                print(f"⚠️ {model}: no error-free level; not added to the tuned profile")
+        for name, path in outputs.items():
+            if path is not None:
+                print(f"💾 Sweep {name}: {path}")
+        
+        return {'sweep': report, 'outputs': {name: str(path) for name, path in outputs.items() if path}}
+    
+    @staticmethod
+    def _resource_file(run_id: str) -> Path:
+        return Config.OUTPUTS_DIR / f"enhanced_benchmark_resources_{run_id}.jsonl"
+    
+    def _start_sampler(self, run_id: str) -> Optional[ResourceSampler]:
+        """Start the background resource sampler for a run (appending when the run is resumed)"""
+        if not self.resource_sampling:
+            return None
+        
+        def to_trace(sample: Dict[str, Any]):
+            # Counter tracks line the samples up with the task spans in the trace viewer
+            for name, fields in (('cpu_percent', ('cpu_percent', 'ollama_cpu_percent')),
+                                 ('memory_gb', ('available_gb', 'ollama_rss_gb', 'swap_used_gb')),
+                                 ('io_mb_s', ('disk_read_mb_s', 'disk_write_mb_s', 'swap_out_mb_s'))):
+                values = {field: sample[field] for field in fields if sample.get(field) is not None}
+                if values:
+                    self.tracer.add_counter(name, values)
+        
+        return ResourceSampler(self._resource_file(run_id), on_sample=to_trace).start()
+    
+    @staticmethod
+    def _resource_summary(store: ResultsStore, timeline: ResourceTimeline, run_id: str) -> Dict[str, Any]:
+        """Peak resource use over the run and the resources behind each model's response-time outliers"""
+        resources = {path.split('.', 1)[1]: np.asarray(store.column(path), dtype=np.float64)
+                     for path, _ in STORE_COLUMNS
+                     if path.startswith('resources.') and path in store.manifest['columns']}
+        return {
+            'samples': len(timeline),
+            'interval': timeline.interval,
+            'file': str(BenchmarkRunner._resource_file(run_id)),
+            'system': Config.get_system_info(),
+            'peak': timeline.peak(),
+            'outliers': outlier_report(np.asarray(store.column('response_time'), dtype=np.float64),
+                                       store.decode('model'), resources)
+        }
+    
+    def _finalize_run(self, journal: RunJournal, total_tests: int,
+                      scheduler: ModelAffinityScheduler, mode: str = "sync") -> Dict[str, Any]:
+        """Summarize and persist a finished run from its journal"""
+        
+        # Columnar store streamed from the journal; the summary is computed from its columns
+        run_id = journal.run_id
+        # Each executed task gets the resource aggregates of its window (all sessions of a resumed run)
+        timeline = ResourceTimeline.load(self._resource_file(run_id)) if self.resource_sampling else None
+        results = journal.results() if timeline is None else (timeline.annotate(r) for r in journal.results())
+        store = ResultsStore.write(Config.OUTPUTS_DIR / f"enhanced_benchmark_results_{run_id}", results)
         
         # Generate summary
-        summary = self._generate_summary(results)
+        summary = self._generate_summary(store)
+        if 'error' not in summary:
+            summary['model_scheduling'] = scheduler.timing_report(store.records())
+            if scheduler.limiters:
+                summary['adaptive_concurrency'] = scheduler.adaptive_report()
+            if scheduler.admission is not None:
+                summary['memory_admission'] = scheduler.admission.stats()
+            summary['stage_timings'] = self._stage_summary(store)
+            if self.response_cache is not None:
+                summary['response_cache'] = {**self.response_cache.stats(), 'replay': self.replay}
+            if self.prior_results is not None:
+                summary['incremental'] = {'reused_tasks': self.reused_tasks,
+                                          'executed_tasks': self.executed_tasks}
+            if timeline is not None and len(timeline):
+                summary['resources'] = self._resource_summary(store, timeline, run_id)
         
         # Save results
-        self._save_results(results, summary)
+        self._save_results(summary, store, run_id)
+        
+        if self.database is not None:
+            run_id = self.database.record_run(
+                run_id, store.records(), summary, journal.started_at, mode=mode + ("-replay" if self.replay else ""),
+                store_path=store.directory, config=store.metadata.get('config'),
+                stage_timings={model: {stage: value for stage, value in timing.items() if stage != 'tasks'}
+                               for model, timing in summary.get('model_scheduling', {}).items()},
+                resource_samples=timeline.samples if timeline is not None else None
+            )
+            print(f"   🗄️ History: run {run_id} in {self.database.path}")
         
         return {
-            'results': results,
+            'run_id': journal.run_id,
             'summary': summary,
-            'total_tests': len(tasks),
-            'completed_tests': len([r for r in results if r['status'] == 'success']),
-            'failed_tests': len([r for r in results if r['status'] == 'error'])
+            'total_tests': total_tests,
+            'completed_tests': int(store.mask(status='success').sum()),
+            'failed_tests': int(store.mask(status='error').sum())
         }
     
-    def _generate_summary(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @staticmethod
+    def _stage_summary(store: ResultsStore) -> Dict[str, Dict[str, float]]:
+        """Mean seconds per traced stage and model over tasks executed in this run"""
+        stages = {}
+        for path, _ in STORE_COLUMNS:
+            if path.startswith('stage_timings.') and path in store.manifest['columns']:
+                for model, seconds in store.group_mean(path, 'model').items():
+                    stages.setdefault(model, {})[path.split('.', 1)[1]] = seconds
+        return stages
+    
+    def _generate_summary(self, store: ResultsStore) -> Dict[str, Any]:
         """Generate comprehensive summary of benchmark results"""
         
-        successful_results = [r for r in results if r['status'] == 'success']
+        successful = store.mask(status='success')
         
-        if not successful_results:
+        if not successful.any():
             return {'error': 'No successful benchmark results'}
         
         # Calculate averages by model
         model_summaries = {}
         for model in Config.BENCHMARK_MODELS:
-            model_results = [r for r in successful_results if r['model'] == model]
-            if model_results:
-                model_summaries[model] = self._calculate_model_summary(model_results)
+            model_rows = successful & store.mask(model=model)
+            if model_rows.any():
+                model_summaries[model] = self._calculate_model_summary(store, model_rows)
         
         # Calculate overall averages
-        overall_summary = self._calculate_overall_summary(successful_results)
+        overall_summary = self._calculate_overall_summary(store, successful)
         
         # Planning detection statistics
-        planning_detected = sum(1 for r in successful_results if r.get('planning_detected', False))
-        planning_rate = planning_detected / len(successful_results) if successful_results else 0
+        total = int(successful.sum())
+        planning_detected = store.total('planning_detected', successful)
         
         return {
             'overall': overall_summary,
             'by_model': model_summaries,
             'planning_detection': {
                 'total_detected': planning_detected,
-                'detection_rate': planning_rate
+                'detection_rate': planning_detected / total,
+                'stream_restarts': store.total('planning_guard.restarts', successful),
+                'tokens_wasted': store.total('planning_guard.tokens_wasted', successful),
+                'tokens_saved': store.total('planning_guard.tokens_saved', successful)
             },
-            'total_results': len(successful_results),
+            'latency': self._latency_summary(store, successful),
+            'total_results': total,
             'timestamp': datetime.now().isoformat()
         }
     
-    def _calculate_model_summary(self, model_results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate summary for a specific model"""
+    @staticmethod
+    def _latency_summary(store: ResultsStore, rows: np.ndarray) -> Dict[str, Any]:
+        """Response time and TTFT percentiles/histograms, streamed row by row from the store columns"""
+        report = LatencyReport(metrics=('response_time', 'ttft'))
+        models, categories = store.decode('model'), store.decode('category')
+        temperatures = store.column('temperature')
+        response_times, ttfts = store.column('response_time'), store.column('generation_metrics.ttft')
         
-        scores = [r.get('comprehensive_score', 0) for r in model_results]
-        response_times = [r.get('response_time', 0) for r in model_results]
+        for i in np.flatnonzero(rows):
+            report.add({'response_time': float(response_times[i]), 'ttft': float(ttfts[i])},
+                       models[i], float(temperatures[i]), categories[i])
+        return report.summary()
+    
+    def _calculate_model_summary(self, store: ResultsStore, rows: np.ndarray) -> Dict[str, Any]:
+        """Calculate summary for a specific model"""
         
         return {
-            'avg_comprehensive_score': np.mean(scores),
-            'avg_response_time': np.mean(response_times),
-            'total_tests': len(model_results),
-            'temperature_breakdown': self._get_temperature_breakdown(model_results)
+            'avg_comprehensive_score': store.mean('comprehensive_score', rows),
+            'avg_response_time': store.mean('response_time', rows),
+            **self._get_generation_averages(store, rows),
+            'total_tests': int(rows.sum()),
+            'temperature_breakdown': self._get_temperature_breakdown(store, rows)
         }
     
-    def _calculate_overall_summary(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_overall_summary(self, store: ResultsStore, rows: np.ndarray) -> Dict[str, Any]:
         """Calculate overall summary statistics"""
         
-        scores = [r.get('comprehensive_score', 0) for r in results]
-        response_times = [r.get('response_time', 0) for r in results]
-        
         return {
-            'avg_comprehensive_score': np.mean(scores),
-            'avg_response_time': np.mean(response_times),
-            'total_tests': len(results),
-            'best_model': max(Config.BENCHMARK_MODELS, 
-                            key=lambda m: np.mean([r.get('comprehensive_score', 0) 
-                                                 for r in results if r['model'] == m]))
+            'avg_comprehensive_score': store.mean('comprehensive_score', rows),
+            'avg_response_time': store.mean('response_time', rows),
+            **self._get_generation_averages(store, rows),
+            'total_tests': int(rows.sum()),
+            'best_model': store.best_model(Config.BENCHMARK_MODELS, rows)
         }
     
-    def _get_temperature_breakdown(self, results: List[Dict[str, Any]]) -> Dict[str, float]:
+    def _get_generation_averages(self, store: ResultsStore, rows: np.ndarray) -> Dict[str, Any]:
+        """Average streaming metrics, ignoring results that lack a value"""
+        averages = {}
+        for metric in ['ttft', 'itl_p50', 'itl_p99', 'tokens_per_second',
+                       'prompt_eval_duration', 'eval_duration']:
+            averages[f'avg_{metric}'] = store.mean(f'generation_metrics.{metric}', rows)
+        return averages
+    
+    def _get_temperature_breakdown(self, store: ResultsStore, rows: np.ndarray) -> Dict[str, float]:
         """Get average scores by temperature"""
-        temp_scores = {}
-        for temp in Config.BENCHMARK_TEMPERATURES:
-            temp_results = [r for r in results if r['temperature'] == temp]
-            if temp_results:
-                scores = [r.get('comprehensive_score', 0) for r in temp_results]
-                temp_scores[f'temp_{temp}'] = np.mean(scores)
-        return temp_scores
-    
-    def _save_results(self, results: List[Dict[str, Any]], summary: Dict[str, Any]):
+        by_temperature = store.group_mean('comprehensive_score', 'temperature', rows)
+        return {f'temp_{temp}': by_temperature[temp]
+                for temp in Config.BENCHMARK_TEMPERATURES if temp in by_temperature}
+    
+    def _save_results(self, summary: Dict[str, Any], store: ResultsStore, timestamp: str):
         """Save results to files"""
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Run-level summary and config live in the store manifest
+        store.write_metadata(
+            summary=summary,
+            config={
+                'models': Config.BENCHMARK_MODELS,
+                'temperatures': Config.BENCHMARK_TEMPERATURES,
+                'scenarios': len(Config.BENCHMARK_SCENARIOS)
+            }
+        )
         
-        # Save detailed results as JSON
-        results_file = Config.OUTPUTS_DIR / f"enhanced_benchmark_results_{timestamp}.json"
-        with open(results_file, 'w') as f:
-            json.dump({
-                'results': results,
-                'summary': summary,
-                'config': {
-                    'models': Config.BENCHMARK_MODELS,
-                    'temperatures': Config.BENCHMARK_TEMPERATURES,
-                    'scenarios': len(Config.BENCHMARK_SCENARIOS)
-                }
-            }, f, indent=2)
+        # Save the exact contexts/prompts every model was scored against
+        contexts_file = Config.OUTPUTS_DIR / f"enhanced_benchmark_contexts_{timestamp}.json"
+        self.context_stage.save(contexts_file)
+        
+        # Stage spans as a Chrome trace (a resumed run gets its own file)
+        trace_file = None
+        if self.tracer.enabled:
+            suffix = f"_resumed_{datetime.now().strftime('%H%M%S')}" if self.resume_run else ""
+            trace_file = self.tracer.export(Config.OUTPUTS_DIR / f"enhanced_benchmark_trace_{timestamp}{suffix}.json",
+                                            metadata={'run_id': timestamp})
         
         # Save summary as CSV
         csv_file = Config.OUTPUTS_DIR / f"enhanced_benchmark_summary_{timestamp}.csv"
-        self._save_csv_summary(results, csv_file)
+        self._save_csv_summary(store.records(), csv_file)
+        
+        # Save latency percentiles and histogram buckets as CSV
+        latency_file = Config.OUTPUTS_DIR / f"enhanced_benchmark_latency_{timestamp}.csv"
+        self._save_latency_csv(summary.get('latency', {}), latency_file)
         
         # Save markdown table
         md_file = Config.OUTPUTS_DIR / f"enhanced_benchmark_table_{timestamp}.md"
-        self._save_markdown_table(results, summary, md_file)
+        self._save_markdown_table(store.records(), summary, md_file)
         
         print(f"💾 Results saved to:")
-        print(f"   📄 JSON: {results_file}")
+        print(f"   📦 Store: {store.directory}")
         print(f"   📊 CSV: {csv_file}")
+        print(f"   ⏱️ Latency: {latency_file}")
         print(f"   📋 MD: {md_file}")
+        print(f"   📚 Contexts: {contexts_file}")
+        if trace_file:
+            print(f"   🧵 Trace: {trace_file}")
     
-    def _save_csv_summary(self, results: List[Dict[str, Any]], filepath: Path):
+    def _save_csv_summary(self, results: Iterable[Dict[str, Any]], filepath: Path):
         """Save results summary as CSV"""
         
         with open(filepath, 'w', newline='') as f:
@@ -284,24 +857,77 @@ class BenchmarkRunner:
             # Header
             writer.writerow([
                 'Model', 'Temperature', 'Category', 'Comprehensive_Score',
-                'Response_Time', 'Word_Count', 'Citations', 'Planning_Detected'
+                'Response_Time', 'TTFT', 'ITL_P50', 'ITL_P90', 'ITL_P99', 'Tokens_Per_Sec',
+                'Prompt_Eval_Count', 'Prompt_Eval_Duration', 'Eval_Count', 'Eval_Duration',
+                'Word_Count', 'Citations', 'Planning_Detected', 'Planning_Restarts', 'Tokens_Wasted'
             ])
             
             # Data
             for result in results:
                 if result['status'] == 'success':
+                    generation = result.get('generation_metrics', {})
                     writer.writerow([
                         result['model'],
                         result['temperature'],
                         result['category'],
                         result.get('comprehensive_score', 0),
                         result.get('response_time', 0),
+                        generation.get('ttft'),
+                        generation.get('itl_p50'),
+                        generation.get('itl_p90'),
+                        generation.get('itl_p99'),
+                        generation.get('tokens_per_second'),
+                        generation.get('prompt_eval_count'),
+                        generation.get('prompt_eval_duration'),
+                        generation.get('eval_count'),
+                        generation.get('eval_duration'),
                         result.get('metrics', {}).get('word_count', 0),
                         result.get('metrics', {}).get('citation_count', 0),
-                        result.get('planning_detected', False)
+                        result.get('planning_detected', False),
+                        result.get('planning_guard', {}).get('restarts', 0),
+                        result.get('planning_guard', {}).get('tokens_wasted', 0)
                     ])
     
-    def _save_markdown_table(self, results: List[Dict[str, Any]], summary: Dict[str, Any], filepath: Path):
+    def _save_latency_csv(self, latency: Dict[str, Any], filepath: Path):
+        """Save latency percentiles and histogram bucket counts per model, temperature and category"""
+        
+        rows = list(latency_rows(latency))
+        buckets = list(rows[0][3]['histogram']) if rows else []
+        percentiles = [f'p{q:g}' for q in Config.LATENCY_PERCENTILES]
+        
+        with open(filepath, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Metric', 'Scope', 'Group', 'Count', 'Mean', 'Min', 'Max'] +
+                            [p.upper() for p in percentiles] + buckets)
+            for metric, scope, group, stats in rows:
+                writer.writerow([metric, scope, group, stats['count'], stats['mean'], stats['min'], stats['max']] +
+                                [stats[p] for p in percentiles] + [stats['histogram'][b] for b in buckets])
+    
+    def _write_latency_markdown(self, f, latency: Dict[str, Any]):
+        """Percentile tables per grouping and the response-time histogram by model"""
+        percentiles = [f'p{q:g}' for q in Config.LATENCY_PERCENTILES]
+        labels = {'response_time': "Response Time", 'ttft': "TTFT"}
+        
+        for metric, scopes in latency.items():
+            f.write(f"\n## {labels.get(metric, metric)} Percentiles\n\n")
+            f.write("| Group | Tests | Mean | " + " | ".join(p.upper() for p in percentiles) + " | Max |\n")
+            f.write("|-------|-------|------|" + "|".join("-----" for _ in percentiles) + "|-----|\n")
+            for _, scope, group, stats in latency_rows({metric: scopes}):
+                label = "All" if scope == 'overall' else f"{scope}: {group}"
+                f.write(f"| {label} | {stats['count']} | {_fmt(stats['mean'], 's')} | " +
+                        " | ".join(_fmt(stats[p], 's') for p in percentiles) +
+                        f" | {_fmt(stats['max'], 's')} |\n")
+        
+        by_model = latency.get('response_time', {}).get('by_model', {})
+        if by_model:
+            models = list(by_model)
+            f.write("\n## Response Time Histogram\n\n")
+            f.write("| Bucket | " + " | ".join(models) + " |\n")
+            f.write("|--------|" + "|".join("-----" for _ in models) + "|\n")
+            for bucket in by_model[models[0]]['histogram']:
+                f.write(f"| {bucket} | " + " | ".join(str(by_model[m]['histogram'][bucket]) for m in models) + " |\n")
+    
+    def _save_markdown_table(self, results: Iterable[Dict[str, Any]], summary: Dict[str, Any], filepath: Path):
         """Save results as markdown table"""
         
         with open(filepath, 'w') as f:
@@ -314,44 +940,157 @@ class BenchmarkRunner:
             f.write(f"- **Average Score**: {summary['overall']['avg_comprehensive_score']:.2f}\n")
             f.write(f"- **Average Response Time**: {summary['overall']['avg_response_time']:.2f}s\n")
             f.write(f"- **Best Model**: {summary['overall']['best_model']}\n")
-            f.write(f"- **Planning Detection Rate**: {summary['planning_detection']['detection_rate']:.1%}\n\n")
+            f.write(f"- **Planning Detection Rate**: {summary['planning_detection']['detection_rate']:.1%}\n")
+            planning = summary['planning_detection']
+            f.write(f"- **Planning Restarts**: {planning.get('stream_restarts', 0)} "
+                   f"({planning.get('tokens_wasted', 0)} tokens wasted, ~{planning.get('tokens_saved', 0)} saved)\n\n")
             
             # Model comparison table
             f.write("## Model Performance Comparison\n\n")
-            f.write("| Model | Avg Score | Avg Response Time | Tests |\n")
-            f.write("|-------|-----------|-------------------|-------|\n")
+            f.write("| Model | Avg Score | Avg Response Time | P95 Response Time | P99 Response Time | Avg TTFT | "
+                   "Avg Prefill | Avg Decode tok/s | Tests |\n")
+            f.write("|-------|-----------|-------------------|-------------------|-------------------|----------|"
+                   "-------------|------------------|-------|\n")
             
+            response_latency = summary.get('latency', {}).get('response_time', {}).get('by_model', {})
             for model, model_summary in summary['by_model'].items():
+                tail = response_latency.get(model, {})
                 f.write(f"| {model} | {model_summary['avg_comprehensive_score']:.2f} | "
-                       f"{model_summary['avg_response_time']:.2f}s | {model_summary['total_tests']} |\n")
+                       f"{model_summary['avg_response_time']:.2f}s | "
+                       f"{_fmt(tail.get('p95'), 's')} | {_fmt(tail.get('p99'), 's')} | "
+                       f"{_fmt(model_summary.get('avg_ttft'), 's')} | "
+                       f"{_fmt(model_summary.get('avg_prompt_eval_duration'), 's')} | "
+                       f"{_fmt(model_summary.get('avg_tokens_per_second'))} | "
+                       f"{model_summary['total_tests']} |\n")
+            
+            if summary.get('model_scheduling'):
+                f.write("\n## Model Scheduling\n\n")
+                f.write("| Model | Phase Wall Time | Model Load | Generation | Tests |\n")
+                f.write("|-------|-----------------|------------|------------|-------|\n")
+                for model, timing in summary['model_scheduling'].items():
+                    f.write(f"| {model} | {timing['phase_wall_time']:.2f}s | {timing['load_time']:.2f}s | "
+                           f"{timing['generation_time']:.2f}s | {timing['tasks']} |\n")
+            
+            if summary.get('latency'):
+                self._write_latency_markdown(f, summary['latency'])
             
             f.write("\n## Detailed Results\n\n")
-            f.write("| Model | Temp | Category | Score | Time | Words | Citations | Planning |\n")
-            f.write("|-------|------|----------|-------|------|-------|-----------|----------|\n")
+            f.write("| Model | Temp | Category | Score | Time | TTFT | Prefill | Decode tok/s | ITL p50/p99 | Words | Citations | Planning |\n")
+            f.write("|-------|------|----------|-------|------|------|---------|--------------|-------------|-------|-----------|----------|\n")
             
             for result in results:
                 if result['status'] == 'success':
+                    generation = result.get('generation_metrics', {})
+                    itl_p50 = generation.get('itl_p50')
+                    itl_p99 = generation.get('itl_p99')
                     f.write(f"| {result['model']} | {result['temperature']} | {result['category']} | "
                            f"{result.get('comprehensive_score', 0):.2f} | "
                            f"{result.get('response_time', 0):.2f}s | "
+                           f"{_fmt(generation.get('ttft'), 's')} | "
+                           f"{_fmt(generation.get('prompt_eval_duration'), 's')} | "
+                           f"{_fmt(generation.get('tokens_per_second'))} | "
+                           f"{_fmt(itl_p50 * 1000 if itl_p50 is not None else None, 'ms', 0)}/"
+                           f"{_fmt(itl_p99 * 1000 if itl_p99 is not None else None, 'ms', 0)} | "
                            f"{result.get('metrics', {}).get('word_count', 0)} | "
                            f"{result.get('metrics', {}).get('citation_count', 0)} | "
                            f"{'Yes' if result.get('planning_detected', False) else 'No'} |\n")
 
+def _fmt(value, unit: str = "", digits: int = 2) -> str:
+    """Format an optional metric for Markdown tables"""
+    if value is None:
+        return "n/a"
+    return f"{value:.{digits}f}{unit}"
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse benchmarking command-line options"""
+    parser = argparse.ArgumentParser(description="Legal AI benchmarking")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Run on an asyncio event loop with the pooled AsyncOllamaClient "
+                             "(hosts from OLLAMA_HOSTS)")
+    parser.add_argument('--replay', action='store_true',
+                        help="Serve every generation from the response cache and only re-score; "
+                             "cache misses are reported as failed tests")
+    parser.add_argument('--contexts', type=Path, default=None,
+                        help="Pin retrieved contexts and system prompts from an earlier enhanced_benchmark_contexts_*.json file")
+    parser.add_argument('--resume', dest='resume_run', default=None, metavar='RUN_ID',
+                        help="Continue an interrupted run from its journal, skipping completed tasks")
+    parser.add_argument('--incremental', action='store_true', default=Config.ENABLE_INCREMENTAL_RUNS,
+                        help="Only execute tasks whose fingerprint (model, effective temperature, scenario, "
+                             "context, system prompt, generator code) is new; reuse journaled results for the rest")
+    parser.add_argument('--no-trace', dest='trace', action='store_false', default=Config.ENABLE_TRACING,
+                        help="Do not write the Chrome trace of per-task stage spans")
+    parser.add_argument('--sweep-concurrency', action='store_true',
+                        help="Measure throughput and p95 latency per model at each concurrency level "
+                             "(uncached) and write the recommended per-model concurrency to the tuned profile")
+    parser.add_argument('--levels', type=int, nargs='+', default=None, metavar='N',
+                        help="Concurrency levels for --sweep-concurrency (default CONCURRENCY_SWEEP_LEVELS)")
+    parser.add_argument('--no-tuned-profile', dest='tuned_profile', action='store_false',
+                        default=Config.USE_TUNED_PROFILE,
+                        help="Ignore the tuned profile and use MAX_CONCURRENT_REQUESTS for every model")
+    parser.add_argument('--no-adaptive', dest='adaptive', action='store_false',
+                        default=Config.ENABLE_ADAPTIVE_CONCURRENCY,
+                        help="Keep a fixed in-flight limit per model instead of adapting it to latency and errors")
+    parser.add_argument('--no-memory-admission', dest='memory_admission', action='store_false',
+                        default=Config.ENABLE_MEMORY_ADMISSION,
+                        help="Dispatch tasks without checking available memory and swap first")
+    parser.add_argument('--no-resource-sampling', dest='resource_sampling', action='store_false',
+                        default=Config.ENABLE_RESOURCE_SAMPLING,
+                        help="Do not sample CPU, Ollama RSS, memory, swap and disk I/O during the run")
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        default=Config.ENABLE_RESPONSE_CACHE,
+                        help="Always call the model and do not write to the response cache")
+    return parser.parse_args(argv)
+
 def main():
     """Main entry point for benchmarking"""
     
+    args = parse_args()
+    runner = None
+    
     try:
-        runner = BenchmarkRunner()
-        benchmark_results = runner.run_parallel_benchmarks()
+        if args.sweep_concurrency:
+            # Every task must reach the model, and the sweep must not feed itself its own profile
+            runner = BenchmarkRunner(use_cache=False, contexts_file=args.contexts, incremental=False,
+                                     trace=False, tuned_profile=False)
+            runner.sweep_concurrency(args.levels)
+            return
+        runner = BenchmarkRunner(replay=args.replay, use_cache=args.use_cache,
+                                 contexts_file=args.contexts, resume_run=args.resume_run,
+                                 incremental=args.incremental, trace=args.trace,
+                                 tuned_profile=args.tuned_profile, adaptive=args.adaptive,
+                                 memory_admission=args.memory_admission,
+                                 resource_sampling=args.resource_sampling)
+        if args.use_async:
+            benchmark_results = asyncio.run(runner.run_async_benchmarks())
+        else:
+            benchmark_results = runner.run_parallel_benchmarks()
         
         print("\n🎉 Benchmarking completed successfully!")
         print(f"✅ Completed: {benchmark_results['completed_tests']} tests")
         print(f"❌ Failed: {benchmark_results['failed_tests']} tests")
         print(f"📊 Overall Average Score: {benchmark_results['summary']['overall']['avg_comprehensive_score']:.2f}")
+        for model, timing in benchmark_results['summary'].get('model_scheduling', {}).items():
+            print(f"⏱️ {model}: {timing['load_time']:.1f}s model load, "
+                  f"{timing['generation_time']:.1f}s generation, {timing['phase_wall_time']:.1f}s wall")
+        admission = benchmark_results['summary'].get('memory_admission')
+        if admission and admission['deferrals']:
+            print(f"🧠 Memory admission deferred dispatch {admission['deferrals']} time(s) "
+                  f"for {admission['deferred_seconds']:.1f}s (min {admission['min_available_gb']:.1f}GB available)")
+        peak = benchmark_results['summary'].get('resources', {}).get('peak')
+        if peak:
+            print(f"🖥️ Resources: peak CPU {_fmt(peak['cpu_percent_max'], '%', 0)}, "
+                  f"Ollama RSS {_fmt(peak['ollama_rss_gb_max'], 'GB', 1)}, "
+                  f"min available {_fmt(peak['available_gb_min'], 'GB', 1)}, "
+                  f"swap {_fmt(peak['swap_used_gb_max'], 'GB', 1)}")
+        for model, limits in benchmark_results['summary'].get('adaptive_concurrency', {}).items():
+            print(f"🎚️ {model}: in-flight limit {limits['initial_limit']} -> {limits['final_limit']} "
+                  f"(range {limits['min_limit_reached']}-{limits['max_limit_reached']})")
         
-    except Exception as e:
-        print(f"❌ Benchmarking failed: {e}")
+    except (Exception, KeyboardInterrupt) as e:
+        print(f"❌ Benchmarking failed: {e!r}" if isinstance(e, KeyboardInterrupt) else f"❌ Benchmarking failed: {e}")
+        if runner is not None and runner.run_id:
+            print(f"↩️ Completed tasks are journaled; continue with: "
+                  f"python3 src/benchmarking.py --resume {runner.run_id}")
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Chat Payload Builder for Legal AI Benchmarking
+Single /api/chat request body shared by the sync and async Ollama clients and the response cache key
+"""
+from typing import Dict, Any
+
+def build_chat_payload(model: str, prompt: str, system_prompt: str = "", temperature: float = 0.7,
+                       seed: int = 42, stream: bool = False) -> Dict[str, Any]:
+    """Build an /api/chat payload (every client sends exactly this body)"""
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+
+    return {
+        "model": model,
+        "messages": messages,
+        "stream": stream,
+        "options": {
+            "temperature": temperature,
+            "top_p": 0.9,
+            "num_predict": 2048,
+            "seed": seed
+        }
+    }
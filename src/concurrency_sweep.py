@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Concurrency Sweep for Legal AI Benchmarking
+Measures throughput against p95 latency per model and writes a tuned per-model concurrency profile
+"""
+import json
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional, Sequence
+
+from config import Config
+from latency_histogram import LatencyHistogram
+from task_scheduler import ModelAffinityScheduler
+
+# Optional dependency: matplotlib for the throughput/latency plot
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+def sweep_tasks(model: str, count: int) -> List[tuple]:
+    """Fixed task set for one model: the scenario x temperature matrix, cycled to count tasks"""
+    matrix = [(model, temperature, scenario)
+              for temperature in Config.BENCHMARK_TEMPERATURES
+              for scenario in Config.BENCHMARK_SCENARIOS]
+    return [matrix[i % len(matrix)] for i in range(count)]
+
+def recommend(levels: List[Dict[str, Any]], latency_factor: float = 2.0,
+              throughput_share: float = 0.95) -> Optional[Dict[str, Any]]:
+    """Smallest concurrency within throughput_share of the best throughput under the latency budget.
+
+    The budget is latency_factor times the p95 at the lowest concurrency;
+    levels with errors are never recommended. Taking the smallest level
+    near the peak leaves headroom instead of chasing noise.
+    """
+    usable = [level for level in levels if not level['errors'] and level['p95_latency'] is not None]
+    if not usable:
+        return None
+    budget = latency_factor * min(usable, key=lambda level: level['concurrency'])['p95_latency']
+    within = [level for level in usable if level['p95_latency'] <= budget] or usable[:1]
+    best = max(level['tasks_per_minute'] for level in within)
+    chosen = min((level for level in within if level['tasks_per_minute'] >= throughput_share * best),
+                 key=lambda level: level['concurrency'])
+    return {**chosen, 'p95_budget': budget}
+
+class ConcurrencySweep:
+    """Runs the same task set at each concurrency level, one model at a time.
+
+    run_task is BenchmarkRunner.run_single_benchmark (with the response
+    cache off, so every task really generates). Each model gets one
+    warm-up task first so model load time is not charged to level 1.
+    """
+
+    def __init__(self, run_task: Callable[..., Dict[str, Any]],
+                 unload_model: Optional[Callable[[str], Any]] = None):
+        self.run_task = run_task
+        self.unload_model = unload_model
+
+    def run_level(self, model: str, concurrency: int, tasks: List[tuple]) -> Dict[str, Any]:
+        scheduler = ModelAffinityScheduler(max_concurrency=concurrency)
+        latency = LatencyHistogram()
+        counts = {'errors': 0, 'tokens': 0}
+
+        def on_result(result: Dict[str, Any]):
+            if result.get('status') != 'success':
+                counts['errors'] += 1
+                return
+            latency.add(result.get('response_time'))
+            counts['tokens'] += (result.get('generation_metrics') or {}).get('eval_count') or 0
+
+        start = time.perf_counter()
+        scheduler.run(tasks, self.run_task, on_result=on_result, collect=False)
+        wall = time.perf_counter() - start
+
+        return {
+            'concurrency': concurrency,
+            'tasks': len(tasks),
+            'errors': counts['errors'],
+            'wall_time': wall,
+            'tasks_per_minute': 60.0 * latency.count / wall if wall > 0 else 0.0,
+            'tokens_per_second': counts['tokens'] / wall if wall > 0 else 0.0,
+            'p50_latency': latency.percentile(50),
+            'p95_latency': latency.percentile(95)
+        }
+
+    def run(self, models: Sequence[str], levels: Sequence[int], tasks_per_level: int,
+            latency_factor: float = 2.0) -> Dict[str, Any]:
+        report = {}
+        previous = None
+
+        for model in models:
+            if previous is not None and self.unload_model is not None:
+                try:
+                    self.unload_model(previous)
+                except Exception as e:
+                    logger.warning(f"Could not unload {previous}: {e}")
+            tasks = sweep_tasks(model, tasks_per_level)
+            self.run_task(*tasks[0])
+
+            results = []
+            for concurrency in sorted(levels):
+                print(f"🎛️ {model}: concurrency {concurrency} over {len(tasks)} tasks...")
+                level = self.run_level(model, concurrency, tasks)
+                results.append(level)
+                print(f"   {level['tasks_per_minute']:.1f} tasks/min, {level['tokens_per_second']:.1f} tok/s, "
+                      f"p95 {_seconds(level['p95_latency'])}, {level['errors']} errors")
+
+            report[model] = {'levels': results, 'recommended': recommend(results, latency_factor)}
+            previous = model
+
+        return report
+
+def _seconds(value: Optional[float]) -> str:
+    return f"{value:.2f}s" if value is not None else "n/a"
+
+def write_profile(report: Dict[str, Any], path: Optional[Path] = None, hosts: Optional[List[str]] = None) -> Path:
+    """Save the recommended per-model concurrency (plus the sweep behind it) as the tuned profile"""
+    path = Path(path or Config.TUNED_PROFILE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profile = {
+        'generated_at': datetime.now().isoformat(),
+        'hosts': hosts or [Config.OLLAMA_BASE_URL],
+        'model_concurrency': {model: entry['recommended']['concurrency']
+                              for model, entry in report.items() if entry['recommended']},
+        'sweep': report
+    }
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    return path
+
+def load_tuned_concurrency(path: Optional[Path] = None) -> Dict[str, int]:
+    """Per-model request concurrency from the tuned profile ({} when there is none)"""
+    path = Path(path or Config.TUNED_PROFILE_PATH)
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r') as f:
+            profile = json.load(f)
+        return {model: max(1, int(value)) for model, value in profile.get('model_concurrency', {}).items()}
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"Ignoring unreadable tuned profile {path}: {e}")
+        return {}
+
+def write_markdown(report: Dict[str, Any], path: Path) -> Path:
+    with open(path, 'w') as f:
+        f.write("# Concurrency Sweep\n\n")
+        f.write(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write("| Model | Concurrency | Tasks/min | Tokens/s | P50 Latency | P95 Latency | Errors | Recommended |\n")
+        f.write("|-------|-------------|-----------|----------|-------------|-------------|--------|-------------|\n")
+        for model, entry in report.items():
+            chosen = (entry['recommended'] or {}).get('concurrency')
+            for level in entry['levels']:
+                f.write(f"| {model} | {level['concurrency']} | {level['tasks_per_minute']:.1f} | "
+                        f"{level['tokens_per_second']:.1f} | {_seconds(level['p50_latency'])} | "
+                        f"{_seconds(level['p95_latency'])} | {level['errors']} | "
+                        f"{'✅' if level['concurrency'] == chosen else ''} |\n")
+    return path
+
+def plot_sweep(report: Dict[str, Any], path: Path) -> Optional[Path]:
+    """Throughput (tasks/min, tokens/s) against p95 latency, one line per model, points labelled by concurrency"""
+    if not MATPLOTLIB_AVAILABLE:
+        logger.info("matplotlib not installed; skipping the concurrency sweep plot")
+        return None
+
+    figure, axes = plt.subplots(1, 2, figsize=(12, 5))
+    for axis, metric, label in ((axes[0], 'tasks_per_minute', "Tasks / min"),
+                                (axes[1], 'tokens_per_second', "Tokens / s")):
+        for model, entry in report.items():
+            levels = [level for level in entry['levels'] if level['p95_latency'] is not None]
+            x = [level['p95_latency'] for level in levels]
+            y = [level[metric] for level in levels]
+            axis.plot(x, y, marker='o', label=model)
+            for level, xi, yi in zip(levels, x, y):
+                axis.annotate(str(level['concurrency']), (xi, yi), textcoords="offset points", xytext=(4, 4))
+        axis.set_xlabel("p95 latency (s)")
+        axis.set_ylabel(label)
+        axis.grid(True, alpha=0.3)
+    axes[0].legend()
+    figure.suptitle("Throughput vs p95 latency by concurrency")
+    figure.tight_layout()
+    figure.savefig(path, dpi=120)
+    plt.close(figure)
+    return path
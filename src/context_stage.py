@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Context Retrieval Stage for Legal AI Benchmarking
+Resolves each unique question once per run and shares it across models and temperatures
+"""
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Any, Callable, Hashable
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+class ContextRetrievalStage:
+    """Memoized, single-flight retrieval and prompt building"""
+
+    def __init__(self, retrieve: Callable[[str], str], build_prompt: Callable[[str, str, str], str]):
+        self._retrieve = retrieve
+        self._build_prompt = build_prompt
+        self._lock = threading.Lock()
+        self._futures: Dict[Hashable, Future] = {}
+        self.retrievals = 0
+
+    @staticmethod
+    def context_id(context: str) -> str:
+        return hashlib.sha256(context.encode('utf-8')).hexdigest()[:16]
+
+    def _single_flight(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Run compute once per key; concurrent callers wait for the same result"""
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+
+        if owner:
+            try:
+                future.set_result(compute())
+            except Exception as e:
+                # Let a later task retry instead of caching the failure
+                with self._lock:
+                    del self._futures[key]
+                future.set_exception(e)
+
+        return future.result()
+
+    def get_context(self, question: str) -> str:
+        def retrieve():
+            self.retrievals += 1
+            return self._retrieve(question)
+
+        return self._single_flight(('context', question), retrieve)
+
+    def get_prompt(self, model: str, question: str) -> str:
+        """System prompt for a model, built once from the shared context"""
+        return self._single_flight(
+            ('prompt', model, question),
+            lambda: self._build_prompt(model, question, self.get_context(question))
+        )
+
+    def _resolved(self, kind: str) -> Dict[tuple, Any]:
+        with self._lock:
+            items = list(self._futures.items())
+        return {key[1:]: future.result() for key, future in items
+                if key[0] == kind and future.done() and future.exception() is None}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contexts and built prompts resolved so far, keyed by question"""
+        contexts = self._resolved('context')
+        prompts = self._resolved('prompt')
+
+        snapshot = {}
+        for (question,), context in contexts.items():
+            snapshot[question] = {
+                'context_id': self.context_id(context),
+                'context': context,
+                'system_prompts': {model: prompt for (model, q), prompt in prompts.items() if q == question}
+            }
+        return snapshot
+
+    def save(self, filepath: Path):
+        with open(filepath, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    @staticmethod
+    def _pinned(value: Any) -> Future:
+        future = Future()
+        future.set_result(value)
+        return future
+
+    def load(self, filepath: Path):
+        """Pin contexts and built system prompts from an earlier run so the same bytes are scored again.
+
+        Models with no saved prompt get one built from the pinned context.
+        """
+        with open(filepath, 'r') as f:
+            snapshot = json.load(f)
+
+        prompts = 0
+        with self._lock:
+            for question, entry in snapshot.items():
+                self._futures[('context', question)] = self._pinned(entry['context'])
+                for model, prompt in (entry.get('system_prompts') or {}).items():
+                    self._futures[('prompt', model, question)] = self._pinned(prompt)
+                    prompts += 1
+
+        logger.info(f"Pinned {len(snapshot)} contexts and {prompts} system prompts from {filepath}")
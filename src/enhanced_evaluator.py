@@ -7,12 +7,63 @@ import re
 import torch
 import numpy as np
 import logging
-from typing import Dict, List, Tuple, Any
-from dataclasses import dataclass
+from typing import Dict, List, Tuple, Any, Union, Sequence, Optional
+from dataclasses import dataclass, field
+
+from config import Config
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Citation counting (statutes, years, case names, reporters)
+CITATION_PATTERN = re.compile(r'\d+ U\.S\.C\.|\(\d{4}\)|v\.|, \d+ F\.')
+
+# Citations that can be checked against the database (zero-hallucination)
+SOURCE_CITATION_PATTERN = re.compile(r'\d+ U\.S\.C\. § \d+|\(\d{4}\)|v\. [A-Z]|, \d+ F\.|NY Slip Op')
+
+SECTION_NAMES = ['Introduction', 'Analysis', 'Conclusion']
+
+@dataclass
+class ResponseFeatures:
+    """Response properties shared by every metric, extracted once per response"""
+    text: str
+    lower: str
+    words: List[str]
+    citations: List[str]
+    paragraph_breaks: int
+    sections: Dict[str, bool]
+    has_memo_header: bool
+    has_source_citation: bool
+    _terms: Dict[str, bool] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_response(cls, response: str) -> "ResponseFeatures":
+        response = response or ""
+        return cls(
+            text=response,
+            lower=response.lower(),
+            words=response.split(),
+            citations=CITATION_PATTERN.findall(response),
+            paragraph_breaks=response.count('\n\n'),
+            sections={name: name in response for name in SECTION_NAMES},
+            has_memo_header=any([
+                'To:' in response and 'From:' in response and 'Subject:' in response,
+                '**To:**' in response and '**From:**' in response and '**Subject:**' in response,
+                'Memo' in response[:100]
+            ]),
+            has_source_citation=bool(SOURCE_CITATION_PATTERN.search(response))
+        )
+
+    def contains(self, term: str) -> bool:
+        """Case-insensitive substring test, memoized per term"""
+        hit = self._terms.get(term)
+        if hit is None:
+            hit = term.lower() in self.lower
+            self._terms[term] = hit
+        return hit
+
+ResponseLike = Union[str, ResponseFeatures]
+
 @dataclass
 class EnhancedMetrics:
     """Enhanced metrics for legal memo evaluation"""
@@ -33,110 +84,110 @@ class EnhancedMetrics:
 class EnhancedEvaluator:
     """Enhanced evaluation with new metrics and reproducible scoring"""
     
-    def __init__(self):
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
         # Set fixed seed for reproducibility
         torch.manual_seed(42)
         np.random.seed(42)
         
-        # Define evaluation weights (no structure penalties)
-        self.weights = {
-            'completeness': 0.25,
-            'alignment': 0.15,
-            'zero_hallucination': 0.20,
-            'accuracy': 0.15,
-            'citations': 0.10,
-            'clarity': 0.10,
-            'aspect_coverage': 0.05
-        }
+        # Evaluation weights (no structure penalties); defaults to Config.METRIC_WEIGHTS
+        self.weights = dict(weights if weights is not None else Config.METRIC_WEIGHTS)
+    
+    # Expected content per scenario category
+    expected_content = {
+        'legal memo': ['pregnancy discrimination act', 'pda', 'title vii', 'equal treatment'],
+        'accommodation analysis': ['reasonable accommodation', 'light duty', 'ada', 'modified work'],
+        'fmla brief': ['fmla', 'family medical leave', '12 weeks', 'job protection'],
+        'lactation rights memo': ['lactation', 'breastfeeding', 'pump', 'break time', 'private space'],
+        'discrimination case analysis': ['discrimination', 'harassment', 'termination', 'case examples'],
+        'remedies brief': ['damages', 'injunctive relief', 'attorney fees', 'back pay'],
+        'ny state law analysis': ['new york', 'ny', 'state law', 'human rights', 'enhanced rights'],
+        'documentation guide': ['documentation', 'evidence', 'timeline', 'practical advice'],
+        'pda memo': ['pregnancy discrimination act', 'pda', 'title vii', 'equal treatment'],
+        'fmla accommodations': ['fmla', 'family medical leave', 'reasonable accommodation', 'light duty'],
+        'ny law': ['new york', 'ny', 'state law', 'human rights', 'enhanced rights'],
+        'remedies': ['damages', 'injunctive relief', 'attorney fees', 'back pay']
+    }
     
-    def evaluate_response_completeness(self, response: str) -> float:
+    legal_terms = [
+        'pregnancy discrimination', 'title vii', 'fmla', 'ada',
+        'reasonable accommodation', 'statute', 'regulation', 'case law'
+    ]
+    question_legal_terms = ['pregnancy', 'discrimination', 'accommodation', 'fmla', 'lactation', 'remedies']
+    professional_indicators = ['legal', 'authority', 'statute', 'regulation']
+    explaining_indicators = ['because', 'therefore', 'thus', 'as a result', 'consequently']
+    
+    @staticmethod
+    def extract_features(response: ResponseLike) -> ResponseFeatures:
+        """Features for a response (passed through if already extracted)"""
+        if isinstance(response, ResponseFeatures):
+            return response
+        return ResponseFeatures.from_response(response)
+    
+    def evaluate_response_completeness(self, response: ResponseLike) -> float:
         """Evaluate if response is a complete memo (1-10 scale)"""
         
-        if not response:
+        features = self.extract_features(response)
+        if not features.text:
             return 1.0
         
         score = 0.0
         
         # Check for memo structure (3 points)
-        has_memo_structure = any([
-            'To:' in response and 'From:' in response and 'Subject:' in response,
-            '**To:**' in response and '**From:**' in response and '**Subject:**' in response,
-            'Memo' in response[:100]
-        ])
-        
-        if has_memo_structure:
+        if features.has_memo_header:
             score += 3.0
         
         # Check for legal analysis components (3 points)
         has_analysis = any([
-            'Analysis' in response,
-            'Introduction' in response,
-            'Conclusion' in response,
-            'legal authority' in response.lower(),
-            'citation' in response.lower()
+            features.sections['Analysis'],
+            features.sections['Introduction'],
+            features.sections['Conclusion'],
+            features.contains('legal authority'),
+            features.contains('citation')
         ])
         
         if has_analysis:
             score += 3.0
         
         # Check for citations (2 points)
-        has_citations = bool(re.search(r'\d+ U\.S\.C\.|\(\d{4}\)|v\.|, \d+ F\.', response))
-        if has_citations:
+        if features.citations:
             score += 2.0
         
         # Check for substantial content (2 points)
-        if len(response) > 500:
+        if len(features.text) > 500:
             score += 2.0
-        elif len(response) > 300:
+        elif len(features.text) > 300:
             score += 1.0
         
         return min(10.0, score)
     
-    def evaluate_alignment_to_question(self, response: str, question: str, category: str) -> float:
+    def evaluate_alignment_to_question(self, response: ResponseLike, question: str, category: str) -> float:
         """Evaluate how well response aligns with the question focus (1-10 scale)"""
         
-        if not response or not question:
+        features = self.extract_features(response)
+        if not features.text or not question:
             return 1.0
         
         # Extract key terms from question and category
         question_lower = question.lower()
-        category_lower = category.lower()
-        
-        # Define expected content based on category
-        expected_content = {
-            'legal memo': ['pregnancy discrimination act', 'pda', 'title vii', 'equal treatment'],
-            'accommodation analysis': ['reasonable accommodation', 'light duty', 'ada', 'modified work'],
-            'fmla brief': ['fmla', 'family medical leave', '12 weeks', 'job protection'],
-            'lactation rights memo': ['lactation', 'breastfeeding', 'pump', 'break time', 'private space'],
-            'discrimination case analysis': ['discrimination', 'harassment', 'termination', 'case examples'],
-            'remedies brief': ['damages', 'injunctive relief', 'attorney fees', 'back pay'],
-            'ny state law analysis': ['new york', 'ny', 'state law', 'human rights', 'enhanced rights'],
-            'documentation guide': ['documentation', 'evidence', 'timeline', 'practical advice'],
-            'pda memo': ['pregnancy discrimination act', 'pda', 'title vii', 'equal treatment'],
-            'fmla accommodations': ['fmla', 'family medical leave', 'reasonable accommodation', 'light duty'],
-            'ny law': ['new york', 'ny', 'state law', 'human rights', 'enhanced rights'],
-            'remedies': ['damages', 'injunctive relief', 'attorney fees', 'back pay']
-        }
         
         # Check for expected content
         score = 0.0
-        expected_terms = expected_content.get(category_lower, [])
+        expected_terms = self.expected_content.get(category.lower(), [])
         
         for term in expected_terms:
-            if term in response.lower():
+            if features.contains(term):
                 score += 1.0
         
         # Check for federal vs local focus
-        if 'federal' in question_lower and 'federal' in response.lower():
+        if 'federal' in question_lower and features.contains('federal'):
             score += 1.0
-        if 'new york' in question_lower and 'new york' in response.lower():
+        if 'new york' in question_lower and features.contains('new york'):
             score += 1.0
         
         # Check for specific legal concepts mentioned in question
         question_terms = question_lower.split()
-        legal_terms = ['pregnancy', 'discrimination', 'accommodation', 'fmla', 'lactation', 'remedies']
-        for term in legal_terms:
-            if term in question_terms and term in response.lower():
+        for term in self.question_legal_terms:
+            if term in question_terms and features.contains(term):
                 score += 0.5
         
         # Normalize to 1-10 scale
@@ -145,74 +196,54 @@ class EnhancedEvaluator:
         
         return normalized_score
     
-    def evaluate_zero_hallucination_compliance(self, response: str, context: str) -> float:
+    def evaluate_zero_hallucination_compliance(self, response: ResponseLike, context: str) -> float:
         """Enhanced zero-hallucination compliance scoring"""
         
-        if not response:
+        features = self.extract_features(response)
+        if not features.text:
             return 1.0
         
         score = 0.0
         
-        # Extract citations from response
-        citation_patterns = [
-            r'\d+ U\.S\.C\. \§ \d+',  # Federal statutes
-            r'\(\d{4}\)',  # Year citations
-            r'v\. [A-Z]',  # Case names
-            r', \d+ F\.',  # Federal cases
-            r'NY Slip Op',  # NY cases
-        ]
-        
-        citations_found = []
-        for pattern in citation_patterns:
-            citations_found.extend(re.findall(pattern, response))
-        
-        # Check for "No relevant DB info" when appropriate
-        has_fallback = 'no relevant db info' in response.lower()
-        
         # Calculate compliance score
-        if citations_found:
+        if features.has_source_citation:
             score += 4.0  # Citations present
-        if has_fallback:
+        if features.contains('no relevant db info'):
             score += 2.0  # Proper fallback handling
-        if 'database' in response.lower() or 'db context' in response.lower():
+        if features.contains('database') or features.contains('db context'):
             score += 2.0  # References database
-        if len(response) > 200:  # Substantial response
+        if len(features.text) > 200:  # Substantial response
             score += 2.0
         
         return min(10.0, score)
     
-    def evaluate_accuracy(self, response: str, question: str) -> float:
+    def evaluate_accuracy(self, response: ResponseLike, question: str) -> float:
         """Rule-based accuracy evaluation"""
         
-        if not response:
+        features = self.extract_features(response)
+        if not features.text:
             return 0.0
         
         score = 0.0
-        response_lower = response.lower()
         
         # Check for legal accuracy indicators
-        legal_terms = [
-            'pregnancy discrimination', 'title vii', 'fmla', 'ada',
-            'reasonable accommodation', 'statute', 'regulation', 'case law'
-        ]
-        
-        legal_term_count = sum(1 for term in legal_terms if term in response_lower)
+        legal_term_count = sum(1 for term in self.legal_terms if features.contains(term))
         score += min(5.0, legal_term_count)
         
         # Check for proper legal analysis
-        if 'legal authority' in response_lower or 'citation' in response_lower:
+        if features.contains('legal authority') or features.contains('citation'):
             score += 3.0
         
         # Check for professional tone
-        if 'memo' in response_lower or 'analysis' in response_lower:
+        if features.contains('memo') or features.contains('analysis'):
             score += 2.0
         
         return min(10.0, score)
     
-    def evaluate_citations(self, response: str) -> float:
+    def evaluate_citations(self, response: ResponseLike) -> float:
         """Evaluate citation quality"""
         
-        citation_count = len(re.findall(r'\d+ U\.S\.C\.|\(\d{4}\)|v\.|, \d+ F\.', response))
+        citation_count = len(self.extract_features(response).citations)
         
         if citation_count >= 3:
             return 10.0
@@ -223,60 +254,60 @@ class EnhancedEvaluator:
         else:
             return 0.0
     
-    def evaluate_clarity(self, response: str) -> float:
+    def evaluate_clarity(self, response: ResponseLike) -> float:
         """Evaluate response clarity"""
         
-        if not response:
+        features = self.extract_features(response)
+        if not features.text:
             return 0.0
         
         score = 0.0
         
         # Check for clear structure
-        if 'introduction' in response.lower() or 'analysis' in response.lower() or 'conclusion' in response.lower():
+        if features.contains('introduction') or features.contains('analysis') or features.contains('conclusion'):
             score += 4.0
         
         # Check for good paragraph structure
-        if response.count('\n\n') >= 3:
+        if features.paragraph_breaks >= 3:
             score += 3.0
         
         # Check for professional language
-        professional_indicators = ['legal', 'authority', 'statute', 'regulation']
-        professional_count = sum(1 for indicator in professional_indicators if indicator in response.lower())
+        professional_count = sum(1 for indicator in self.professional_indicators if features.contains(indicator))
         score += min(3.0, professional_count)
         
         return min(10.0, score)
     
-    def evaluate_explaining(self, response: str) -> float:
+    def evaluate_explaining(self, response: ResponseLike) -> float:
         """Evaluate explanation quality"""
         
-        if not response:
+        features = self.extract_features(response)
+        if not features.text:
             return 0.0
         
         score = 0.0
         
         # Check for explanatory language
-        explaining_indicators = ['because', 'therefore', 'thus', 'as a result', 'consequently']
-        explaining_count = sum(1 for indicator in explaining_indicators if indicator in response.lower())
+        explaining_count = sum(1 for indicator in self.explaining_indicators if features.contains(indicator))
         score += min(5.0, explaining_count)
         
         # Check for detailed analysis
-        if len(response) > 400:
+        if len(features.text) > 400:
             score += 3.0
         
         # Check for legal reasoning
-        if 'legal authority' in response.lower() or 'citation' in response.lower():
+        if features.contains('legal authority') or features.contains('citation'):
             score += 2.0
         
         return min(10.0, score)
     
-    def evaluate_comprehensiveness(self, response: str, expected_aspects: List[str]) -> float:
+    def evaluate_comprehensiveness(self, response: ResponseLike, expected_aspects: List[str]) -> float:
         """Evaluate comprehensiveness based on aspect coverage"""
         
-        if not response or not expected_aspects:
+        features = self.extract_features(response)
+        if not features.text or not expected_aspects:
             return 0.0
         
-        response_lower = response.lower()
-        covered_aspects = sum(1 for aspect in expected_aspects if aspect.lower() in response_lower)
+        covered_aspects = sum(1 for aspect in expected_aspects if features.contains(aspect))
         
         return (covered_aspects / len(expected_aspects)) * 10.0 if expected_aspects else 0.0
     
@@ -295,26 +326,29 @@ class EnhancedEvaluator:
         
         return max(0.0, min(10.0, score))
     
-    def evaluate_benchmark_result(self, response: str, question: str, category: str, 
+    def evaluate_benchmark_result(self, response: ResponseLike, question: str, category: str, 
                                 context: str, expected_aspects: List[str], 
                                 response_time: float) -> Dict[str, Any]:
         """Complete evaluation of a benchmark result"""
         
+        # One feature pass shared by every metric
+        features = self.extract_features(response)
+        
         # Calculate all metrics
-        response_completeness = self.evaluate_response_completeness(response)
-        alignment_to_question = self.evaluate_alignment_to_question(response, question, category)
-        zero_hallucination_compliance = self.evaluate_zero_hallucination_compliance(response, context)
-        accuracy = self.evaluate_accuracy(response, question)
-        citations = self.evaluate_citations(response)
-        clarity = self.evaluate_clarity(response)
-        explaining = self.evaluate_explaining(response)
-        aspect_coverage = self.evaluate_comprehensiveness(response, expected_aspects)
+        response_completeness = self.evaluate_response_completeness(features)
+        alignment_to_question = self.evaluate_alignment_to_question(features, question, category)
+        zero_hallucination_compliance = self.evaluate_zero_hallucination_compliance(features, context)
+        accuracy = self.evaluate_accuracy(features, question)
+        citations = self.evaluate_citations(features)
+        clarity = self.evaluate_clarity(features)
+        explaining = self.evaluate_explaining(features)
+        aspect_coverage = self.evaluate_comprehensiveness(features, expected_aspects)
         
         # Create metrics object
         metrics = EnhancedMetrics(
             response_time=response_time,
-            word_count=len(response.split()),
-            citation_count=len(re.findall(r'\d+ U\.S\.C\.|\(\d{4}\)|v\.|, \d+ F\.', response)),
+            word_count=len(features.words),
+            citation_count=len(features.citations),
             aspect_coverage=aspect_coverage / 10.0,  # Normalize to 0-1
             legal_analysis_score=0.0,  # Legacy metric
             response_completeness=response_completeness,
@@ -346,6 +380,156 @@ class EnhancedEvaluator:
             'enhanced_evaluation': True
         }
     
+    # Metric columns feeding comprehensive_score, in weight order
+    score_columns = [
+        ('response_completeness', 'completeness'),
+        ('alignment_to_question', 'alignment'),
+        ('zero_hallucination_compliance', 'zero_hallucination'),
+        ('accuracy', 'accuracy'),
+        ('citations', 'citations'),
+        ('clarity', 'clarity'),
+        ('aspect_coverage', 'aspect_coverage')
+    ]
+    
+    def _batch_vocabulary(self, aspects: Sequence[List[str]]) -> List[str]:
+        """Every lowercased term any metric tests for"""
+        terms = {'legal authority', 'citation', 'no relevant db info', 'database', 'db context',
+                 'memo', 'analysis', 'introduction', 'conclusion', 'federal', 'new york'}
+        terms.update(self.legal_terms, self.professional_indicators, self.explaining_indicators,
+                     self.question_legal_terms)
+        for expected in self.expected_content.values():
+            terms.update(expected)
+        for expected in aspects:
+            terms.update(aspect.lower() for aspect in expected or [])
+        terms.discard('')
+        return sorted(terms)
+    
+    @staticmethod
+    def _term_presence(lowered: Sequence[str], terms: List[str]) -> np.ndarray:
+        """Boolean (responses x terms) matrix of ``term in text``"""
+        present = np.zeros((len(lowered), len(terms)), dtype=bool)
+        for j, term in enumerate(terms):
+            present[:, j] = [term in text for text in lowered]
+        return present
+    
+    def evaluate_batch(self, responses: Sequence[str], questions: Sequence[str], categories: Sequence[str],
+                       contexts: Sequence[str], aspects: Sequence[List[str]],
+                       response_times: Optional[Sequence[float]] = None) -> Dict[str, np.ndarray]:
+        """Score many responses at once; returns one array per metric.
+        
+        Produces the same values as evaluate_benchmark_result (metrics,
+        word/citation counts and comprehensive_score) for each row.
+        """
+        texts = [r or "" for r in responses]
+        n = len(texts)
+        features = [ResponseFeatures.from_response(t) for t in texts]
+        
+        # Term-presence matrix over every term any metric looks for
+        terms = self._batch_vocabulary(aspects)
+        col = {term: i for i, term in enumerate(terms)}
+        present = self._term_presence([f.lower for f in features], terms)
+        
+        def has(*names):
+            return np.logical_or.reduce([present[:, col[name]] for name in names])
+        
+        def count(names):
+            return present[:, [col[name] for name in names]].sum(axis=1).astype(float)
+        
+        # Per-response scans that are not plain term lookups
+        nonempty = np.array([bool(t) for t in texts])
+        length = np.array([len(t) for t in texts])
+        citation_count = np.array([len(f.citations) for f in features])
+        has_memo_header = np.array([f.has_memo_header for f in features])
+        has_sections = np.array([any(f.sections.values()) for f in features])
+        has_source_citation = np.array([f.has_source_citation for f in features])
+        paragraph_breaks = np.array([f.paragraph_breaks for f in features])
+        legal_reasoning = has('legal authority', 'citation')
+        
+        # Completeness
+        completeness = (3.0 * has_memo_header + 3.0 * (has_sections | legal_reasoning) +
+                        2.0 * (citation_count > 0) + 2.0 * (length > 500) + 1.0 * ((length > 300) & (length <= 500)))
+        completeness = np.where(nonempty, np.minimum(10.0, completeness), 1.0)
+        
+        # Alignment: category terms, federal/NY focus and legal concepts named in the question
+        expected_mask = np.zeros((n, len(terms)), dtype=bool)
+        question_mask = np.zeros((n, len(terms)), dtype=bool)
+        max_possible = np.zeros(n)
+        focus = np.zeros(n)
+        has_question = np.array([bool(q) for q in questions])
+        for row, (question, category) in enumerate(zip(questions, categories)):
+            expected = self.expected_content.get(category.lower(), [])
+            expected_mask[row, [col[t] for t in expected]] = True
+            max_possible[row] = len(expected) + 2
+            question_lower = (question or "").lower()
+            question_terms = question_lower.split()
+            question_mask[row, [col[t] for t in self.question_legal_terms if t in question_terms]] = True
+            focus[row] = (float('federal' in question_lower and present[row, col['federal']]) +
+                          float('new york' in question_lower and present[row, col['new york']]))
+        alignment_raw = (present & expected_mask).sum(axis=1) + focus + 0.5 * (present & question_mask).sum(axis=1)
+        alignment = np.where(nonempty & has_question, np.minimum(10.0, (alignment_raw / max_possible) * 10.0), 1.0)
+        
+        # Zero-hallucination compliance
+        zero_hallucination = (4.0 * has_source_citation + 2.0 * has('no relevant db info') +
+                              2.0 * has('database', 'db context') + 2.0 * (length > 200))
+        zero_hallucination = np.where(nonempty, np.minimum(10.0, zero_hallucination), 1.0)
+        
+        # Accuracy
+        accuracy = (np.minimum(5.0, count(self.legal_terms)) + 3.0 * legal_reasoning +
+                    2.0 * has('memo', 'analysis'))
+        accuracy = np.where(nonempty, np.minimum(10.0, accuracy), 0.0)
+        
+        # Citations
+        citations = np.select([citation_count >= 3, citation_count >= 2, citation_count >= 1], [10.0, 7.0, 5.0], 0.0)
+        
+        # Clarity
+        clarity = (4.0 * has('introduction', 'analysis', 'conclusion') + 3.0 * (paragraph_breaks >= 3) +
+                   np.minimum(3.0, count(self.professional_indicators)))
+        clarity = np.where(nonempty, np.minimum(10.0, clarity), 0.0)
+        
+        # Explaining
+        explaining = (np.minimum(5.0, count(self.explaining_indicators)) + 3.0 * (length > 400) +
+                      2.0 * legal_reasoning)
+        explaining = np.where(nonempty, np.minimum(10.0, explaining), 0.0)
+        
+        # Comprehensiveness (aspect coverage)
+        aspect_counts = np.zeros((n, len(terms)))
+        aspect_total = np.zeros(n)
+        aspect_blank = np.zeros(n)
+        for row, expected in enumerate(aspects):
+            for aspect in expected or []:
+                if aspect:
+                    aspect_counts[row, col[aspect.lower()]] += 1
+                else:
+                    aspect_blank[row] += 1
+            aspect_total[row] = len(expected or [])
+        covered = (aspect_counts * present).sum(axis=1) + aspect_blank
+        comprehensiveness = np.where(nonempty & (aspect_total > 0),
+                                     (covered / np.maximum(aspect_total, 1)) * 10.0, 0.0)
+        
+        columns = {
+            'response_completeness': completeness,
+            'alignment_to_question': alignment,
+            'zero_hallucination_compliance': zero_hallucination,
+            'accuracy': accuracy,
+            'citations': citations,
+            'clarity': clarity,
+            'explaining': explaining,
+            'comprehensiveness': comprehensiveness,
+            'aspect_coverage': comprehensiveness / 10.0,
+            'legal_analysis_score': np.zeros(n),  # Legacy metric
+            'word_count': np.array([len(f.words) for f in features]),
+            'citation_count': citation_count,
+            'response_time': np.asarray(response_times if response_times is not None else np.zeros(n), dtype=float)
+        }
+        
+        # Same left-to-right weighted sum as calculate_comprehensive_score
+        score = np.zeros(n)
+        for column, weight in self.score_columns:
+            score = score + columns[column] * self.weights[weight]
+        columns['comprehensive_score'] = np.clip(score, 0.0, 10.0)
+        
+        return columns
+    
     def generate_evaluation_summary(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate summary statistics for benchmark results"""
         
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Streaming Generation Metrics for Legal AI Benchmarking
+Time-to-first-token, inter-token latency and Ollama prefill/decode timings
+"""
+import time
+import numpy as np
+from typing import Dict, List, Any, Optional
+
+# Ollama reports durations in nanoseconds
+NS_PER_SECOND = 1e9
+
+class StreamRecorder:
+    """Consumes raw Ollama /api/chat stream chunks and times them"""
+
+    def __init__(self, start_time: Optional[float] = None):
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.end_time: Optional[float] = None
+        self.token_times: List[float] = []
+        self.parts: List[str] = []
+        self.final_chunk: Dict[str, Any] = {}
+
+    def observe(self, chunk: Dict[str, Any]) -> str:
+        """Record one stream chunk and return its text content"""
+        now = time.perf_counter()
+        content = chunk.get("message", {}).get("content", "")
+
+        if content:
+            self.token_times.append(now)
+            self.parts.append(content)
+
+        if chunk.get("done"):
+            self.final_chunk = chunk
+            self.end_time = now
+
+        return content
+
+    def finish(self):
+        """Mark the end of the stream (if no final chunk was seen)"""
+        if self.end_time is None:
+            self.end_time = time.perf_counter()
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    @property
+    def elapsed(self) -> float:
+        end = self.end_time if self.end_time is not None else time.perf_counter()
+        return end - self.start_time
+
+    def metrics(self) -> Dict[str, Any]:
+        """Client-side latency metrics plus Ollama's server-side timings"""
+
+        ttft = self.token_times[0] - self.start_time if self.token_times else None
+        gaps = np.diff(self.token_times) if len(self.token_times) > 1 else np.array([])
+
+        final = self.final_chunk
+        eval_count = final.get("eval_count")
+        eval_duration = _seconds(final.get("eval_duration"))
+        prompt_eval_count = final.get("prompt_eval_count")
+        prompt_eval_duration = _seconds(final.get("prompt_eval_duration"))
+
+        # Prefer Ollama's decode timing; fall back to client-side chunk rate
+        if eval_count and eval_duration:
+            tokens_per_second = eval_count / eval_duration
+        elif len(self.token_times) > 1 and self.token_times[-1] > self.token_times[0]:
+            tokens_per_second = (len(self.token_times) - 1) / (self.token_times[-1] - self.token_times[0])
+        else:
+            tokens_per_second = None
+
+        return {
+            'ttft': ttft,
+            'itl_p50': _percentile(gaps, 50),
+            'itl_p90': _percentile(gaps, 90),
+            'itl_p99': _percentile(gaps, 99),
+            'tokens_per_second': tokens_per_second,
+            'prompt_tokens_per_second': (prompt_eval_count / prompt_eval_duration
+                                         if prompt_eval_count and prompt_eval_duration else None),
+            'stream_chunks': len(self.token_times),
+            'eval_count': eval_count,
+            'eval_duration': eval_duration,
+            'prompt_eval_count': prompt_eval_count,
+            'prompt_eval_duration': prompt_eval_duration,
+            'load_duration': _seconds(final.get("load_duration")),
+            'total_duration': _seconds(final.get("total_duration"))
+        }
+
+def _seconds(nanoseconds: Optional[int]) -> Optional[float]:
+    return nanoseconds / NS_PER_SECOND if nanoseconds is not None else None
+
+def _percentile(values: np.ndarray, q: float) -> Optional[float]:
+    return float(np.percentile(values, q)) if len(values) else None
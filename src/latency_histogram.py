@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Latency Histograms for Legal AI Benchmarking
+Streaming p50/p90/p95/p99 and fixed-bucket histograms by model, temperature and category
+"""
+import math
+import logging
+from typing import Dict, List, Any, Iterable, Optional, Sequence, Tuple
+
+from config import Config
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+class LatencyHistogram:
+    """Constant-memory latency distribution.
+
+    Values are counted in log-spaced buckets that are `precision` wide
+    relative to their value (1% by default), so any percentile is within
+    that relative error however many samples are added. Counts for the
+    fixed report buckets (upper bounds in seconds, plus overflow) and the
+    exact count, sum, min and max are kept alongside.
+    """
+
+    def __init__(self, bounds: Optional[Sequence[float]] = None, precision: float = 0.01,
+                 floor: float = 1e-4):
+        self.bounds = list(bounds if bounds is not None else Config.LATENCY_HISTOGRAM_BOUNDS)
+        self.bucket_counts = [0] * (len(self.bounds) + 1)
+        self._log_base = math.log1p(precision)
+        self._floor = floor
+        self._fine: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _fine_index(self, value: float) -> int:
+        return int(math.log(max(value, self._floor) / self._floor) / self._log_base)
+
+    def add(self, value: Optional[float]):
+        """Count one latency in seconds (None and NaN are ignored)"""
+        if value is None or value != value or value < 0:
+            return
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        index = self._fine_index(value)
+        self._fine[index] = self._fine.get(index, 0) + 1
+
+        position = 0
+        while position < len(self.bounds) and value > self.bounds[position]:
+            position += 1
+        self.bucket_counts[position] += 1
+
+    def merge(self, other: "LatencyHistogram"):
+        """Fold another histogram with the same bounds and precision into this one"""
+        for index, count in other._fine.items():
+            self._fine[index] = self._fine.get(index, 0) + count
+        self.bucket_counts = [a + b for a, b in zip(self.bucket_counts, other.bucket_counts)]
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th percentile (nearest rank), from the geometric middle of its fine bucket"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self._fine):
+            seen += self._fine[index]
+            if seen >= rank:
+                value = self._floor * math.exp((index + 0.5) * self._log_base)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def bucket_labels(self) -> List[str]:
+        return [f"<={bound:g}s" for bound in self.bounds] + [f">{self.bounds[-1]:g}s"]
+
+    def summary(self, percentiles: Sequence[float] = (50, 90, 95, 99)) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            **{f'p{q:g}': self.percentile(q) for q in percentiles},
+            'histogram': dict(zip(self.bucket_labels(), self.bucket_counts))
+        }
+
+class LatencyReport:
+    """Histograms of each latency metric, overall and grouped by model, temperature and category"""
+
+    GROUPS = ['model', 'temperature', 'category']
+
+    def __init__(self, metrics: Sequence[str] = ('response_time', 'ttft'),
+                 bounds: Optional[Sequence[float]] = None):
+        self.metrics = list(metrics)
+        self.bounds = bounds
+        self._histograms: Dict[Tuple[str, str, Any], LatencyHistogram] = {}
+
+    def _histogram(self, metric: str, group: str, key: Any) -> LatencyHistogram:
+        histogram = self._histograms.get((metric, group, key))
+        if histogram is None:
+            histogram = self._histograms[(metric, group, key)] = LatencyHistogram(self.bounds)
+        return histogram
+
+    def add(self, values: Dict[str, Optional[float]], model: Any, temperature: Any, category: Any):
+        """Count one result's latencies (metric -> seconds) under each of its groups"""
+        for metric in self.metrics:
+            value = values.get(metric)
+            self._histogram(metric, 'overall', 'all').add(value)
+            for group, key in zip(self.GROUPS, (model, temperature, category)):
+                self._histogram(metric, group, key).add(value)
+
+    def add_results(self, results: Iterable[Dict[str, Any]]):
+        """Stream successful result dicts into the report"""
+        for result in results:
+            if result.get('status') != 'success':
+                continue
+            generation = result.get('generation_metrics') or {}
+            values = {metric: result.get(metric, generation.get(metric)) for metric in self.metrics}
+            self.add(values, result.get('model'), result.get('temperature'), result.get('category'))
+
+    def summary(self) -> Dict[str, Any]:
+        """{metric: {'overall': {...}, 'by_model': {...}, 'by_temperature': {...}, 'by_category': {...}}}"""
+        report: Dict[str, Any] = {}
+        for (metric, group, key), histogram in self._histograms.items():
+            if not histogram.count:
+                continue
+            stats = histogram.summary(Config.LATENCY_PERCENTILES)
+            if group == 'overall':
+                report.setdefault(metric, {})['overall'] = stats
+            else:
+                report.setdefault(metric, {}).setdefault(f'by_{group}', {})[str(key)] = stats
+        return report
+
+def latency_rows(latency: Dict[str, Any]) -> Iterable[Tuple[str, str, str, Dict[str, Any]]]:
+    """(metric, scope, group, stats) for every histogram in a LatencyReport summary"""
+    for metric, scopes in latency.items():
+        if 'overall' in scopes:
+            yield metric, 'overall', 'all', scopes['overall']
+        for group in LatencyReport.GROUPS:
+            for key, stats in scopes.get(f'by_{group}', {}).items():
+                yield metric, group, key, stats
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Open-Loop Load Testing for Legal AI
+Replays the benchmark questions at fixed arrival rates to find each model's saturation knee
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import Config
+from async_ollama_client import AsyncOllamaClient
+from context_stage import ContextRetrievalStage
+from generation_metrics import StreamRecorder
+from latency_histogram import LatencyHistogram
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+ARRIVAL_PROCESSES = ('poisson', 'constant')
+
+def arrival_offsets(rate: float, duration: float, process: str = 'poisson', seed: int = 42) -> np.ndarray:
+    """Request send times in seconds from the start of a phase.
+
+    poisson draws exponential inter-arrival gaps (independent users),
+    constant spaces requests exactly 1/rate apart.
+    """
+    if rate <= 0:
+        raise ValueError("Arrival rate must be positive")
+    if process == 'constant':
+        return np.arange(0.0, duration, 1.0 / rate)
+    if process != 'poisson':
+        raise ValueError(f"Unknown arrival process {process!r}; use one of {ARRIVAL_PROCESSES}")
+
+    rng = np.random.default_rng(seed)
+    # Draw a few extra gaps so the sum almost surely covers the duration
+    expected = int(rate * duration)
+    gaps = rng.exponential(1.0 / rate, size=expected + 4 * int(np.sqrt(expected)) + 10)
+    offsets = np.cumsum(gaps) - gaps[0]
+    return offsets[offsets < duration]
+
+class PhaseStats:
+    """Streaming statistics for one (model, arrival rate) phase"""
+
+    def __init__(self, model: str, rate: float, requests: int):
+        self.model = model
+        self.rate = rate
+        self.requests = requests
+        self.completed = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.latency = LatencyHistogram()
+        self.ttft = LatencyHistogram()
+        self.queue_delay = LatencyHistogram()
+        self.dispatch_lag = LatencyHistogram()
+        # Latency by arrival order, to see whether the queue keeps growing
+        self.latency_by_arrival = np.full(requests, np.nan)
+
+    def started(self, lag: float):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.dispatch_lag.add(max(0.0, lag))
+
+    def finished(self, index: int, metrics: Optional[Dict[str, Any]], latency: Optional[float]):
+        self.in_flight -= 1
+        if metrics is None:
+            self.errors += 1
+            return
+        self.completed += 1
+        self.latency.add(latency)
+        self.latency_by_arrival[index] = latency
+        self.ttft.add(metrics.get('ttft'))
+        if metrics.get('ttft') is not None:
+            # Time before the first token that Ollama did not spend loading or prefilling this request
+            served = (metrics.get('load_duration') or 0.0) + (metrics.get('prompt_eval_duration') or 0.0)
+            self.queue_delay.add(max(0.0, metrics['ttft'] - served))
+
+    def latency_growth(self, min_requests: int = 30) -> Optional[float]:
+        """Mean latency of the last third of arrivals over the middle third.
+
+        The first third is skipped because every phase starts with an empty
+        queue. A stable queue stays near 1; arrivals outpacing service keep
+        growing it. None when too few requests completed to tell.
+        """
+        if np.count_nonzero(~np.isnan(self.latency_by_arrival)) < min_requests:
+            return None
+        _, middle, last = np.array_split(self.latency_by_arrival, 3)
+        middle, last = middle[~np.isnan(middle)], last[~np.isnan(last)]
+        if not len(middle) or not len(last) or middle.mean() <= 0:
+            return None
+        return float(last.mean() / middle.mean())
+
+    def report(self, wall_time: float) -> Dict[str, Any]:
+        percentiles = Config.LATENCY_PERCENTILES
+        return {
+            'model': self.model,
+            'offered_rate': self.rate,
+            'requests': self.requests,
+            'completed': self.completed,
+            'errors': self.errors,
+            'error_rate': self.errors / self.requests if self.requests else 0.0,
+            'wall_time': wall_time,
+            'throughput': self.completed / wall_time if wall_time > 0 else 0.0,
+            'max_in_flight': self.max_in_flight,
+            'latency_growth': self.latency_growth(),
+            'latency': self.latency.summary(percentiles),
+            'ttft': self.ttft.summary(percentiles),
+            'queue_delay': self.queue_delay.summary(percentiles),
+            'dispatch_lag_p99': self.dispatch_lag.percentile(99)
+        }
+
+def find_knee(phases: List[Dict[str, Any]], latency_factor: float = 2.0, max_error_rate: float = 0.01,
+              max_growth: float = 1.5) -> Dict[str, Any]:
+    """Highest sustainable arrival rate and the first rate that saturates the model.
+
+    A phase is saturated when its p95 latency exceeds latency_factor times
+    the lowest rate's p95, its error rate exceeds max_error_rate, or the
+    latency of the last third of arrivals exceeds max_growth times that of
+    the middle third (the queue grows because arrivals outpace service).
+    """
+    ordered = sorted(phases, key=lambda p: p['offered_rate'])
+    baseline = next((p['latency']['p95'] for p in ordered if p['latency'].get('p95') is not None), None)
+    sustainable = None
+
+    for phase in ordered:
+        reasons = []
+        if phase['error_rate'] > max_error_rate:
+            reasons.append(f"error rate {phase['error_rate']:.1%}")
+        p95 = phase['latency'].get('p95')
+        if baseline and p95 is not None and p95 > latency_factor * baseline:
+            reasons.append(f"p95 {p95:.2f}s > {latency_factor:g}x baseline {baseline:.2f}s")
+        growth = phase.get('latency_growth')
+        if growth is not None and growth > max_growth:
+            reasons.append(f"latency grew {growth:.1f}x over the phase")
+        if reasons:
+            return {'max_sustainable_rate': sustainable, 'saturated_at': phase['offered_rate'], 'reasons': reasons}
+        sustainable = phase['offered_rate']
+
+    return {'max_sustainable_rate': sustainable, 'saturated_at': None, 'reasons': []}
+
+class LoadTester:
+    """Open-loop load generator over the streaming chat path.
+
+    Requests are sent at their scheduled arrival time whether or not
+    earlier ones have finished, and latency is measured from that time,
+    so a slow server shows up as queueing instead of a slower request
+    stream (no coordinated omission). Prompts are built once per question
+    before the first phase, as the chat app's retrieval is not the shared
+    bottleneck being measured.
+    """
+
+    def __init__(self, client: AsyncOllamaClient, prompts: Dict[str, Dict[str, str]],
+                 temperature: float = 0.7, request_timeout: Optional[float] = None):
+        self.client = client
+        self.prompts = prompts
+        self.questions = [s['question'] for s in Config.BENCHMARK_SCENARIOS if s['question'] in prompts]
+        self.temperature = temperature
+        self.request_timeout = request_timeout or Config.OLLAMA_TIMEOUT
+
+    async def _request(self, stats: PhaseStats, index: int, model: str, question: str, scheduled: float):
+        stats.started(time.perf_counter() - scheduled)
+        recorder = StreamRecorder(start_time=scheduled)
+
+        async def consume():
+            async for chunk in self.client.stream_chat(model, question, self.prompts[question][model],
+                                                       self.temperature):
+                recorder.observe(chunk)
+
+        try:
+            await asyncio.wait_for(consume(), self.request_timeout)
+            recorder.finish()
+            stats.finished(index, recorder.metrics(), recorder.elapsed)
+        except Exception as e:
+            logger.warning(f"Load request to {model} failed: {e!r}")
+            stats.finished(index, None, None)
+
+    async def warm_up(self, model: str):
+        """One request so model load time is not charged to the first phase"""
+        stats = PhaseStats(model, 0.0, 1)
+        await self._request(stats, 0, model, self.questions[0], time.perf_counter())
+
+    async def run_phase(self, model: str, rate: float, duration: float, process: str = 'poisson',
+                        seed: int = 42) -> Dict[str, Any]:
+        offsets = arrival_offsets(rate, duration, process, seed)
+        stats = PhaseStats(model, rate, len(offsets))
+        start = time.perf_counter()
+        pending = set()
+
+        for index, offset in enumerate(offsets):
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            question = self.questions[index % len(self.questions)]
+            task = asyncio.create_task(self._request(stats, index, model, question, start + offset))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.wait(pending)
+        return stats.report(time.perf_counter() - start)
+
+    async def run(self, models: Sequence[str], rates: Sequence[float], duration: float,
+                  process: str = 'poisson', seed: int = 42, stop_at_knee: bool = True,
+                  **knee_options: Any) -> Dict[str, Any]:
+        """Sweep every rate for each model in turn and locate each model's knee"""
+        report = {}
+        previous = None
+
+        for model in models:
+            if previous is not None:
+                try:
+                    await self.client.unload_model(previous)
+                except Exception as e:
+                    logger.warning(f"Could not unload {previous}: {e}")
+            await self.warm_up(model)
+
+            phases = []
+            for rate in sorted(rates):
+                print(f"🚦 {model}: {rate:g} req/s ({process}) for {duration:g}s...")
+                phase = await self.run_phase(model, rate, duration, process, seed)
+                phases.append(phase)
+                print(f"   p50 {_seconds(phase['latency'].get('p50'))}, p95 {_seconds(phase['latency'].get('p95'))}, "
+                      f"queue p95 {_seconds(phase['queue_delay'].get('p95'))}, errors {phase['error_rate']:.1%}")
+                if stop_at_knee and find_knee(phases, **knee_options)['saturated_at'] is not None:
+                    break
+
+            report[model] = {'phases': phases, 'knee': find_knee(phases, **knee_options)}
+            previous = model
+
+        return report
+
+def _seconds(value: Optional[float]) -> str:
+    return f"{value:.2f}s" if value is not None else "n/a"
+
+def build_prompts(models: Sequence[str], contexts_file: Optional[Path] = None) -> Dict[str, Dict[str, str]]:
+    """System prompt per question and model, built the way BenchmarkRunner builds them"""
+    from legal_ai_core import LegalAI
+    from prompts.prompts import PromptTemplates
+
+    templates = PromptTemplates()
+    stage = ContextRetrievalStage(
+        LegalAI().retrieve_context,
+        lambda model, question, context: templates.build_prompt(model, context, Config.PROMPT_MAX_TOKENS, question)
+    )
+    if contexts_file:
+        stage.load(contexts_file)
+    return {s['question']: {model: stage.get_prompt(model, s['question']) for model in models}
+            for s in Config.BENCHMARK_SCENARIOS}
+
+def print_report(report: Dict[str, Any]):
+    print("\n🚦 Open-Loop Load Test")
+    print("=" * 60)
+    print("| Model | Rate (req/s) | Throughput | p50 | p95 | p99 | Queue p95 | Errors | Growth |")
+    print("|-------|--------------|------------|-----|-----|-----|-----------|--------|--------|")
+    for model, entry in report.items():
+        for phase in entry['phases']:
+            latency = phase['latency']
+            growth = phase['latency_growth']
+            print(f"| {model} | {phase['offered_rate']:g} | {phase['throughput']:.2f}/s | "
+                  f"{_seconds(latency.get('p50'))} | {_seconds(latency.get('p95'))} | {_seconds(latency.get('p99'))} | "
+                  f"{_seconds(phase['queue_delay'].get('p95'))} | {phase['error_rate']:.1%} | "
+                  f"{f'{growth:.2f}x' if growth is not None else 'n/a'} |")
+
+    print("\n📍 Saturation knees:")
+    for model, entry in report.items():
+        knee = entry['knee']
+        if knee['saturated_at'] is None:
+            print(f"   {model}: not saturated up to {knee['max_sustainable_rate']:g} req/s")
+        else:
+            sustainable = knee['max_sustainable_rate']
+            print(f"   {model}: sustains {f'{sustainable:g} req/s' if sustainable else 'no tested rate'}, "
+                  f"saturates at {knee['saturated_at']:g} req/s ({'; '.join(knee['reasons'])})")
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse load-test command-line options"""
+    parser = argparse.ArgumentParser(description="Open-loop load test of the legal chat path")
+    parser.add_argument('--models', nargs='+', default=Config.BENCHMARK_MODELS)
+    parser.add_argument('--rates', type=float, nargs='+', default=Config.LOAD_TEST_RATES,
+                        help="Arrival rates to sweep (requests per second)")
+    parser.add_argument('--duration', type=float, default=Config.LOAD_TEST_DURATION,
+                        help="Seconds of arrivals per rate")
+    parser.add_argument('--arrival', choices=ARRIVAL_PROCESSES, default='poisson')
+    parser.add_argument('--temperature', type=float, default=0.7)
+    parser.add_argument('--seed', type=int, default=Config.BENCHMARK_SEED)
+    parser.add_argument('--latency-factor', type=float, default=Config.LOAD_TEST_KNEE_LATENCY_FACTOR,
+                        help="Saturated once p95 exceeds this multiple of the lowest rate's p95")
+    parser.add_argument('--max-error-rate', type=float, default=Config.LOAD_TEST_MAX_ERROR_RATE)
+    parser.add_argument('--all-rates', dest='stop_at_knee', action='store_false',
+                        help="Keep sweeping rates after a model saturates")
+    parser.add_argument('--contexts', type=Path, default=None,
+                        help="Pin retrieved contexts from an enhanced_benchmark_contexts_*.json file")
+    parser.add_argument('--output', type=Path, default=None,
+                        help="JSON report (default: outputs/load_test_<timestamp>.json)")
+    return parser.parse_args(argv)
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    prompts = build_prompts(args.models, args.contexts)
+    # Connections are not the limit being tested: let Ollama queue the requests
+    connections = Config.LOAD_TEST_MAX_CONNECTIONS
+    async with AsyncOllamaClient(pool_size=connections, per_host_limit=connections,
+                                 seed=args.seed) as client:
+        tester = LoadTester(client, prompts, args.temperature)
+        return await tester.run(args.models, args.rates, args.duration, args.arrival, args.seed,
+                                stop_at_knee=args.stop_at_knee, latency_factor=args.latency_factor,
+                                max_error_rate=args.max_error_rate)
+
+def main():
+    """Main entry point for the load test"""
+
+    args = parse_args()
+    report = asyncio.run(run_load_test(args))
+    print_report(report)
+
+    output = args.output or Config.OUTPUTS_DIR / f"load_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump({'arrival': args.arrival, 'duration': args.duration, 'temperature': args.temperature,
+                   'models': report}, f, indent=2)
+    print(f"\n💾 Report saved to: {output}")
+
+if __name__ == "__main__":
+    main()
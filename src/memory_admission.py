@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Memory Admission Control for Legal AI Benchmarking
+Defers task dispatch that would push the machine into swap, using psutil and Ollama model footprints
+"""
+import time
+import logging
+from typing import Dict, Any, Callable, Optional, Set
+
+import psutil
+import requests
+
+from config import Config
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+# Approximate bits per weight of Ollama quantization levels (including block scales)
+QUANTIZATION_BITS = {
+    'Q4_0': 4.5, 'Q4_1': 5.0, 'Q4_K_S': 4.58, 'Q4_K_M': 4.85, 'Q5_0': 5.5, 'Q5_1': 6.0,
+    'Q5_K_S': 5.54, 'Q5_K_M': 5.69, 'Q6_K': 6.56, 'Q8_0': 8.5, 'MXFP4': 4.25,
+    'F16': 16.0, 'BF16': 16.0, 'F32': 32.0
+}
+
+def sample_memory() -> Dict[str, float]:
+    """System memory and swap as seen by psutil (sizes in GB, swap_out in bytes since boot)"""
+    mem = psutil.virtual_memory()
+    swap = psutil.swap_memory()
+    return {
+        'total_gb': mem.total / GB,
+        'available_gb': mem.available / GB,
+        'used_percent': mem.percent,
+        'swap_used_gb': swap.used / GB,
+        'swap_out': float(swap.sout)
+    }
+
+def ollama_loaded_models(base_url: str) -> Dict[str, float]:
+    """Models Ollama currently holds in memory (/api/ps), with their resident size in GB"""
+    response = requests.get(f"{base_url}/api/ps", timeout=10)
+    response.raise_for_status()
+    return {entry['name']: entry.get('size', 0) / GB for entry in response.json().get('models', [])}
+
+def estimate_footprint(model_info: Dict[str, Any], context_tokens: int) -> Optional[Dict[str, float]]:
+    """Weights and per-request KV cache (GB) from an /api/show response, or None if it lacks the sizes"""
+    details = model_info.get('details') or {}
+    info = model_info.get('model_info') or {}
+    parameters = info.get('general.parameter_count')
+    if not parameters:
+        return None
+
+    bits = QUANTIZATION_BITS.get(str(details.get('quantization_level', '')).upper(), 8.0)
+    # Compute buffers and runtime overhead come on top of the weights
+    weights_gb = parameters * bits / 8 / GB * 1.1
+
+    # f16 K and V for every layer and KV head, per token of context
+    prefix = info.get('general.architecture', '')
+    layers = info.get(f'{prefix}.block_count')
+    heads = info.get(f'{prefix}.attention.head_count')
+    kv_heads = info.get(f'{prefix}.attention.head_count_kv', heads)
+    head_dim = info.get(f'{prefix}.attention.key_length')
+    if head_dim is None and heads and info.get(f'{prefix}.embedding_length'):
+        head_dim = info[f'{prefix}.embedding_length'] // heads
+    kv_gb = (2 * layers * kv_heads * head_dim * 2 * context_tokens / GB
+             if layers and kv_heads and head_dim else 0.0)
+
+    return {'weights_gb': weights_gb, 'kv_per_request_gb': kv_gb, 'source': '/api/show'}
+
+def generated(result: Dict[str, Any]) -> bool:
+    """Whether a result came from Ollama actually generating (not a cache hit, reuse or error)"""
+    return result.get('status') == 'success' and not result.get('cache_hit') and not result.get('reused_from')
+
+class MemoryAdmissionController:
+    """Admits a task for dispatch only if memory can absorb it without swapping.
+
+    A task needs its KV cache, plus the model's weights unless the model
+    is resident (finished a generated task, or listed by loaded_models,
+    Ollama's /api/ps). Weights of a model still loading count as committed,
+    since available memory does not reflect them yet; if its tasks all end
+    without generating (cache hits, errors), it is no longer counted as
+    loading and /api/ps is asked again on its next admission. Dispatch is deferred
+    while available memory minus that would drop below reserve_gb, or while
+    the system swaps out faster than max_swap_out_mb_s. With nothing in
+    flight, waiting can only help if another process frees memory, so
+    admission is forced after max_wait seconds; that wait is not repeated
+    for the same model (e.g. between cache hits) until it is evicted.
+    """
+
+    def __init__(self, get_model_info: Optional[Callable[[str], Dict[str, Any]]] = None,
+                 loaded_models: Optional[Callable[[], Dict[str, float]]] = None,
+                 sample: Callable[[], Dict[str, float]] = sample_memory,
+                 reserve_gb: Optional[float] = None, max_swap_out_mb_s: Optional[float] = None,
+                 context_tokens: Optional[int] = None, max_wait: Optional[float] = None,
+                 poll_interval: Optional[float] = None):
+        self.get_model_info = get_model_info
+        self.loaded_models = loaded_models
+        self.sample = sample
+        self.reserve_gb = reserve_gb if reserve_gb is not None else Config.ADMISSION_RESERVE_GB
+        self.max_swap_out_mb_s = (max_swap_out_mb_s if max_swap_out_mb_s is not None
+                                  else Config.ADMISSION_MAX_SWAP_OUT_MB_S)
+        self.context_tokens = context_tokens or Config.ADMISSION_CONTEXT_TOKENS
+        self.max_wait = max_wait if max_wait is not None else Config.ADMISSION_MAX_WAIT
+        self.poll_interval = poll_interval or Config.ADMISSION_POLL_INTERVAL
+
+        self.footprints: Dict[str, Dict[str, float]] = {}
+        self.resident: Set[str] = set()
+        self.loading: Set[str] = set()
+        self._in_flight: Dict[str, int] = {}
+        self._checked_loaded: Set[str] = set()
+        # Models already admitted after waiting out max_wait
+        self._forced: Set[str] = set()
+        self._last_swap: Optional[tuple] = None
+        self._swap_rate = 0.0
+        self._deferred_since: Optional[float] = None
+
+        self.admitted = 0
+        self.deferrals = 0
+        self.deferred_seconds = 0.0
+        self.forced_admissions = 0
+        self.min_available_gb: Optional[float] = None
+        self.max_swap_used_gb = 0.0
+
+    def footprint(self, model: str) -> Dict[str, float]:
+        """Weights and per-request KV cache of a model, looked up once"""
+        if model not in self.footprints:
+            estimate = None
+            if self.get_model_info is not None:
+                try:
+                    estimate = estimate_footprint(self.get_model_info(model) or {}, self.context_tokens)
+                except Exception as e:
+                    logger.warning(f"Could not get model info for {model}: {e}")
+            if estimate is None:
+                estimate = {'weights_gb': Config.MODEL_MEMORY_FOOTPRINTS_GB.get(model, 0.0),
+                            'kv_per_request_gb': 0.0, 'source': 'config'}
+            logger.info(f"{model} footprint: {estimate['weights_gb']:.1f}GB weights + "
+                        f"{estimate['kv_per_request_gb']:.2f}GB per request ({estimate['source']})")
+            self.footprints[model] = estimate
+        return self.footprints[model]
+
+    def _check_loaded(self, model: str):
+        """Count a model Ollama already holds (e.g. from an earlier run) as resident, once per load"""
+        if self.loaded_models is None or model in self._checked_loaded:
+            return
+        self._checked_loaded.add(model)
+        try:
+            loaded = self.loaded_models()
+        except Exception as e:
+            logger.warning(f"Could not list loaded models: {e}")
+            return
+        if model in loaded:
+            logger.info(f"{model} already loaded ({loaded[model]:.1f}GB)")
+            self.resident.add(model)
+
+    def _swap_out_rate(self, memory: Dict[str, float], now: float) -> float:
+        """Swap-out MB/s since the previous sample (kept for samples taken too close together)"""
+        if self._last_swap is None:
+            self._last_swap = (now, memory['swap_out'])
+        elif now - self._last_swap[0] >= 0.25:
+            last_time, last_out = self._last_swap
+            self._swap_rate = max(0.0, memory['swap_out'] - last_out) / (now - last_time) / 1024 ** 2
+            self._last_swap = (now, memory['swap_out'])
+        return self._swap_rate
+
+    def pressure(self, model: str) -> Optional[str]:
+        """Why dispatching a task for model now would risk swapping, or None if it fits"""
+        now = time.perf_counter()
+        memory = self.sample()
+        self.min_available_gb = (memory['available_gb'] if self.min_available_gb is None
+                                 else min(self.min_available_gb, memory['available_gb']))
+        self.max_swap_used_gb = max(self.max_swap_used_gb, memory['swap_used_gb'])
+
+        if model not in self.resident and model not in self.loading:
+            self._check_loaded(model)
+        footprint = self.footprint(model)
+        need = footprint['kv_per_request_gb'] + sum(self.footprint(m)['weights_gb'] for m in self.loading)
+        if model not in self.resident and model not in self.loading:
+            need += footprint['weights_gb']
+
+        swap_rate = self._swap_out_rate(memory, now)
+        if swap_rate > self.max_swap_out_mb_s:
+            return f"swapping out {swap_rate:.1f}MB/s"
+        if memory['available_gb'] - need < self.reserve_gb:
+            return (f"{memory['available_gb']:.1f}GB available, {need:.1f}GB needed, "
+                    f"{self.reserve_gb:.1f}GB reserve")
+        return None
+
+    def admit(self, model: str, in_flight: int) -> bool:
+        """Whether to dispatch one more task for model now (in_flight: tasks already running)"""
+        reason = self.pressure(model)
+        now = time.perf_counter()
+        if reason is not None and (in_flight or model not in self._forced):
+            if self._deferred_since is None:
+                self._deferred_since = now
+                self.deferrals += 1
+                logger.info(f"Deferring {model} task with {in_flight} in flight: {reason}")
+            if in_flight or now - self._deferred_since < self.max_wait:
+                return False
+            logger.warning(f"Admitting {model} task after {self.max_wait:.0f}s despite memory pressure: {reason}")
+            self._forced.add(model)
+            self.forced_admissions += 1
+
+        if self._deferred_since is not None:
+            self.deferred_seconds += now - self._deferred_since
+            self._deferred_since = None
+        if model not in self.resident:
+            self.loading.add(model)
+        self._in_flight[model] = self._in_flight.get(model, 0) + 1
+        self.admitted += 1
+        return True
+
+    def completed(self, model: str, result: Dict[str, Any]):
+        """A task for model finished; a generated result means its weights now show in available memory"""
+        self._in_flight[model] = max(0, self._in_flight.get(model, 0) - 1)
+        if model not in self.loading:
+            return
+        if generated(result):
+            self.loading.discard(model)
+            self.resident.add(model)
+        elif not self._in_flight[model]:
+            self.loading.discard(model)
+            self._checked_loaded.discard(model)
+
+    def evicted(self, model: str):
+        self.resident.discard(model)
+        self.loading.discard(model)
+        self._in_flight.pop(model, None)
+        self._checked_loaded.discard(model)
+        self._forced.discard(model)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'admitted': self.admitted,
+            'deferrals': self.deferrals,
+            'deferred_seconds': self.deferred_seconds,
+            'forced_admissions': self.forced_admissions,
+            'min_available_gb': self.min_available_gb,
+            'max_swap_used_gb': self.max_swap_used_gb,
+            'reserve_gb': self.reserve_gb,
+            'footprints': self.footprints
+        }
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Offline Re-scoring for Legal AI Benchmarking
+Normalizes archived benchmark files and scores every stored response with the current rules
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import Config
+from response_processor import ResponsePostProcessor, StreamingResponsePostProcessor
+from enhanced_evaluator import EnhancedEvaluator
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PATTERN = "*_benchmark_*.json"
+
+def _first(entry: Dict[str, Any], *keys: str, default: Any = None) -> Any:
+    for key in keys:
+        if entry.get(key) is not None:
+            return entry[key]
+    return default
+
+def _model_from_filename(path: Path) -> Optional[str]:
+    """Benchmark model named in an archive file name (``:`` is saved as ``_``)"""
+    for model in Config.BENCHMARK_MODELS:
+        if model.replace(':', '_') in path.name:
+            return model
+    return None
+
+def normalize_record(entry: Dict[str, Any], source: Path, index: int,
+                     info: Dict[str, Any]) -> Dict[str, Any]:
+    """One archived result in the common schema.
+
+    Archives differ in where the text and timing live ('response' or
+    'final_content' or 'original_response'; 'response_time_seconds' or
+    'response_time') and in whether model/temperature sit on each row or in
+    a 'benchmark_info' header.
+    """
+    scenarios = {s['question']: s for s in Config.BENCHMARK_SCENARIOS}
+    question = entry.get('question', '')
+    scenario = scenarios.get(question, {})
+
+    return {
+        'source_file': source.name,
+        'source_index': index,
+        'model': _first(entry, 'model', default=info.get('model') or _model_from_filename(source) or 'unknown'),
+        'temperature': _first(entry, 'temperature', default=info.get('temperature')),
+        'category': _first(entry, 'category', default=scenario.get('category', '')),
+        'question': question,
+        'expected_aspects': _first(entry, 'expected_aspects', default=scenario.get('expected_aspects', [])),
+        'original_response': _first(entry, 'original_response', 'response', 'final_content', default=''),
+        'response_time': float(_first(entry, 'response_time_seconds', 'response_time', default=0.0)),
+        'timestamp': _first(entry, 'timestamp', default=info.get('timestamp')),
+        'status': entry.get('status', 'success'),
+        'archived_score': _first(entry, 'comprehensive_score', 'legal_analysis_score')
+    }
+
+def iter_archive(paths: Iterable[Path]) -> Iterator[Dict[str, Any]]:
+    """Normalized records, one archive file in memory at a time"""
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Skipping unreadable archive {path}: {e}")
+            continue
+
+        if isinstance(data, dict):
+            info = data.get('benchmark_info') or data.get('debug_info') or {}
+            entries = data.get('results', [])
+        else:
+            info, entries = {}, data
+
+        for index, entry in enumerate(entries):
+            if isinstance(entry, dict):
+                yield normalize_record(entry, Path(path), index, info)
+
+# Per-process scoring components (created once by the pool initializer)
+_processor: Optional[ResponsePostProcessor] = None
+_evaluator: Optional[EnhancedEvaluator] = None
+
+def _init_worker():
+    global _processor, _evaluator
+    logging.disable(logging.INFO)
+    _processor = ResponsePostProcessor()
+    _evaluator = EnhancedEvaluator()
+
+def rescore_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Clean and evaluate records the way BenchmarkRunner._build_result does"""
+    if _evaluator is None:
+        _init_worker()
+
+    rescored = []
+    for record in records:
+        response = record['original_response']
+        final_content = StreamingResponsePostProcessor.clean(response)
+        evaluation = _evaluator.evaluate_benchmark_result(
+            final_content, record['question'], record['category'], "",
+            record['expected_aspects'], record['response_time']
+        )
+        rescored.append({
+            **record,
+            'final_content': final_content,
+            'planning_detected': _processor.detect_planning_content(response),
+            **evaluation
+        })
+    return rescored
+
+def _chunks(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def rescore_archive(paths: Sequence[Path], output: Path, workers: Optional[int] = None,
+                    chunk_size: int = 64) -> Dict[str, Any]:
+    """Re-score every successful archived response into one JSONL file.
+
+    Chunks are scored on a process pool with a bounded number in flight and
+    written in input order, so memory stays flat however large the archive.
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    counts = {'files': len(paths), 'records': 0, 'skipped': 0}
+    model_scores: Dict[str, List[float]] = {}
+
+    def successful():
+        for record in iter_archive(paths):
+            if record['status'] == 'success' and record['original_response']:
+                yield record
+            else:
+                counts['skipped'] += 1
+
+    def write(rows, f):
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+            model_scores.setdefault(row['model'], []).append(row['comprehensive_score'])
+        counts['records'] += len(rows)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        if workers == 1:
+            for chunk in _chunks(successful(), chunk_size):
+                write(rescore_records(chunk), f)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                pending = deque()
+                for chunk in _chunks(successful(), chunk_size):
+                    pending.append(pool.submit(rescore_records, chunk))
+                    if len(pending) >= workers * 2:
+                        write(pending.popleft().result(), f)
+                while pending:
+                    write(pending.popleft().result(), f)
+
+    return {
+        **counts,
+        'output': str(output),
+        'workers': workers,
+        'elapsed': time.perf_counter() - start,
+        'by_model': {model: {'responses': len(scores), 'avg_comprehensive_score': float(np.mean(scores))}
+                     for model, scores in sorted(model_scores.items())}
+    }
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse re-scoring command-line options"""
+    parser = argparse.ArgumentParser(description="Re-score archived benchmark responses without calling Ollama")
+    parser.add_argument('archives', type=Path, nargs='*',
+                        help=f"Archive files (default: {ARCHIVE_PATTERN} under outputs/archive)")
+    parser.add_argument('--workers', type=int, default=None, help="Scoring processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=64, help="Responses per pool task")
+    parser.add_argument('--output', type=Path, default=None,
+                        help="Consolidated JSONL output (default: outputs/rescored_results_<timestamp>.jsonl)")
+    return parser.parse_args(argv)
+
+def main():
+    """Main entry point for offline re-scoring"""
+
+    args = parse_args()
+    paths = args.archives or sorted((Config.OUTPUTS_DIR / "archive").glob(ARCHIVE_PATTERN))
+    if not paths:
+        print("❌ No archived benchmark files found")
+        sys.exit(1)
+
+    output = args.output or Config.OUTPUTS_DIR / f"rescored_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    report = rescore_archive(paths, output, args.workers, args.chunk_size)
+
+    print(f"🔁 Re-scored {report['records']} responses from {report['files']} files "
+          f"in {report['elapsed']:.2f}s on {report['workers']} workers ({report['skipped']} skipped)")
+    for model, stats in report['by_model'].items():
+        print(f"   📊 {model}: {stats['avg_comprehensive_score']:.2f} avg over {stats['responses']} responses")
+    print(f"💾 Results saved to: {report['output']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Resource Sampler for Legal AI Benchmarking
+Background CPU, Ollama RSS, memory, swap and disk I/O timeline aligned to each task's start and end
+"""
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+import numpy as np
+import psutil
+
+from config import Config
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+MB = 1024 ** 2
+
+# Per-task aggregates over the samples in its window: (result key, sample field, reduction)
+TASK_AGGREGATES = [
+    ('cpu_percent_max', 'cpu_percent', 'max'),
+    ('cpu_percent_mean', 'cpu_percent', 'mean'),
+    ('ollama_rss_gb_max', 'ollama_rss_gb', 'max'),
+    ('available_gb_min', 'available_gb', 'min'),
+    ('swap_used_gb_max', 'swap_used_gb', 'max'),
+    ('swap_out_mb_s_max', 'swap_out_mb_s', 'max'),
+    ('disk_read_mb_s_max', 'disk_read_mb_s', 'max'),
+    ('disk_write_mb_s_max', 'disk_write_mb_s', 'max')
+]
+
+class ResourceSampler:
+    """Samples system and Ollama resource use on a daemon thread.
+
+    Each sample is stamped with wall-clock time (t, epoch seconds), the
+    same clock as a result's task_window, so samples from an
+    interrupted session still line up with the tasks it journaled. Samples
+    are appended to path as they are taken; on_sample (e.g. trace counters)
+    is called with each one.
+    """
+
+    def __init__(self, path: Path, interval: Optional[float] = None,
+                 process_name: Optional[str] = None,
+                 on_sample: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.path = Path(path)
+        self.interval = interval or Config.RESOURCE_SAMPLE_INTERVAL
+        self.process_name = (process_name or Config.OLLAMA_PROCESS_NAME).lower()
+        self.on_sample = on_sample
+        self.count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._processes: Dict[int, psutil.Process] = {}
+        self._scanned_at = 0.0
+        self._previous: Optional[tuple] = None
+
+    def _ollama_processes(self, now: float) -> List[psutil.Process]:
+        """Ollama server and model runner processes (rescanned every few seconds as runners come and go)"""
+        if now - self._scanned_at >= 5.0:
+            self._scanned_at = now
+            for process in psutil.process_iter(['name']):
+                if (process.info['name'] or '').lower().startswith(self.process_name) \
+                        and process.pid not in self._processes:
+                    self._processes[process.pid] = process
+                    process.cpu_percent(None)
+        return list(self._processes.values())
+
+    def _rate(self, now: float, field: str, current: Optional[float]) -> Optional[float]:
+        """MB/s of a cumulative byte counter since the previous sample"""
+        if self._previous is None or current is None:
+            return None
+        previous_time, previous = self._previous
+        if previous.get(field) is None or now <= previous_time:
+            return None
+        return max(0.0, current - previous[field]) / (now - previous_time) / MB
+
+    def sample(self) -> Dict[str, Any]:
+        now = time.time()
+        mem = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        try:
+            disk = psutil.disk_io_counters()
+        except (OSError, RuntimeError):
+            disk = None
+
+        rss = cpu = 0.0
+        for process in self._ollama_processes(now):
+            try:
+                rss += process.memory_info().rss
+                cpu += process.cpu_percent(None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                self._processes.pop(process.pid, None)
+
+        counters = {'swap_in': float(swap.sin), 'swap_out': float(swap.sout),
+                    'disk_read': float(disk.read_bytes) if disk else None,
+                    'disk_write': float(disk.write_bytes) if disk else None}
+        sample = {
+            't': now,
+            'cpu_percent': psutil.cpu_percent(None),
+            'ollama_cpu_percent': cpu if self._processes else None,
+            'ollama_rss_gb': rss / GB if self._processes else None,
+            'memory_used_percent': mem.percent,
+            'available_gb': mem.available / GB,
+            'swap_used_gb': swap.used / GB,
+            **{f'{field}_mb_s': self._rate(now, field, value) for field, value in counters.items()}
+        }
+        self._previous = (now, counters)
+        return sample
+
+    def _record(self, f):
+        try:
+            sample = self.sample()
+            f.write(json.dumps(sample) + "\n")
+            f.flush()
+            self.count += 1
+            if self.on_sample is not None:
+                self.on_sample(sample)
+        except Exception as e:
+            logger.warning(f"Resource sample failed: {e}")
+
+    def _run(self):
+        with open(self.path, 'a') as f:
+            self._record(f)
+            while not self._stop.wait(self.interval):
+                self._record(f)
+            # Final sample, so the last tasks' windows are covered
+            self._record(f)
+
+    def start(self) -> "ResourceSampler":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        psutil.cpu_percent(None)
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Take a final sample and wait for the thread to finish writing"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        logger.info(f"Recorded {self.count} resource samples in {self.path}")
+
+    def __enter__(self) -> "ResourceSampler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+class ResourceTimeline:
+    """Resource samples of a run as time-sorted columns, queried by task window"""
+
+    def __init__(self, samples: Iterable[Dict[str, Any]], interval: Optional[float] = None):
+        samples = sorted(samples, key=lambda sample: sample['t'])
+        self.samples = samples
+        self.interval = interval or Config.RESOURCE_SAMPLE_INTERVAL
+        self.t = np.array([sample['t'] for sample in samples], dtype=np.float64)
+        fields = {field for _, field, _ in TASK_AGGREGATES}
+        self.columns = {field: np.array([np.nan if sample.get(field) is None else sample[field]
+                                         for sample in samples], dtype=np.float64)
+                        for field in fields}
+
+    @classmethod
+    def load(cls, path: Path, interval: Optional[float] = None) -> "ResourceTimeline":
+        samples = []
+        if Path(path).exists():
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        samples.append(json.loads(line))
+                    except ValueError:
+                        continue
+        return cls(samples, interval)
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def _reduce(self, field: str, reduction: str, lo: int = 0, hi: Optional[int] = None) -> Optional[float]:
+        values = self.columns[field][lo:hi]
+        values = values[~np.isnan(values)]
+        return float(getattr(np, reduction)(values)) if len(values) else None
+
+    def peak(self) -> Dict[str, Optional[float]]:
+        """Extremes over the whole run"""
+        return {
+            'cpu_percent_max': self._reduce('cpu_percent', 'max'),
+            'ollama_rss_gb_max': self._reduce('ollama_rss_gb', 'max'),
+            'available_gb_min': self._reduce('available_gb', 'min'),
+            'swap_used_gb_max': self._reduce('swap_used_gb', 'max')
+        }
+
+    def window(self, start: float, end: float) -> Dict[str, Optional[float]]:
+        """Aggregates over samples taken while a task ran (the next sample, for tasks shorter than the interval)"""
+        lo = int(np.searchsorted(self.t, start, 'left'))
+        hi = int(np.searchsorted(self.t, end, 'right'))
+        if hi <= lo:
+            if lo >= len(self.t) or self.t[lo] > end + self.interval:
+                return {}
+            hi = lo + 1
+
+        aggregates = {key: self._reduce(field, reduction, lo, hi) for key, field, reduction in TASK_AGGREGATES}
+        return {key: value for key, value in aggregates.items() if value is not None}
+
+    def annotate(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Result with a 'resources' dict for its task window, if it ran while sampling"""
+        window = result.get('task_window')
+        if not window or not len(self.t):
+            return result
+        aggregates = self.window(window['start'], window['end'])
+        return {**result, 'resources': aggregates} if aggregates else result
+
+def outlier_report(response_times: np.ndarray, models: np.ndarray,
+                   resources: Dict[str, np.ndarray]) -> Dict[str, Dict[str, Any]]:
+    """Per model: resource aggregates of response-time outliers (above p95) against the other tasks,
+    plus the correlation of response_time with each aggregate"""
+    report = {}
+    for model in [m for m in dict.fromkeys(models.tolist()) if m is not None]:
+        selected = (models == model) & ~np.isnan(response_times)
+        if selected.sum() < 2:
+            continue
+        times = response_times[selected]
+        threshold = float(np.percentile(times, 95))
+        outliers = times > threshold
+        entry = {'tasks': int(selected.sum()), 'p95_response_time': threshold, 'outliers': int(outliers.sum()),
+                 'outlier_mean': {}, 'typical_mean': {}, 'correlation': {}}
+        for key, column in resources.items():
+            values = column[selected]
+            present = ~np.isnan(values)
+            if outliers[present].any():
+                entry['outlier_mean'][key] = float(values[present & outliers].mean())
+            if (~outliers[present]).any():
+                entry['typical_mean'][key] = float(values[present & ~outliers].mean())
+            if present.sum() > 2 and np.std(values[present]) > 0 and np.std(times[present]) > 0:
+                entry['correlation'][key] = float(np.corrcoef(times[present], values[present])[0, 1])
+        report[model] = entry
+    return report
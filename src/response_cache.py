@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Response Cache for Legal AI Benchmarking
+Disk-backed, LRU/size-bounded store of model responses keyed by request payload
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from config import Config
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """Stores one JSON file per request hash.
+
+    Recency is kept in memory (entry sizes in least- to most-recently-used
+    order), seeded once from file mtimes; reads also touch the file so the
+    order survives a restart.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_mb: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or Config.RESPONSE_CACHE_DIR)
+        self.max_bytes = (max_mb or Config.RESPONSE_CACHE_MAX_MB) * 1024 * 1024
+        self.max_entries = max_entries or Config.RESPONSE_CACHE_MAX_ENTRIES
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        stats = sorted(((path.stem, path.stat()) for path in self.cache_dir.glob('*.json')),
+                       key=lambda item: item[1].st_mtime)
+        self._sizes: "OrderedDict[str, int]" = OrderedDict((key, stat.st_size) for key, stat in stats)
+        self._total_bytes = sum(self._sizes.values())
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Hash the generation-relevant part of an /api/chat payload"""
+        keyed = {
+            'model': payload['model'],
+            'messages': payload['messages'],
+            'options': payload.get('options', {})
+        }
+        canonical = json.dumps(keyed, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry and mark it as recently used"""
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        """Atomically write an entry, then evict least-recently-used files"""
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes -= self._sizes.get(key, 0)
+            self._sizes[key] = path.stat().st_size
+            self._sizes.move_to_end(key)
+            self._total_bytes += self._sizes[key]
+            self._evict()
+
+    def _evict(self):
+        """Drop oldest entries until under both the size and count limits"""
+        while self._sizes and (self._total_bytes > self.max_bytes or len(self._sizes) > self.max_entries):
+            key, size = self._sizes.popitem(last=False)
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
+            logger.info(f"Evicted cached response {key[:12]}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._sizes),
+            'size_mb': self._total_bytes / (1024 * 1024),
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -5,168 +5,234 @@ Handles extraction of final content and detection of planning processes
 """
 import re
 import logging
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Iterable, Iterator, Optional
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Ollama/ChatML special tokens, stripped in the same pass as non-ASCII runs
+SPECIAL_TOKENS = ['end', 'im_end', 'im_start', 'endoftext', 'eot', 'eos']
+
+# Prefixes that open a planning preamble (removed up to the next paragraph or capitalized line)
+PLANNING_PREFIXES = [
+    r'Let me (?:craft|produce|create|analyze|think)', r'I\'ll (?:craft|produce|create|analyze)',
+    r'Here\'s my (?:analysis|response|memo)', r'Let me think', r'First, let me', r'To answer this',
+    r'I\'m going to', r'Let me create', r'Let me analyze', r'Let me start', r'I\'ll begin',
+    r'Let me write', r'I\'ll draft', r'We need to', r'Let me produce', r'I will create', r'Let me develop'
+]
+
+# Planning openers, matched only where a response starts (after special tokens and whitespace)
+PLANNING_OPENING_PATTERN = re.compile(
+    r'\s*(?:' + '|'.join(PLANNING_PREFIXES + [r'We have to', r'The user (?:wants|asks|is asking)']) + r')',
+    re.IGNORECASE
+)
+
+# Opening tags of Ollama channel headers, closed by <|message|>
+OLLAMA_TAGS = ['<|start|>', '<|assistant|>', '<|system|>']
+MESSAGE_TAG = '<|message|>'
+
+# Memo header chains (case-insensitive, each label after the previous one)
+MEMO_HEADER_CHAINS = [
+    ['to:', 'from:', 'date:', 'subject:'],
+    ['**to:**', '**from:**', '**date:**', '**subject:**'],
+]
+VALIDATION_HEADER_CHAINS = [
+    ['to:', 'from:', 'subject:'],
+    ['**to:**', '**from:**', '**subject:**'],
+]
+
+def find_chain(text_lower: str, labels: List[str]) -> int:
+    """Start of the first label if every later label follows it in order, else -1.
+
+    Equivalent to ``re.search('A.*?B.*?C', text, IGNORECASE | DOTALL).start()``
+    but a handful of ``str.find`` calls instead of a backtracking scan.
+    """
+    start = text_lower.find(labels[0])
+    if start < 0:
+        return -1
+    position = start + len(labels[0])
+    for label in labels[1:]:
+        position = text_lower.find(label, position)
+        if position < 0:
+            return -1
+        position += len(label)
+    return start
+
+def find_ollama_tag(text: str) -> str:
+    """First Ollama tag that is followed by a <|message|> tag, or an empty string"""
+    last_message = text.rfind(MESSAGE_TAG)
+    if last_message < 0:
+        return ""
+    for tag in OLLAMA_TAGS:
+        position = text.find(tag)
+        if 0 <= position and position + len(tag) <= last_message:
+            return tag
+    return ""
+
 class ResponsePostProcessor:
     """Post-processes AI responses to extract final content and detect planning"""
-    
-    def __init__(self):
-        # Enhanced planning detection patterns
-        self.planning_patterns = [
-            r'<\|start\|>.*?<\|message\|>',  # Ollama tags
-            r'<\|assistant\|>.*?<\|message\|>',
-            r'<\|system\|>.*?<\|message\|>',
-            r'Let me (craft|produce|create|analyze|think).*?(?=\n\n|\n[A-Z])',
-            r'I\'ll (craft|produce|create|analyze).*?(?=\n\n|\n[A-Z])',
-            r'Here\'s my (analysis|response|memo).*?(?=\n\n|\n[A-Z])',
-            r'Let me think.*?(?=\n\n|\n[A-Z])',
-            r'First, let me.*?(?=\n\n|\n[A-Z])',
-            r'To answer this.*?(?=\n\n|\n[A-Z])',
-            r'I\'m going to.*?(?=\n\n|\n[A-Z])',
-            r'Let me create.*?(?=\n\n|\n[A-Z])',
-            r'Let me analyze.*?(?=\n\n|\n[A-Z])',
-            r'Let me start.*?(?=\n\n|\n[A-Z])',
-            r'I\'ll begin.*?(?=\n\n|\n[A-Z])',
-            r'Let me write.*?(?=\n\n|\n[A-Z])',
-            r'I\'ll draft.*?(?=\n\n|\n[A-Z])',
-            r'We need to.*?(?=\n\n|\n[A-Z])',
-            r'Let me produce.*?(?=\n\n|\n[A-Z])',
-            r'I will create.*?(?=\n\n|\n[A-Z])',
-            r'Let me develop.*?(?=\n\n|\n[A-Z])'
-        ]
-        
-        # Memo structure indicators
-        self.memo_indicators = [
-            r'To:.*?From:.*?Date:.*?Subject:',
-            r'\*\*To:\*\*.*?\*\*From:\*\*.*?\*\*Date:\*\*.*?\*\*Subject:\*\*',
-            r'Memo\s*To:',
-            r'\*\*Memo\*\*\s*To:',
-        ]
-        
-        # Planning keywords for detection
-        self.planning_keywords = [
-            'planning', 'craft', 'produce', 'let me', 'i\'ll', 'here\'s my',
-            'first, let me', 'to answer this', 'let me think', 'i will',
-            'let me create', 'i\'m going to', 'let me analyze', 'i\'m going to',
-            'let me start', 'i\'ll begin', 'let me write', 'i\'ll draft',
-            'we need to', 'let me produce', 'i will create', 'let me develop'
-        ]
-    
+
+    # Pattern sources, kept for reference and reuse by other components
+    planning_patterns = [re.escape(tag) + r'.*?<\|message\|>' for tag in OLLAMA_TAGS] + \
+        [rf'{prefix}.*?(?=\n\n|\n[A-Z])' for prefix in PLANNING_PREFIXES]
+
+    memo_indicators = [
+        r'To:.*?From:.*?Date:.*?Subject:',
+        r'\*\*To:\*\*.*?\*\*From:\*\*.*?\*\*Date:\*\*.*?\*\*Subject:\*\*',
+        r'Memo\s*To:',
+        r'\*\*Memo\*\*\s*To:',
+    ]
+
+    planning_keywords = [
+        'planning', 'craft', 'produce', 'let me', 'i\'ll', 'here\'s my',
+        'first, let me', 'to answer this', 'let me think', 'i will',
+        'let me create', 'i\'m going to', 'let me analyze', 'i\'m going to',
+        'let me start', 'i\'ll begin', 'let me write', 'i\'ll draft',
+        'we need to', 'let me produce', 'i will create', 'let me develop'
+    ]
+
+    legal_indicators = [
+        r'Pregnancy Discrimination Act', r'Title VII', r'FMLA', r'legal authority',
+        r'citation', r'statute', r'regulation'
+    ]
+
+    # Compiled once; every pass below is linear in the response length. Removal
+    # passes run case-sensitively over a lowercased copy (the text is ASCII by
+    # then, so offsets line up), which is far faster than IGNORECASE scanning.
+    STRIP_PATTERN = re.compile(
+        r'<\|(?:' + '|'.join(SPECIAL_TOKENS) + r')\|>|[^\x00-\x7F]+', re.IGNORECASE
+    )
+    TAG_PATTERNS = [re.compile(re.escape(tag) + r'.*?<\|message\|>', re.DOTALL) for tag in OLLAMA_TAGS]
+    PLANNING_PATTERN = re.compile(
+        r'(?:' + '|'.join(PLANNING_PREFIXES).lower() + r').*?(?=\n\n|\n[a-z])', re.DOTALL
+    )
+    TERMINATOR_PATTERN = re.compile(r'\n(?=[\na-z])')
+    MEMO_TO_PATTERNS = [re.compile(r'Memo\s*To:', re.IGNORECASE), re.compile(r'\*\*Memo\*\*\s*To:', re.IGNORECASE)]
+    LEGAL_PATTERNS = [re.compile(indicator, re.IGNORECASE) for indicator in legal_indicators]
+    KEYWORD_PATTERN = re.compile('|'.join(re.escape(k) for k in dict.fromkeys(planning_keywords)))
+    META_PATTERN = re.compile(
+        r'let me (?:craft|produce|create|analyze)|i\'ll (?:craft|produce|create|analyze)|'
+        r'here\'s my (?:analysis|response|memo)|let me think|first, let me|to answer this|we need to|i\'m going to'
+    )
+    CITATION_PATTERN = re.compile(r'\d+ U\.S\.C\.|\(\d{4}\)|v\. [A-Z]|, \d+ F\.|NY Slip Op')
+    CITATION_COUNT_PATTERN = re.compile(r'\d+ U\.S\.C\.|\(\d{4}\)|v\.|, \d+ F\.')
+    EXCESS_NEWLINES = re.compile(r'\n{3,}')
+
+    def _remove_matches(self, pattern: re.Pattern, text: str, lowered: str, cut: int) -> Tuple[str, str]:
+        """Remove pattern matches found in lowered[:cut] from both copies of the text.
+
+        A lazy ``.*?`` with no closing delimiter later in the text would
+        rescan to the end from every opening; limiting the search to the span
+        ending at the last delimiter keeps the pass linear.
+        """
+        if cut <= 0:
+            return text, lowered
+
+        kept = []
+        position = 0
+        for match in pattern.finditer(lowered, 0, cut):
+            kept.append((position, match.start()))
+            position = match.end()
+        if not kept:
+            return text, lowered
+        kept.append((position, len(text)))
+        return ''.join(text[i:j] for i, j in kept), ''.join(lowered[i:j] for i, j in kept)
+
+    def _last_terminator(self, text: str) -> int:
+        """Offset just past the last blank line or newline-before-letter, or -1"""
+        position = len(text)
+        while True:
+            position = text.rfind('\n', 0, position)
+            if position < 0:
+                return -1
+            if self.TERMINATOR_PATTERN.match(text, position):
+                return position + 2
+
+    def remove_planning(self, text: str, lowered: str) -> Tuple[str, str]:
+        """Drop planning preambles from ASCII text and its lowercased copy"""
+        return self._remove_matches(self.PLANNING_PATTERN, text, lowered, self._last_terminator(lowered))
+
+    def find_memo_start(self, text: str, lowered: str) -> int:
+        """Offset where the memo (or failing that, legal content) begins, or -1"""
+        for chain in MEMO_HEADER_CHAINS:
+            memo_start = find_chain(lowered, chain)
+            if memo_start >= 0:
+                return memo_start
+
+        for pattern in self.MEMO_TO_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                return match.start()
+
+        # If no memo structure found, try to find professional content
+        for pattern in self.LEGAL_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                return max(0, match.start() - 100)  # Start 100 chars before
+
+        return -1
+
     def extract_final_content(self, response: str) -> str:
         """Extract final memo content, removing planning and internal thoughts"""
-        
+
         if not response:
             return ""
-        
-        # Remove unicode artifacts first
-        cleaned_response = response
-        
-        # Remove unicode and special characters
-        unicode_patterns = [
-            r'<\|end\|>',
-            r'<\|im_end\|>',
-            r'<\|im_start\|>',
-            r'<\|endoftext\|>',
-            r'<\|eot\|>',
-            r'<\|eos\|>'
-        ]
-        
-        for pattern in unicode_patterns:
-            cleaned_response = re.sub(pattern, '', cleaned_response, flags=re.IGNORECASE)
-        
-        # Remove non-ASCII characters that might cause issues
-        cleaned_response = re.sub(r'[^\x00-\x7F]+', '', cleaned_response)
-        
-        # Remove common planning indicators
-        for pattern in self.planning_patterns:
-            cleaned_response = re.sub(pattern, '', cleaned_response, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Find the actual memo content
-        memo_start = -1
-        for indicator in self.memo_indicators:
-            match = re.search(indicator, cleaned_response, re.IGNORECASE | re.DOTALL)
-            if match:
-                memo_start = match.start()
+
+        # Special tokens and non-ASCII runs in one pass
+        cleaned_response = self.STRIP_PATTERN.sub('', response)
+
+        # Ollama channel headers, each only up to the last remaining <|message|>
+        lowered = cleaned_response.lower()
+        for pattern in self.TAG_PATTERNS:
+            last_message = lowered.rfind(MESSAGE_TAG)
+            if last_message < 0:
                 break
-        
-        # If no memo structure found, try to find professional content
-        if memo_start == -1:
-            # Look for legal content indicators
-            legal_indicators = [
-                r'Pregnancy Discrimination Act',
-                r'Title VII',
-                r'FMLA',
-                r'legal authority',
-                r'citation',
-                r'statute',
-                r'regulation'
-            ]
-            
-            for indicator in legal_indicators:
-                match = re.search(indicator, cleaned_response, re.IGNORECASE)
-                if match:
-                    memo_start = max(0, match.start() - 100)  # Start 100 chars before
-                    break
-        
+            cleaned_response, lowered = self._remove_matches(
+                pattern, cleaned_response, lowered, last_message + len(MESSAGE_TAG)
+            )
+
+        # Planning preambles, only up to the last paragraph/heading terminator
+        cleaned_response, lowered = self.remove_planning(cleaned_response, lowered)
+
+        # Find the actual memo content
+        memo_start = self.find_memo_start(cleaned_response, lowered)
+
         # Extract content from memo start
         if memo_start >= 0:
             cleaned_response = cleaned_response[memo_start:]
-        
+
         # Clean up any remaining artifacts
-        cleaned_response = re.sub(r'\n{3,}', '\n\n', cleaned_response)  # Remove excessive newlines
-        cleaned_response = re.sub(r'^\s+', '', cleaned_response)  # Remove leading whitespace
-        cleaned_response = cleaned_response.strip()
-        
-        return cleaned_response
-    
+        cleaned_response = self.EXCESS_NEWLINES.sub('\n\n', cleaned_response)
+        return cleaned_response.strip()
+
     def detect_planning_content(self, response: str) -> bool:
         """Detect planning content and return detection status (no penalty scoring)"""
-        
+
         if not response:
             return False
-        
+
         response_lower = response.lower()
-        
+
         # Check for planning keywords
-        for keyword in self.planning_keywords:
-            if keyword in response_lower:
-                logger.info(f"Planning keyword detected: {keyword}")
-                return True
-        
+        match = self.KEYWORD_PATTERN.search(response_lower)
+        if match:
+            logger.info(f"Planning keyword detected: {match.group()}")
+            return True
+
         # Check for Ollama tags
-        ollama_tag_patterns = [
-            r'<\|start\|>.*?<\|message\|>',
-            r'<\|assistant\|>.*?<\|message\|>',
-            r'<\|system\|>.*?<\|message\|>'
-        ]
-        
-        for pattern in ollama_tag_patterns:
-            if re.search(pattern, response, re.DOTALL):
-                logger.info(f"Ollama tag detected: {pattern}")
-                return True
-        
+        tag = find_ollama_tag(response)
+        if tag:
+            logger.info(f"Ollama tag detected: {tag}")
+            return True
+
         # Check for meta-commentary
-        meta_patterns = [
-            r'let me (craft|produce|create|analyze)',
-            r'i\'ll (craft|produce|create|analyze)',
-            r'here\'s my (analysis|response|memo)',
-            r'let me think',
-            r'first, let me',
-            r'to answer this',
-            r'we need to',
-            r'i\'m going to'
-        ]
-        
-        for pattern in meta_patterns:
-            if re.search(pattern, response_lower):
-                logger.info(f"Meta-commentary detected: {pattern}")
-                return True
-        
+        match = self.META_PATTERN.search(response_lower)
+        if match:
+            logger.info(f"Meta-commentary detected: {match.group()}")
+            return True
+
         return False
-    
+
     def process_with_retries(self, response: str, max_retries: int = 2) -> str:
         """Process response with retry logic if planning detected"""
         
@@ -203,19 +269,13 @@ class ResponsePostProcessor:
         }
         
         # Check for memo header
-        header_patterns = [
-            r'To:.*?From:.*?Subject:',
-            r'\*\*To:\*\*.*?\*\*From:\*\*.*?\*\*Subject:\*\*',
-            r'Memo\s*To:',
-            r'\*\*Memo\*\*\s*To:'
-        ]
-        
-        for pattern in header_patterns:
-            if re.search(pattern, response, re.IGNORECASE | re.DOTALL):
-                validation['has_to_from_subject'] = True
-                validation['has_memo_structure'] = True
-                break
-        
+        lowered = response.lower()
+        has_header = any(find_chain(lowered, chain) >= 0 for chain in VALIDATION_HEADER_CHAINS) or \
+            any(pattern.search(response) for pattern in self.MEMO_TO_PATTERNS)
+        if has_header:
+            validation['has_to_from_subject'] = True
+            validation['has_memo_structure'] = True
+
         # Check for sections
         sections = ['Introduction', 'Analysis', 'Conclusion']
         found_sections = 0
@@ -228,20 +288,10 @@ class ResponsePostProcessor:
             validation['structure_score'] += 0.5
         
         # Check for citations
-        citation_patterns = [
-            r'\d+ U\.S\.C\.',
-            r'\(\d{4}\)',
-            r'v\. [A-Z]',
-            r', \d+ F\.',
-            r'NY Slip Op'
-        ]
-        
-        for pattern in citation_patterns:
-            if re.search(pattern, response):
-                validation['has_citations'] = True
-                validation['structure_score'] += 0.3
-                break
-        
+        if self.CITATION_PATTERN.search(response):
+            validation['has_citations'] = True
+            validation['structure_score'] += 0.3
+
         # Add score for memo structure
         if validation['has_memo_structure']:
             validation['structure_score'] += 0.2
@@ -288,7 +338,7 @@ class ResponsePostProcessor:
         quality_metrics['legal_accuracy'] = min(1.0, legal_term_count / 5.0)
         
         # Citation quality
-        citation_count = len(re.findall(r'\d+ U\.S\.C\.|\(\d{4}\)|v\.|, \d+ F\.', response))
+        citation_count = len(self.CITATION_COUNT_PATTERN.findall(response))
         quality_metrics['citation_quality'] = min(1.0, citation_count / 3.0)
         
         return quality_metrics
@@ -323,3 +373,221 @@ class ResponsePostProcessor:
                 'structure_validated': structure_validation['has_memo_structure']
             }
         }
+
+class StreamingResponsePostProcessor:
+    """Cleans a response incrementally as stream chunks arrive.
+
+    Special tokens and non-ASCII runs are stripped holding back at most one
+    partial token; an Ollama channel header is held until its <|message|>
+    (at most ``header_chars`` later). The planning preamble is resolved over
+    the first ``preamble_chars`` characters, or as soon as a To/From/Date/
+    Subject header is complete, after which text passes straight through.
+    A response that opens with planning and has no header in that window
+    keeps only its last ``preamble_chars`` characters while it rambles on
+    (up to ``max_planning_chars``), so the ramble is dropped once the memo
+    starts; if it never does, the same planning removal runs over what is
+    left at the end. Nothing is released that is later retracted, so
+    ``text`` is exactly what ``stream()`` yielded. Outside such a ramble the
+    output does not depend on how the text is split into chunks.
+    """
+
+    MAX_TOKEN_CHARS = max(len(f'<|{token}|>') for token in SPECIAL_TOKENS)
+
+    def __init__(self, preamble_chars: int = 4000, header_chars: int = 512, max_planning_chars: int = 32000):
+        self.preamble_chars = preamble_chars
+        self.header_chars = header_chars
+        self.max_planning_chars = max_planning_chars
+        self._processor = ResponsePostProcessor()
+        self._raw = ""          # possible partial special token
+        self._pending = ""      # text from an unterminated channel header
+        self._preamble = ""     # text before the preamble is resolved
+        self._resolved = False
+        self._dropped = None    # planning chars dropped from the preamble, once it is sliding
+        self._started = False   # leading whitespace already dropped
+        self._whitespace = ""   # trailing whitespace, held until more text arrives
+        self.parts: List[str] = []
+
+    @classmethod
+    def clean(cls, response: str) -> str:
+        """Run a complete response through the streaming pipeline in one go"""
+        processor = cls()
+        processor.feed(response)
+        processor.finish()
+        return processor.text
+
+    @property
+    def text(self) -> str:
+        """Clean text released so far"""
+        return "".join(self.parts)
+
+    def stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Yield clean text for an iterable of raw text chunks"""
+        for chunk in chunks:
+            cleaned = self.feed(chunk)
+            if cleaned:
+                yield cleaned
+        cleaned = self.finish()
+        if cleaned:
+            yield cleaned
+
+    def feed(self, chunk: str) -> str:
+        """Consume one raw chunk and return the clean text it releases"""
+        return self._advance(chunk, final=False)
+
+    def finish(self) -> str:
+        """Flush everything held back at the end of the stream"""
+        return self._advance("", final=True)
+
+    def _advance(self, chunk: str, final: bool) -> str:
+        text = self._strip_tokens(chunk, final)
+        text = self._strip_headers(text, final)
+        text = self._resolve_preamble(text, final)
+        released = self._emit(text, final)
+        if released:
+            self.parts.append(released)
+        return released
+
+    def _strip_tokens(self, chunk: str, final: bool) -> str:
+        raw = self._raw + chunk
+        self._raw = ""
+        if not final:
+            # A token can only span the boundary if it starts at the last '<'
+            partial = raw.rfind('<')
+            if partial >= 0 and '>' not in raw[partial:] and len(raw) - partial < self.MAX_TOKEN_CHARS:
+                raw, self._raw = raw[:partial], raw[partial:]
+        return ResponsePostProcessor.STRIP_PATTERN.sub('', raw)
+
+    def _strip_headers(self, text: str, final: bool) -> str:
+        pending = self._pending + text
+        self._pending = ""
+        window = self.header_chars + len(MESSAGE_TAG)
+        released = []
+
+        while pending:
+            lowered = pending.lower()
+            starts = [(lowered.find(tag), tag) for tag in OLLAMA_TAGS]
+            starts = [(start, tag) for start, tag in starts if start >= 0]
+            if not starts:
+                released.append(pending)
+                break
+
+            start, tag = min(starts)
+            released.append(pending[:start])
+            pending, lowered = pending[start:], lowered[start:]
+
+            end = lowered.find(MESSAGE_TAG, 0, window)
+            if end >= 0:
+                pending = pending[end + len(MESSAGE_TAG):]
+            elif final or len(pending) >= window:
+                # No <|message|> close enough; treat the tag as ordinary text
+                released.append(pending[:len(tag)])
+                pending = pending[len(tag):]
+            else:
+                self._pending = pending
+                break
+
+        return "".join(released)
+
+    def _resolve_preamble(self, text: str, final: bool) -> str:
+        if self._resolved:
+            return text
+
+        self._preamble += text
+        sliding = self._dropped is not None
+        # A sliding preamble is already bounded, so all of it is searched
+        window = self._preamble if sliding else self._preamble[:self.preamble_chars]
+        lowered = window.lower()
+
+        memo_start = find_chain(lowered, MEMO_HEADER_CHAINS[0])
+        if memo_start >= 0:
+            body = self._preamble[memo_start:]
+        elif not final and len(self._preamble) < self.preamble_chars:
+            return ""
+        elif not final and (sliding or PLANNING_OPENING_PATTERN.match(self._preamble)) \
+                and (self._dropped or 0) < self.max_planning_chars:
+            # Planning ran past the window: keep looking for the memo with bounded lookback
+            self._dropped = (self._dropped or 0) + max(0, len(self._preamble) - self.preamble_chars)
+            self._preamble = self._preamble[-self.preamble_chars:]
+            return ""
+        else:
+            rest = "" if sliding else self._preamble[self.preamble_chars:]
+            window, lowered = self._processor.remove_planning(window, lowered)
+            memo_start = self._processor.find_memo_start(window, lowered)
+            body = window[max(memo_start, 0):] + rest
+
+        self._resolved = True
+        self._preamble = ""
+        return body
+
+    def _emit(self, text: str, final: bool) -> str:
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+
+        text = self._whitespace + text
+        trimmed = text.rstrip()
+        self._whitespace = "" if final else text[len(trimmed):]
+        return ResponsePostProcessor.EXCESS_NEWLINES.sub('\n\n', trimmed)
+
+class PlanningStreamGuard:
+    """Decides when to abort a stream that opens with planning instead of the memo.
+
+    Only the first ``watch_tokens`` chunks of each attempt are inspected, and
+    a planning phrase counts only where the response starts (after special
+    tokens and whitespace), not in later prose; a complete To/From/Date/
+    Subject header disarms the guard early. After ``max_restarts`` aborts
+    the final attempt runs unguarded.
+    """
+
+    OPENING_PATTERN = PLANNING_OPENING_PATTERN
+
+    def __init__(self, watch_tokens: int = 64, max_restarts: int = 2):
+        self.watch_tokens = watch_tokens
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.aborted_at: List[int] = []   # tokens streamed before each abort
+        self.triggers: List[str] = []     # phrase or tag behind each abort
+        self.start_attempt()
+
+    def start_attempt(self):
+        self._window: List[str] = []
+        self._tokens = 0
+        self._watching = self.restarts < self.max_restarts
+
+    def observe(self, content: str) -> bool:
+        """Record one streamed chunk; True means abort this attempt now"""
+        if not self._watching or not content:
+            return False
+
+        self._tokens += 1
+        self._window.append(content)
+        window = "".join(self._window)
+
+        if find_chain(window.lower(), MEMO_HEADER_CHAINS[0]) >= 0:
+            self._watching = False
+            return False
+
+        match = self.OPENING_PATTERN.match(ResponsePostProcessor.STRIP_PATTERN.sub('', window))
+        trigger = match.group().strip() if match else find_ollama_tag(window)
+        if trigger:
+            logger.info(f"Planning opener '{trigger}' after {self._tokens} tokens; restarting stream")
+            self.restarts += 1
+            self.aborted_at.append(self._tokens)
+            self.triggers.append(trigger)
+            self.start_attempt()
+            return True
+
+        if self._tokens >= self.watch_tokens:
+            self._watching = False
+        return False
+
+    def stats(self, accepted_tokens: int) -> Dict[str, Any]:
+        """Restart counts; an aborted attempt is assumed to have run as long as the accepted one"""
+        return {
+            'restarts': self.restarts,
+            'triggers': self.triggers,
+            'tokens_wasted': sum(self.aborted_at),
+            'tokens_saved': sum(max(0, accepted_tokens - tokens) for tokens in self.aborted_at)
+        }
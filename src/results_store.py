@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Columnar Results Store for Legal AI Benchmarking
+Typed per-column NumPy files for scores, latencies and identifiers; response text kept apart
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+BLOBS = "responses.jsonl"
+BLOB_OFFSETS = "blob_offsets.npy"
+
+# (dotted path into a result dict, kind); everything else stays in the row blob
+COLUMNS: List[Tuple[str, str]] = [
+    ('model', 'category'),
+    ('temperature', 'float'),
+    ('category', 'category'),
+    ('question', 'category'),
+    ('status', 'category'),
+    ('context_id', 'category'),
+    ('context_length', 'int'),
+    ('response_time', 'float'),
+    ('comprehensive_score', 'float'),
+    ('planning_detected', 'bool'),
+    ('cache_hit', 'bool'),
+    ('metrics.response_time', 'float'),
+    ('metrics.word_count', 'int'),
+    ('metrics.citation_count', 'int'),
+    ('metrics.aspect_coverage', 'float'),
+    ('metrics.legal_analysis_score', 'float'),
+    ('metrics.response_completeness', 'float'),
+    ('metrics.alignment_to_question', 'float'),
+    ('metrics.zero_hallucination_compliance', 'float'),
+    ('metrics.accuracy', 'float'),
+    ('metrics.citations', 'float'),
+    ('metrics.clarity', 'float'),
+    ('metrics.explaining', 'float'),
+    ('metrics.comprehensiveness', 'float'),
+    ('generation_metrics.ttft', 'float'),
+    ('generation_metrics.itl_p50', 'float'),
+    ('generation_metrics.itl_p90', 'float'),
+    ('generation_metrics.itl_p99', 'float'),
+    ('generation_metrics.tokens_per_second', 'float'),
+    ('generation_metrics.prompt_eval_count', 'int'),
+    ('generation_metrics.prompt_eval_duration', 'float'),
+    ('generation_metrics.eval_count', 'int'),
+    ('generation_metrics.eval_duration', 'float'),
+    ('planning_guard.restarts', 'int'),
+    ('planning_guard.tokens_wasted', 'int'),
+    ('planning_guard.tokens_saved', 'int'),
+    ('stage_timings.queue_wait', 'float'),
+    ('stage_timings.retrieve', 'float'),
+    ('stage_timings.prompt', 'float'),
+    ('stage_timings.fingerprint', 'float'),
+    ('stage_timings.cache_lookup', 'float'),
+    ('stage_timings.generate', 'float'),
+    ('stage_timings.post_process', 'float'),
+    ('stage_timings.evaluate', 'float'),
+    ('task_window.start', 'float'),
+    ('task_window.end', 'float'),
+    ('resources.cpu_percent_max', 'float'),
+    ('resources.cpu_percent_mean', 'float'),
+    ('resources.ollama_rss_gb_max', 'float'),
+    ('resources.available_gb_min', 'float'),
+    ('resources.swap_used_gb_max', 'float'),
+    ('resources.swap_out_mb_s_max', 'float'),
+    ('resources.disk_read_mb_s_max', 'float'),
+    ('resources.disk_write_mb_s_max', 'float')
+]
+
+# Array dtype and the fill used when a row has no (or a non-conforming) value
+KINDS = {
+    'category': (np.int32, -1),
+    'float': (np.float64, np.nan),
+    # Counts are float64 too, so a missing count is NaN rather than a 0 that drags means down
+    'int': (np.float64, np.nan),
+    'bool': (np.bool_, False)
+}
+
+def _accepts(kind: str, value: Any) -> bool:
+    if kind == 'bool':
+        return isinstance(value, (bool, np.bool_))
+    if isinstance(value, (bool, np.bool_)):
+        return False
+    if kind == 'int':
+        return isinstance(value, (int, np.integer))
+    if kind == 'float':
+        return isinstance(value, (int, float, np.integer, np.floating))
+    return isinstance(value, str)
+
+def _pop(row: Dict[str, Any], path: str) -> Tuple[bool, Any]:
+    """Remove and return a dotted-path value, dropping parents it leaves empty"""
+    parts = path.split('.')
+    parents = [row]
+    for part in parts[:-1]:
+        child = parents[-1].get(part)
+        if not isinstance(child, dict):
+            return False, None
+        parents.append(child)
+    if parts[-1] not in parents[-1]:
+        return False, None
+    value = parents[-1].pop(parts[-1])
+    for parent, part in zip(reversed(parents[:-1]), reversed(parts[:-1])):
+        if parent[part]:
+            break
+        del parent[part]
+    return True, value
+
+def _put(row: Dict[str, Any], path: str, value: Any):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        row = row.setdefault(part, {})
+    row[parts[-1]] = value
+
+class ResultsStore:
+    """Benchmark results as one memory-mapped .npy file per column.
+
+    Identifiers are dictionary-encoded (int32 codes plus a vocabulary in the
+    manifest), scores, latencies and counts are float64 with NaN for missing
+    values (counts are turned back into ints when rows are reassembled).
+    Response text and every field without a column go to responses.jsonl,
+    one row per line, with byte offsets so single rows can be read back.
+    Summaries only touch the columns they aggregate.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        with open(self.directory / MANIFEST, 'r') as f:
+            self.manifest = json.load(f)
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.manifest['rows']
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.manifest.get('metadata', {})
+
+    @classmethod
+    def write(cls, directory: Path, results: Iterable[Dict[str, Any]],
+              metadata: Optional[Dict[str, Any]] = None) -> "ResultsStore":
+        """Split result dicts into typed columns and row blobs under directory"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        values: Dict[str, list] = {path: [] for path, _ in COLUMNS}
+        vocabularies: Dict[str, Dict[str, int]] = {path: {} for path, kind in COLUMNS if kind == 'category'}
+        offsets = [0]
+
+        with open(directory / BLOBS, 'wb') as blobs:
+            for result in results:
+                row = json.loads(json.dumps(result))  # private, JSON-typed copy
+                skipped = []
+                for path, kind in COLUMNS:
+                    found, value = _pop(row, path)
+                    if found and _accepts(kind, value):
+                        if kind == 'category':
+                            value = vocabularies[path].setdefault(value, len(vocabularies[path]))
+                        values[path].append(value)
+                    else:
+                        # Absent or non-conforming values stay in the blob untouched
+                        if found:
+                            _put(row, path, value)
+                        values[path].append(KINDS[kind][1])
+                        skipped.append(path)
+                if skipped:
+                    row['_skipped'] = skipped
+                line = (json.dumps(row) + "\n").encode('utf-8')
+                blobs.write(line)
+                offsets.append(offsets[-1] + len(line))
+
+        columns = {}
+        for path, kind in COLUMNS:
+            np.save(directory / f"{path}.npy", np.array(values[path], dtype=KINDS[kind][0]))
+            columns[path] = {'kind': kind}
+            if kind == 'category':
+                columns[path]['vocab'] = list(vocabularies[path])
+        np.save(directory / BLOB_OFFSETS, np.array(offsets, dtype=np.int64))
+
+        # Manifest last: its presence marks a complete store
+        with open(directory / MANIFEST, 'w') as f:
+            json.dump({'version': 1, 'rows': len(offsets) - 1, 'columns': columns,
+                       'metadata': metadata or {}}, f, indent=2)
+
+        logger.info(f"Wrote {len(offsets) - 1} results to {directory}")
+        return cls(directory)
+
+    def write_metadata(self, **metadata: Any):
+        """Merge run-level information (summary, config) into the manifest"""
+        self.manifest.setdefault('metadata', {}).update(metadata)
+        with open(self.directory / MANIFEST, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+
+    def column(self, name: str) -> np.ndarray:
+        """Raw column (category columns are codes), memory-mapped"""
+        if name not in self._arrays:
+            if name not in self.manifest['columns']:
+                raise KeyError(f"No column {name!r} in {self.directory}")
+            self._arrays[name] = np.load(self.directory / f"{name}.npy", mmap_mode='r')
+        return self._arrays[name]
+
+    def vocab(self, name: str) -> List[str]:
+        return self.manifest['columns'][name].get('vocab', [])
+
+    def decode(self, name: str) -> np.ndarray:
+        """Category column as an object array of its values (None where missing)"""
+        lookup = np.array(self.vocab(name) + [None], dtype=object)
+        return lookup[self.column(name)]
+
+    def mask(self, **equals: Any) -> np.ndarray:
+        """Rows where every named column equals the given value"""
+        selected = np.ones(len(self), dtype=bool)
+        for name, value in equals.items():
+            column = self.column(name)
+            if self.manifest['columns'][name]['kind'] == 'category':
+                vocab = self.vocab(name)
+                if value not in vocab:
+                    return np.zeros(len(self), dtype=bool)
+                selected &= column == vocab.index(value)
+            else:
+                selected &= column == value
+        return selected
+
+    def mean(self, name: str, mask: Optional[np.ndarray] = None) -> Optional[float]:
+        """Mean of a numeric column over the selected rows, ignoring missing values"""
+        values = np.asarray(self.column(name), dtype=np.float64)
+        if mask is not None:
+            values = values[mask]
+        values = values[~np.isnan(values)]
+        return float(values.mean()) if len(values) else None
+
+    def total(self, name: str, mask: Optional[np.ndarray] = None) -> int:
+        """Sum of a numeric or bool column over the selected rows, ignoring missing values"""
+        values = self.column(name)
+        return int(np.nansum(values[mask] if mask is not None else values))
+
+    def group_mean(self, name: str, by: str, mask: Optional[np.ndarray] = None) -> Dict[Any, float]:
+        """Mean of name per distinct value of by (a category or numeric column)"""
+        selected = mask if mask is not None else np.ones(len(self), dtype=bool)
+        values = np.asarray(self.column(name), dtype=np.float64)
+        selected = selected & ~np.isnan(values)
+
+        keys = self.column(by)
+        groups, inverse = np.unique(keys[selected], return_inverse=True)
+        sums = np.bincount(inverse, weights=values[selected], minlength=len(groups))
+        counts = np.bincount(inverse, minlength=len(groups))
+
+        if self.manifest['columns'][by]['kind'] == 'category':
+            vocab = self.vocab(by)
+            labels = [vocab[g] if g >= 0 else None for g in groups]
+        else:
+            labels = groups.tolist()
+        return {label: float(s / c) for label, s, c in zip(labels, sums, counts)}
+
+    def best_model(self, models: Sequence[str], mask: Optional[np.ndarray] = None) -> Optional[str]:
+        """Model with the highest mean comprehensive_score (first listed wins ties)"""
+        means = self.group_mean('comprehensive_score', 'model', mask)
+        candidates = [m for m in models if m in means]
+        return max(candidates, key=lambda m: means[m]) if candidates else None
+
+    def records(self, indices: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+        """Reassembled result dicts (all rows, or just the given ones)"""
+        offsets = np.load(self.directory / BLOB_OFFSETS, mmap_mode='r')
+        arrays = {path: self.column(path) for path, _ in COLUMNS if path in self.manifest['columns']}
+        kinds = {path: self.manifest['columns'][path]['kind'] for path in arrays}
+        vocabs = {path: self.vocab(path) for path in arrays if kinds[path] == 'category'}
+        indices = range(len(self)) if indices is None else indices
+
+        with open(self.directory / BLOBS, 'rb') as blobs:
+            for i in indices:
+                blobs.seek(int(offsets[i]))
+                row = json.loads(blobs.read(int(offsets[i + 1] - offsets[i])))
+                skipped = set(row.pop('_skipped', []))
+                for path, array in arrays.items():
+                    if path in skipped:
+                        continue
+                    value = array[i].item()
+                    if path in vocabs:
+                        value = vocabs[path][value]
+                    elif kinds[path] == 'int':
+                        value = int(value)
+                    _put(row, path, value)
+                yield row
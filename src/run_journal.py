@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Run Journal for Legal AI Benchmarking
+Append-only, fsync'd JSONL record of completed tasks so long runs survive crashes and resume
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, Set
+
+from config import Config
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+def task_id(model: str, temperature: float, scenario: Dict[str, Any]) -> str:
+    """Deterministic ID of one (model, temperature, scenario) benchmark task"""
+    key = json.dumps([model, float(temperature), scenario.get('category'), scenario.get('question')])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+class RunJournal:
+    """One JSONL file per run: a header line, then one line per finished task.
+
+    Each append is flushed and fsync'd before it returns, so a crash loses
+    at most the task in flight. A torn last line from a crash mid-write is
+    cut off when the journal is reopened. When a task appears more than
+    once (an error retried on resume) the latest line wins.
+    """
+
+    def __init__(self, run_id: str, directory: Optional[Path] = None, resume: bool = False):
+        self.run_id = run_id
+        self.path = Path(directory or Config.RUN_JOURNAL_DIR) / f"{run_id}.jsonl"
+        self._lock = threading.Lock()
+
+        if resume:
+            if not self.path.exists():
+                raise FileNotFoundError(f"No journal for run {run_id} at {self.path}")
+            self._truncate_torn_tail()
+            self.header = self._read_header()
+        else:
+            if self.path.exists():
+                raise FileExistsError(f"Journal for run {run_id} already exists; use resume")
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.header = {'run_id': run_id, 'started_at': datetime.now().isoformat()}
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if not resume:
+            self._write({'journal': self.header})
+
+    @property
+    def started_at(self) -> datetime:
+        return datetime.fromisoformat(self.header['started_at'])
+
+    def _truncate_torn_tail(self):
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            end = data.rfind(b'\n') + 1
+            if end < len(data):
+                logger.warning(f"Dropping {len(data) - end} bytes of a partial journal line in {self.path}")
+                f.truncate(end)
+
+    def _read_header(self) -> Dict[str, Any]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            first = f.readline()
+        try:
+            return json.loads(first)['journal']
+        except (ValueError, KeyError):
+            return {'run_id': self.run_id, 'started_at': datetime.now().isoformat()}
+
+    def _write(self, entry: Dict[str, Any]):
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def append(self, result: Dict[str, Any]):
+        """Durably record one finished task (result must carry 'task_id')"""
+        self._write(result)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _entries(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if 'task_id' in entry:
+                    yield entry
+
+    def completed_ids(self) -> Set[str]:
+        """Tasks whose latest journal entry succeeded (errors are retried on resume)"""
+        status = {}
+        for entry in self._entries():
+            status[entry['task_id']] = entry.get('status')
+        return {tid for tid, value in status.items() if value == 'success'}
+
+    def results(self) -> Iterator[Dict[str, Any]]:
+        """Stream the latest result of every task from disk.
+
+        Only a task_id -> line number map is held in memory, never the
+        results themselves.
+        """
+        latest = {}
+        for line_no, entry in enumerate(self._entries()):
+            latest[entry['task_id']] = line_no
+        keep = set(latest.values())
+        for line_no, entry in enumerate(self._entries()):
+            if line_no in keep:
+                yield entry
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Task Fingerprints for Legal AI Benchmarking
+Hashes everything that shapes a generation so incremental runs only execute changed cells
+"""
+import json
+import hashlib
+import inspect
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from config import Config
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def code_version(*components: Any) -> str:
+    """Hash of the source of the modules and functions on the generator path"""
+    digest = hashlib.sha256()
+    for component in components:
+        try:
+            source = inspect.getsource(component)
+        except (OSError, TypeError):
+            # Compiled or built-in components contribute their name only
+            source = getattr(component, '__qualname__', getattr(component, '__name__', repr(component)))
+        digest.update(source.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def task_fingerprint(model: str, temperature: float, scenario: Dict[str, Any], context: str,
+                     system_prompt: str, code: str, generation: Optional[Dict[str, Any]] = None) -> str:
+    """Hash of one task's generation inputs.
+
+    temperature is the effective (constrained) one and system_prompt the
+    built prompt, so a tweak to one model's prompt only changes that
+    model's fingerprints. generation holds any other request options.
+    """
+    key = json.dumps({
+        'model': model,
+        'temperature': float(temperature),
+        'category': scenario.get('category'),
+        'question': scenario.get('question'),
+        'context': context,
+        'system_prompt': system_prompt,
+        'code': code,
+        'generation': generation or {}
+    }, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+class PriorResults:
+    """Latest successful journaled result per fingerprint, across all run journals.
+
+    Only fingerprint -> (journal, byte offset) is indexed; a result is read
+    back from its journal when it is reused. Journals are scanned in run ID
+    (timestamp) order, so the newest result for a fingerprint wins.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or Config.RUN_JOURNAL_DIR)
+        self._index: Optional[Dict[str, Tuple[Path, int]]] = None
+
+    def _build_index(self) -> Dict[str, Tuple[Path, int]]:
+        index = {}
+        for path in sorted(self.directory.glob("*.jsonl")):
+            with open(path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    start, offset = offset, offset + len(line)
+                    if b'"fingerprint"' not in line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get('status') == 'success' and entry.get('fingerprint'):
+                        index[entry['fingerprint']] = (path, start)
+        logger.info(f"Indexed {len(index)} prior results from {self.directory}")
+        return index
+
+    def __len__(self) -> int:
+        if self._index is None:
+            self._index = self._build_index()
+        return len(self._index)
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Prior result for a fingerprint, tagged with the run that generated it"""
+        if self._index is None:
+            self._index = self._build_index()
+        location = self._index.get(fingerprint)
+        if location is None:
+            return None
+        path, offset = location
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            entry = json.loads(f.readline())
+        entry.setdefault('reused_from', path.stem)
+        return entry
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Model-Affinity Task Scheduler for Legal AI Benchmarking
+Drains one model's queue at a time so Ollama never thrashes between models
+"""
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import nullcontext
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+from config import Config
+from tracer import Tracer
+from adaptive_concurrency import AdaptiveConcurrencyLimiter
+from memory_admission import MemoryAdmissionController
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+class ModelAffinityScheduler:
+    """Runs benchmark tasks grouped by model with bounded per-model concurrency"""
+
+    def __init__(self, max_concurrency: Optional[int] = None,
+                 footprints_gb: Optional[Dict[str, float]] = None,
+                 memory_budget_gb: Optional[float] = None,
+                 unload_model: Optional[Callable[[str], Any]] = None,
+                 tracer: Optional[Tracer] = None,
+                 model_concurrency: Optional[Dict[str, int]] = None,
+                 adaptive: bool = False,
+                 admission: Optional[MemoryAdmissionController] = None):
+        self.max_concurrency = max(1, max_concurrency or min(Config.MAX_CONCURRENT_REQUESTS,
+                                                             Config.THREAD_POOL_SIZE))
+        # Per-model overrides (e.g. a tuned profile); other models use max_concurrency
+        self.model_concurrency = {model: max(1, int(value)) for model, value in (model_concurrency or {}).items()}
+        # Threaded runs can adapt each model's in-flight limit (starting from its concurrency) to measured latency
+        self.adaptive = adaptive
+        self.limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+        # Threaded runs can also hold tasks back while memory could not absorb them
+        self.admission = admission
+        self.footprints_gb = footprints_gb if footprints_gb is not None else Config.MODEL_MEMORY_FOOTPRINTS_GB
+        self.memory_budget_gb = memory_budget_gb if memory_budget_gb is not None else Config.MODEL_MEMORY_BUDGET_GB
+        self.unload_model = unload_model
+        self.tracer = tracer
+
+        # Wall-clock seconds each model's queue took to drain
+        self.phase_times: Dict[str, float] = {}
+
+    @staticmethod
+    def group_by_model(tasks: List[tuple]) -> "OrderedDict[str, List[tuple]]":
+        """Group (model, temperature, scenario) tasks, keeping first-seen model order"""
+        groups: "OrderedDict[str, List[tuple]]" = OrderedDict()
+        for task in tasks:
+            groups.setdefault(task[0], []).append(task)
+        return groups
+
+    def concurrency_for(self, model: str) -> int:
+        return self.model_concurrency.get(model, self.max_concurrency)
+
+    def current_limit(self, model: str) -> int:
+        limiter = self.limiters.get(model)
+        return limiter.limit if limiter is not None else self.concurrency_for(model)
+
+    def adaptive_report(self) -> Dict[str, Dict[str, Any]]:
+        return {model: limiter.stats() for model, limiter in self.limiters.items()}
+
+    def _span(self, name: str, **args: Any):
+        return self.tracer.span(name, "scheduler", **args) if self.tracer else nullcontext()
+
+    def _traced_task(self, task: tuple, queued_since: int, lane: Optional[int] = None):
+        """Task span (with its queue wait) around one run_task call"""
+        if self.tracer is None:
+            return nullcontext()
+        model, temperature, scenario = task[:3]
+        category = scenario.get('category') if isinstance(scenario, dict) else None
+        return self.tracer.task('task', queued_since, lane, model=model, temperature=temperature,
+                                category=category)
+
+    def _run_traced(self, run_task: Callable[..., Dict[str, Any]], task: tuple, queued_since: int):
+        with self._traced_task(task, queued_since):
+            return run_task(*task)
+
+    def _needs_unload(self, previous: Optional[str], model: str) -> bool:
+        """Whether the previous model must be evicted before loading the next one"""
+        footprint = self.footprints_gb.get(model, 0.0)
+        if footprint > self.memory_budget_gb:
+            logger.warning(f"{model} footprint {footprint}GB exceeds budget {self.memory_budget_gb}GB")
+
+        if previous is None or self.unload_model is None:
+            return False
+
+        combined = self.footprints_gb.get(previous, 0.0) + footprint
+        if combined > self.memory_budget_gb:
+            logger.info(f"Unloading {previous} before {model} ({combined:.1f}GB > {self.memory_budget_gb}GB)")
+            return True
+        return False
+
+    def run(self, tasks: List[tuple], run_task: Callable[..., Dict[str, Any]],
+            on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+            collect: bool = True) -> List[Dict[str, Any]]:
+        """Run tasks model by model on a thread pool.
+
+        With collect=False results are only handed to on_result (e.g. a
+        journal) and not kept, so memory does not grow with the matrix.
+        With adaptive=True exactly the limiter's current limit is in flight;
+        otherwise a window of twice the concurrency keeps the pool busy.
+        An admission controller can defer submissions while memory is short.
+        """
+        results = []
+        previous = None
+
+        for model, model_tasks in self.group_by_model(tasks).items():
+            if self._needs_unload(previous, model):
+                try:
+                    with self._span('unload_model', model=previous):
+                        self.unload_model(previous)
+                    if self.admission is not None:
+                        self.admission.evicted(previous)
+                except Exception as e:
+                    logger.warning(f"Could not unload {previous}: {e}")
+            phase_start = time.perf_counter()
+            concurrency = self.concurrency_for(model)
+            limiter = None
+            if self.adaptive:
+                limiter = self.limiters[model] = AdaptiveConcurrencyLimiter(concurrency)
+
+            with self._span('model_phase', model=model, concurrency=concurrency), \
+                    ThreadPoolExecutor(max_workers=limiter.max_limit if limiter else concurrency) as executor:
+                # Bounded submission window, so finished futures are dropped as they are handled
+                queued = deque(model_tasks)
+                pending = set()
+                while True:
+                    window = limiter.limit if limiter else concurrency * 2
+                    deferred = False
+                    while queued and len(pending) < window:
+                        if self.admission is not None and not self.admission.admit(model, len(pending)):
+                            deferred = True
+                            break
+                        pending.add(executor.submit(self._run_traced, run_task, queued.popleft(),
+                                                    time.perf_counter_ns()))
+                    if not pending:
+                        if not deferred:
+                            break
+                        time.sleep(self.admission.poll_interval)
+                        continue
+                    # While deferring, re-check memory periodically even if nothing finishes
+                    done, pending = wait(pending, timeout=self.admission.poll_interval if deferred else None,
+                                         return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        if self.admission is not None:
+                            self.admission.completed(model, result)
+                        if limiter:
+                            limiter.record_result(result)
+                        if collect:
+                            results.append(result)
+                        if on_result:
+                            on_result(result)
+
+            self.phase_times[model] = time.perf_counter() - phase_start
+            previous = model
+
+        return results
+
+    async def run_async(self, tasks: List[tuple], run_task: Callable[..., Any],
+                        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                        collect: bool = True) -> List[Dict[str, Any]]:
+        """Run tasks model by model on the event loop (run_task and unload_model are coroutines)"""
+        results = []
+        previous = None
+
+        for model, model_tasks in self.group_by_model(tasks).items():
+            if self._needs_unload(previous, model):
+                try:
+                    with self._span('unload_model', model=previous):
+                        await self.unload_model(previous)
+                except Exception as e:
+                    logger.warning(f"Could not unload {previous}: {e}")
+            phase_start = time.perf_counter()
+            concurrency = self.concurrency_for(model)
+            slots = asyncio.Semaphore(concurrency)
+            # One trace lane per in-flight slot, so concurrent tasks get their own rows
+            lanes = list(range(concurrency, 0, -1))
+
+            async def bounded(task):
+                queued_since = time.perf_counter_ns()
+                async with slots:
+                    lane = lanes.pop()
+                    try:
+                        with self._traced_task(task, queued_since, lane):
+                            return await run_task(*task)
+                    finally:
+                        lanes.append(lane)
+
+            with self._span('model_phase', model=model, concurrency=concurrency):
+                for next_done in asyncio.as_completed([bounded(task) for task in model_tasks]):
+                    result = await next_done
+                    if collect:
+                        results.append(result)
+                    if on_result:
+                        on_result(result)
+
+            self.phase_times[model] = time.perf_counter() - phase_start
+            previous = model
+
+        return results
+
+    def timing_report(self, results: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+        """Split each model's time into Ollama model load versus generation (one pass over results)"""
+        report = {model: {'phase_wall_time': phase_time, 'load_time': 0.0, 'generation_time': 0.0, 'tasks': 0}
+                  for model, phase_time in self.phase_times.items()}
+        for result in results:
+            timing = report.get(result.get('model'))
+            # Reused results were generated in an earlier run
+            if timing is None or result.get('status') != 'success' or result.get('reused_from'):
+                continue
+            generation = result.get('generation_metrics', {})
+            load = generation.get('load_duration') or 0.0
+            timing['load_time'] += load
+            timing['generation_time'] += max(0.0, (generation.get('total_duration') or
+                                                   result.get('response_time', 0.0)) - load)
+            timing['tasks'] += 1
+        return report
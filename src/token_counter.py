@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Token Counting Service for Legal AI Benchmarking
+Local tokenizer files per benchmark model, memoized per chunk hash
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import Config
+
+# Optional dependency: HuggingFace tokenizers (reads tokenizer.json locally, no network)
+try:
+    from tokenizers import Tokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    TOKENIZERS_AVAILABLE = False
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimation (1 token ≈ 4 characters)"""
+    return len(text) // 4
+
+class TokenCounter:
+    """Counts tokens for one model; results are cached by a digest of the text"""
+
+    def __init__(self, model: Optional[str] = None, tokenizer_path: Optional[Path] = None,
+                 cache_size: Optional[int] = None):
+        self.model = model
+        self.cache_size = cache_size or Config.TOKEN_COUNT_CACHE_SIZE
+        self._tokenizer = self._load_tokenizer(tokenizer_path)
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def exact(self) -> bool:
+        """True when counts come from the model's real tokenizer"""
+        return self._tokenizer is not None
+
+    def _load_tokenizer(self, tokenizer_path: Optional[Path]):
+        if tokenizer_path is None and self.model in Config.MODEL_TOKENIZERS:
+            tokenizer_path = Config.TOKENIZER_DIR / Config.MODEL_TOKENIZERS[self.model]
+
+        if tokenizer_path is None:
+            return None
+        if not TOKENIZERS_AVAILABLE:
+            logger.warning(f"tokenizers not installed; estimating tokens for {self.model} as chars/4")
+            return None
+        if not Path(tokenizer_path).exists():
+            logger.warning(f"No tokenizer file at {tokenizer_path}; estimating tokens for {self.model} as chars/4")
+            return None
+
+        try:
+            tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        except Exception as e:
+            logger.warning(f"Could not load tokenizer {tokenizer_path} ({e}); estimating tokens for {self.model} as chars/4")
+            return None
+        logger.info(f"Loaded tokenizer for {self.model} from {tokenizer_path}")
+        return tokenizer
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text (memoized)"""
+        if not text:
+            return 0
+        if self._tokenizer is None:
+            return estimate_tokens(text)
+
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        tokens = len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = tokens
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    __call__ = count
+
+_counters: Dict[Optional[str], TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """Shared counter per model (None gives the chars/4 estimator)"""
+    with _counters_lock:
+        counter = _counters.get(model)
+        if counter is None:
+            counter = TokenCounter(model)
+            _counters[model] = counter
+        return counter
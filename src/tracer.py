@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Stage Tracer for Legal AI Benchmarking
+Nested per-task spans (queue wait, retrieve, prompt, generate, post-process, evaluate) as Chrome trace events
+"""
+import os
+import json
+import time
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Stage durations of the task the current thread or asyncio task is working on
+_task_stages: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar('task_stages', default=None)
+# Trace lane (Chrome tid) of an asyncio task; threads use their own ident
+_lane: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('trace_lane', default=None)
+
+class Tracer:
+    """Collects spans with monotonic timestamps and the thread (or async lane) they ran on.
+
+    Spans nest by time on the same lane, which is how Chrome's trace-event
+    format draws them, so they are recorded as complete ('X') events. Waits
+    that overlap other work on their lane (a task queued while its worker
+    still runs the previous one) become async ('b'/'e') event pairs. Spans
+    inside a task() also add their duration to that task's stage totals,
+    which BenchmarkRunner stores on each result. With enabled=False no
+    events are kept but stage totals are still collected.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._events: List[Dict[str, Any]] = []
+        self._lanes: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._async_ids = itertools.count(1)
+
+    def _tid(self) -> int:
+        lane = _lane.get()
+        if lane is not None:
+            return lane
+        thread = threading.current_thread()
+        if thread.ident not in self._lanes:
+            self._lanes[thread.ident] = thread.name
+        return thread.ident
+
+    def add_span(self, name: str, start_ns: int, end_ns: int, cat: str = "benchmark",
+                 overlapping: bool = False, **args: Any):
+        """Record a span measured elsewhere (perf_counter_ns timestamps)"""
+        stages = _task_stages.get()
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + (end_ns - start_ns) / 1e9
+        if not self.enabled:
+            return
+        event = {'name': name, 'cat': cat, 'pid': self._pid, 'tid': self._tid(),
+                 'ts': (start_ns - self._origin) / 1e3}
+        if args:
+            event['args'] = args
+        if overlapping:
+            event.update(ph='b', id=next(self._async_ids))
+            events = [event, {**event, 'ph': 'e', 'ts': (end_ns - self._origin) / 1e3}]
+        else:
+            events = [{**event, 'ph': 'X', 'dur': (end_ns - start_ns) / 1e3}]
+        with self._lock:
+            self._events.extend(events)
+
+    def add_counter(self, name: str, values: Dict[str, float], cat: str = "resources"):
+        """Record counter values now (drawn as a graph track alongside the spans)"""
+        if not self.enabled:
+            return
+        event = {'name': name, 'cat': cat, 'ph': 'C', 'pid': self._pid,
+                 'ts': (time.perf_counter_ns() - self._origin) / 1e3, 'args': values}
+        with self._lock:
+            self._events.append(event)
+
+    @contextmanager
+    def span(self, name: str, cat: str = "benchmark", **args: Any) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter_ns(), cat, **args)
+
+    @contextmanager
+    def task(self, name: str, queued_since: Optional[int] = None, lane: Optional[int] = None,
+             **args: Any) -> Iterator[Dict[str, float]]:
+        """Span one benchmark task, collecting its stage durations.
+
+        queued_since (perf_counter_ns at submission) adds a queue_wait span;
+        lane gives concurrent asyncio tasks their own row in the viewer.
+        """
+        lane_token = _lane.set(lane) if lane is not None else None
+        if lane is not None and lane not in self._lanes:
+            self._lanes[lane] = f"async slot {lane}"
+        stages: Dict[str, float] = {}
+        stages_token = _task_stages.set(stages)
+        try:
+            if queued_since is not None:
+                self.add_span('queue_wait', queued_since, time.perf_counter_ns(), "scheduler",
+                              overlapping=True, **args)
+            with self.span(name, "task", **args):
+                yield stages
+        finally:
+            _task_stages.reset(stages_token)
+            if lane_token is not None:
+                _lane.reset(lane_token)
+
+    @staticmethod
+    def task_stages() -> Optional[Dict[str, float]]:
+        """Stage durations (seconds) recorded so far by the current task"""
+        stages = _task_stages.get()
+        return dict(stages) if stages is not None else None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def export(self, path: Path, metadata: Optional[Dict[str, Any]] = None) -> Path:
+        """Write a Chrome trace-event JSON file (chrome://tracing, Perfetto UI)"""
+        with self._lock:
+            events = list(self._events)
+        names = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in self._lanes.items()
+        ]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': names + events, 'displayTimeUnit': 'ms',
+                       'otherData': metadata or {}}, f)
+        logger.info(f"Wrote {len(events)} trace events to {path}")
+        return path
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Metric Weight Sweep for Legal AI Benchmarking
+Re-ranks models under thousands of comprehensive_score weightings without re-running anything
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import Config
+from enhanced_evaluator import EnhancedEvaluator
+from results_store import ResultsStore
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# (metric column, weight key) pairs, in comprehensive_score order
+SCORE_COLUMNS = EnhancedEvaluator.score_columns
+WEIGHT_KEYS = [weight for _, weight in SCORE_COLUMNS]
+
+def load_results(paths: Sequence[Path]) -> List[Dict[str, Any]]:
+    """Successful result rows from benchmark results files.
+
+    Accepts enhanced_benchmark_results_*.json ({'results': [...]}), the
+    archived per-model files (bare lists, or {'benchmark_info', 'results'})
+    and rescored_results_*.jsonl from rescore.py.
+    """
+    rows = []
+    for path in paths:
+        with open(path, 'r') as f:
+            if Path(path).suffix == '.jsonl':
+                data = [json.loads(line) for line in f if line.strip()]
+            else:
+                data = json.load(f)
+
+        info = data.get('benchmark_info', {}) if isinstance(data, dict) else {}
+        entries = data.get('results', []) if isinstance(data, dict) else data
+        for entry in entries:
+            if entry.get('status', 'success') != 'success':
+                continue
+            rows.append({**entry, 'model': entry.get('model') or info.get('model', 'unknown')})
+
+    return rows
+
+def metric_matrix(rows: List[Dict[str, Any]],
+                  evaluator: Optional[EnhancedEvaluator] = None) -> Tuple[List[str], np.ndarray]:
+    """Per-response model labels and (responses x metrics) matrix in SCORE_COLUMNS order.
+
+    Rows that carry a 'metrics' dict are used as stored; rows that only
+    have the response text (older archives) are scored with evaluate_batch.
+    """
+    matrix = np.zeros((len(rows), len(SCORE_COLUMNS)))
+    unscored = []
+    for i, row in enumerate(rows):
+        metrics = row.get('metrics')
+        if metrics:
+            matrix[i] = [metrics.get(column, 0.0) for column, _ in SCORE_COLUMNS]
+        else:
+            unscored.append(i)
+
+    if unscored:
+        evaluator = evaluator or EnhancedEvaluator()
+        aspects = {s['question']: s['expected_aspects'] for s in Config.BENCHMARK_SCENARIOS}
+        batch = [rows[i] for i in unscored]
+        columns = evaluator.evaluate_batch(
+            [r.get('response', '') for r in batch],
+            [r.get('question', '') for r in batch],
+            [r.get('category', '') for r in batch],
+            ['' for _ in batch],
+            [aspects.get(r.get('question', ''), []) for r in batch]
+        )
+        matrix[unscored] = np.column_stack([columns[column] for column, _ in SCORE_COLUMNS])
+        logger.info(f"Scored {len(unscored)} archived responses without stored metrics")
+
+    return [row['model'] for row in rows], matrix
+
+def store_metric_matrix(store: ResultsStore) -> Tuple[List[str], np.ndarray]:
+    """Model labels and metric matrix of a results store's successful rows, read from its columns"""
+    rows = store.mask(status='success')
+    matrix = np.column_stack([store.column(f'metrics.{column}')[rows] for column, _ in SCORE_COLUMNS])
+    return store.decode('model')[rows].tolist(), np.nan_to_num(matrix)
+
+def sample_weights(samples: int, alpha: float = 1.0, seed: int = 42) -> np.ndarray:
+    """Dirichlet(alpha) weight vectors on the simplex, one per row.
+
+    alpha=1 is uniform over the simplex; larger alpha concentrates
+    samples around equal weights, smaller alpha toward the corners.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.dirichlet(np.full(len(WEIGHT_KEYS), alpha), size=samples)
+
+def weight_vector(weights: Dict[str, float]) -> np.ndarray:
+    return np.array([weights[key] for key in WEIGHT_KEYS], dtype=float)
+
+class WeightSweep:
+    """Model rankings under many candidate weightings of the same metric matrix.
+
+    comprehensive_score is linear in the weights and only clipped at 10,
+    which simplex weights over metrics capped at 10 never reach, so each
+    model's mean score is its mean metric vector times the weights. All
+    candidates are scored in one (models x metrics) @ (metrics x K) product.
+    """
+
+    def __init__(self, models: Sequence[str], matrix: np.ndarray):
+        # Benchmark model order first so ties resolve like best_model does
+        present = set(models)
+        self.models = [m for m in Config.BENCHMARK_MODELS if m in present] + \
+            sorted(present - set(Config.BENCHMARK_MODELS))
+
+        labels = np.array([self.models.index(m) for m in models])
+        counts = np.bincount(labels, minlength=len(self.models)).astype(float)
+        sums = np.zeros((len(self.models), matrix.shape[1]))
+        np.add.at(sums, labels, matrix)
+        self.model_means = sums / counts[:, None]
+        self.responses = counts.astype(int)
+
+    def scores(self, weights: np.ndarray) -> np.ndarray:
+        """Mean comprehensive_score per model, shape (models, candidates)"""
+        return self.model_means @ np.atleast_2d(weights).T
+
+    def rankings(self, weights: np.ndarray) -> np.ndarray:
+        """Model indices best-first for each candidate, shape (candidates, models)"""
+        # Stable sort keeps benchmark model order on ties
+        return np.argsort(-self.scores(weights).T, axis=1, kind='stable')
+
+    def ranking_label(self, ranking: Sequence[int]) -> str:
+        return ' > '.join(self.models[i] for i in ranking)
+
+    def analyze(self, weights: np.ndarray, baseline: Dict[str, float],
+                completeness_steps: int = 13, max_completeness: float = 0.6) -> Dict[str, Any]:
+        """Win fractions, ranking frequencies and the completeness-weight profile"""
+        base = weight_vector(baseline)
+        base_scores = self.scores(base)[:, 0]
+        base_ranking = self.rankings(base)[0]
+
+        rankings = self.rankings(weights)
+        winners = rankings[:, 0]
+        samples = len(weights)
+
+        # Distinct rankings, most frequent first
+        unique, counts = np.unique(rankings, axis=0, return_counts=True)
+        order = np.argsort(-counts, kind='stable')
+        ranking_frequency = [
+            {'ranking': self.ranking_label(unique[i]), 'fraction': counts[i] / samples}
+            for i in order
+        ]
+
+        models = {}
+        for index, model in enumerate(self.models):
+            wins = winners == index
+            ranks = np.argmax(rankings == index, axis=1)
+            models[model] = {
+                'responses': int(self.responses[index]),
+                'baseline_score': float(base_scores[index]),
+                'win_fraction': float(wins.mean()),
+                'rank_fractions': [float(f) for f in np.bincount(ranks, minlength=len(self.models)) / samples],
+                # Average weighting among the candidates this model wins
+                'winning_weights': dict(zip(WEIGHT_KEYS, weights[wins].mean(axis=0).round(4).tolist()))
+                if wins.any() else None
+            }
+
+        return {
+            'samples': samples,
+            'baseline': {
+                'weights': baseline,
+                'best_model': self.models[base_ranking[0]],
+                'ranking': self.ranking_label(base_ranking),
+                'margin': float(np.sort(base_scores)[-1] - np.sort(base_scores)[-2]) if len(self.models) > 1 else None
+            },
+            'baseline_ranking_fraction': float((rankings == base_ranking).all(axis=1).mean()),
+            'models': models,
+            'rankings': ranking_frequency,
+            'completeness_profile': self.completeness_profile(baseline, completeness_steps, max_completeness)
+        }
+
+    def completeness_profile(self, baseline: Dict[str, float], steps: int = 13,
+                             max_completeness: float = 0.6) -> List[Dict[str, Any]]:
+        """Ranking as the completeness weight moves, other weights keeping their baseline ratios"""
+        base = weight_vector(baseline)
+        position = WEIGHT_KEYS.index('completeness')
+        others = base.copy()
+        others[position] = 0.0
+        others /= others.sum()
+
+        values = np.linspace(0.0, max_completeness, steps)
+        weights = others[None, :] * (1.0 - values)[:, None]
+        weights[:, position] = values
+
+        scores = self.scores(weights)
+        return [
+            {
+                'completeness': round(float(value), 4),
+                'best_model': self.models[ranking[0]],
+                'ranking': self.ranking_label(ranking),
+                'scores': dict(zip(self.models, scores[:, k].round(4).tolist()))
+            }
+            for k, (value, ranking) in enumerate(zip(values, self.rankings(weights)))
+        ]
+
+def print_report(report: Dict[str, Any]):
+    baseline = report['baseline']
+    print("⚖️ Metric Weight Sweep")
+    print("=" * 60)
+    print(f"🏆 Baseline best model: {baseline['best_model']} (margin {baseline['margin'] or 0:.3f})")
+    print(f"📊 Baseline ranking: {baseline['ranking']}")
+    print(f"🎲 Candidates with the baseline ranking: {report['baseline_ranking_fraction']:.1%} "
+          f"of {report['samples']} weightings")
+
+    print("\n| Model | Responses | Baseline | Wins | Rank fractions |")
+    print("|-------|-----------|----------|------|----------------|")
+    for model, stats in report['models'].items():
+        ranks = ' / '.join(f"{f:.0%}" for f in stats['rank_fractions'])
+        print(f"| {model} | {stats['responses']} | {stats['baseline_score']:.2f} | "
+              f"{stats['win_fraction']:.1%} | {ranks} |")
+
+    print("\n🔀 Most frequent rankings:")
+    for entry in report['rankings'][:5]:
+        print(f"   {entry['fraction']:.1%}  {entry['ranking']}")
+
+    print("\n📈 Completeness weight profile:")
+    previous = None
+    for step in report['completeness_profile']:
+        marker = "" if previous in (None, step['ranking']) else "  ⬅ ranking changes"
+        print(f"   {step['completeness']:.2f}  {step['ranking']}{marker}")
+        previous = step['ranking']
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse weight-sweep command-line options"""
+    parser = argparse.ArgumentParser(description="Sweep comprehensive_score metric weights over saved results")
+    parser.add_argument('results', type=Path, nargs='+',
+                        help="Results stores (enhanced_benchmark_results_* directories), "
+                             "archive JSON or rescored JSONL files")
+    parser.add_argument('--samples', type=int, default=10000, help="Number of Dirichlet weight samples")
+    parser.add_argument('--alpha', type=float, default=1.0,
+                        help="Dirichlet concentration (1 = uniform over the simplex)")
+    parser.add_argument('--seed', type=int, default=Config.BENCHMARK_SEED)
+    parser.add_argument('--max-completeness', type=float, default=0.6,
+                        help="Upper end of the completeness-weight profile")
+    parser.add_argument('--output', type=Path, default=None, help="Write the full report as JSON")
+    return parser.parse_args(argv)
+
+def main():
+    """Main entry point for the weight sweep"""
+
+    args = parse_args()
+
+    # Results stores are read column-wise; JSON/JSONL files row by row
+    models, matrices = [], []
+    for store_dir in [path for path in args.results if path.is_dir()]:
+        store_models, store_matrix = store_metric_matrix(ResultsStore(store_dir))
+        models.extend(store_models)
+        matrices.append(store_matrix)
+    rows = load_results([path for path in args.results if not path.is_dir()])
+    if rows:
+        file_models, file_matrix = metric_matrix(rows)
+        models.extend(file_models)
+        matrices.append(file_matrix)
+
+    if not models:
+        print("❌ No successful results in the given files")
+        sys.exit(1)
+
+    matrix = np.vstack(matrices)
+    sweep = WeightSweep(models, matrix)
+    report = sweep.analyze(sample_weights(args.samples, args.alpha, args.seed), Config.METRIC_WEIGHTS,
+                           max_completeness=args.max_completeness)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
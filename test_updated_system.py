@@ -68,6 +68,90 @@ def test_prompts():
         print(f"❌ Prompts test failed: {e}")
         return False
 
+def test_context_truncation():
+    """Test the truncation engine's budget, priority ordering and sentence splitting"""
+    print("\n✂️ Testing Context Truncation...")
+    
+    try:
+        from prompts.truncation import ContextTruncator
+        from token_counter import estimate_tokens
+        
+        filler = [f"Line {i}: general background about workplace policies and scheduling." for i in range(200)]
+        priority = "The Pregnancy Discrimination Act (PDA) and FMLA, 42 U.S.C. 2000e(k), protect employees."
+        relevant = "Courts require reasonable accommodations for lactation breaks at work."
+        context = "\n".join(filler[:120] + [priority] + filler[120:180] + [relevant] + filler[180:])
+        question = "What lactation breaks must employers allow?"
+        
+        truncator = ContextTruncator()
+        words = lambda text: len(text.split())
+        within = {}
+        for name, counter in [("chars/4", estimate_tokens), ("words", words)]:
+            for budget in [50, 200, 777]:
+                kept = truncator.truncate(context, budget, question, counter)
+                within[(name, budget)] = counter(kept) <= budget
+        print(f"✅ Within budget for every counter and budget: {all(within.values())}")
+        
+        kept = truncator.truncate(context, 60, question)
+        ordered = kept.index("Pregnancy") < kept.index("lactation")
+        print(f"✅ Priority and question-relevant lines kept, in document order: "
+              f"{priority in kept and relevant in kept and ordered}")
+        
+        # Under budget is untouched; an overlong line is split into sentences
+        untouched = truncator.truncate("Short PDA note.", 100) == "Short PDA note."
+        long_line = " ".join(["Unrelated sentence about parking."] * 40 + [priority])
+        split = ContextTruncator(max_segment_tokens=20).truncate(long_line, 40)
+        split_ok = "Pregnancy Discrimination Act" in split and estimate_tokens(split) <= 40
+        print(f"✅ Untouched under budget: {untouched}, long line split keeping the priority sentence: {split_ok}")
+        
+        return (all(within.values()) and priority in kept and relevant in kept and ordered and
+                untouched and split_ok)
+        
+    except Exception as e:
+        print(f"❌ Context truncation test failed: {e}")
+        return False
+
+def test_token_counter():
+    """Test memoized token counts and the chars/4 fallback for missing or corrupt tokenizers"""
+    print("\n🔢 Testing Token Counter...")
+    
+    try:
+        import tempfile
+        from pathlib import Path
+        from token_counter import TokenCounter, TOKENIZERS_AVAILABLE
+        
+        with tempfile.TemporaryDirectory() as directory:
+            missing = TokenCounter("test-model", Path(directory) / "missing.json")
+            corrupt_path = Path(directory) / "corrupt.json"
+            corrupt_path.write_text("{not a tokenizer")
+            corrupt = TokenCounter("test-model", corrupt_path)
+            fallback = (not missing.exact and not corrupt.exact and
+                        missing.count("x" * 40) == 10 and corrupt.count("x" * 40) == 10)
+            print(f"✅ Missing and corrupt tokenizer files fall back to chars/4: {fallback}")
+            
+            cached = True
+            if TOKENIZERS_AVAILABLE:
+                from tokenizers import Tokenizer, models, pre_tokenizers
+                tokenizer = Tokenizer(models.WordLevel({"[UNK]": 0, "the": 1, "pda": 2}, unk_token="[UNK]"))
+                tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+                tokenizer_path = Path(directory) / "tokenizer.json"
+                tokenizer.save(str(tokenizer_path))
+                
+                counter = TokenCounter("test-model", tokenizer_path, cache_size=2)
+                first = counter.count("the pda protects")
+                second = counter.count("the pda protects")
+                counter.count("a"), counter.count("b")
+                counter.count("the pda protects")
+                cached = (counter.exact and first == second == 3 and counter.hits == 1 and counter.misses == 4)
+                print(f"✅ Exact counts memoized (LRU of 2): {cached} ({counter.hits} hits, {counter.misses} misses)")
+            else:
+                print("⚠️ tokenizers not installed; skipping exact counts")
+        
+        return fallback and cached
+        
+    except Exception as e:
+        print(f"❌ Token counter test failed: {e}")
+        return False
+
 def test_response_processor():
     """Test response post-processing"""
     print("\n🔄 Testing Response Processor...")
@@ -118,6 +202,147 @@ def test_response_processor():
         print(f"❌ Response processor test failed: {e}")
         return False
 
+def test_streaming_processor():
+    """Test incremental post-processing of a chunked stream"""
+    print("\n🌊 Testing Streaming Response Processor...")
+    
+    try:
+        from src.response_processor import ResponsePostProcessor, StreamingResponsePostProcessor
+        
+        response = ("We need to draft the memo first.<|end|>\n\n<|start|>assistant<|message|>"
+                    "To: Partner\nFrom: Associate\nDate: Today\n"
+                    "Subject: PDA Analysis\n\n\n\n### Analysis\nThe PDA protects pregnant employees.<|im_end|>")
+        
+        # Same clean text no matter how the stream is chunked
+        outputs = []
+        for size in [1, 3, 7, len(response)]:
+            chunks = [response[i:i + size] for i in range(0, len(response), size)]
+            outputs.append("".join(StreamingResponsePostProcessor().stream(chunks)))
+        
+        final_content = outputs[0]
+        print(f"✅ Chunking invariant: {len(set(outputs)) == 1}")
+        print(f"✅ Starts at memo header: {final_content.startswith('To: Partner')}")
+        print(f"✅ Matches full-response extraction: {final_content == ResponsePostProcessor().extract_final_content(response)}")
+        
+        # Planning that runs past the preamble window still ends at the memo
+        ramble = "We need to consider the PDA. Actually maybe cite the statute. " * 80
+        long_response = (ramble + "\n\nTo: Partner\nFrom: Associate\nDate: Today\n"
+                         "Subject: PDA Analysis\n\nThe PDA protects pregnant employees.")
+        streamer = StreamingResponsePostProcessor()
+        streamed = "".join(streamer.stream(long_response[i:i + 5] for i in range(0, len(long_response), 5)))
+        long_matches = (len(ramble) > streamer.preamble_chars and streamed == streamer.text and
+                        streamer.text == ResponsePostProcessor().extract_final_content(long_response))
+        print(f"✅ Long preamble matches full-response extraction: {long_matches}")
+        
+        # A ramble that never reaches a memo is still released only once, at the end
+        streamer = StreamingResponsePostProcessor()
+        streamed = "".join(streamer.stream(ramble[i:i + 7] for i in range(0, len(ramble), 7)))
+        unresolved = streamed == streamer.text and 0 < len(streamed) <= streamer.preamble_chars
+        print(f"✅ Unresolved ramble streamed as text, bounded by the window: {unresolved}")
+        
+        return (len(set(outputs)) == 1 and final_content.startswith('To: Partner')
+                and final_content == ResponsePostProcessor().extract_final_content(response)
+                and long_matches and unresolved)
+        
+    except Exception as e:
+        print(f"❌ Streaming processor test failed: {e}")
+        return False
+
+def test_planning_guard():
+    """Test restarting streams that open with planning, and leaving other streams alone"""
+    print("\n🛑 Testing Planning Stream Guard...")
+    
+    try:
+        from src.response_processor import PlanningStreamGuard
+        
+        def feed(guard, text, size=4):
+            """Index of the chunk that triggered a restart, or None"""
+            for index, start in enumerate(range(0, len(text), size)):
+                if guard.observe(text[start:start + size]):
+                    return index
+            return None
+        
+        guard = PlanningStreamGuard(watch_tokens=64, max_restarts=2)
+        opener = feed(guard, "<|im_start|>  We need to draft the memo first, then cite the PDA.")
+        tagged = feed(guard, "<|start|>assistant<|channel|>analysis<|message|>Drafting.")
+        unguarded = feed(guard, "Let me think about the statute before answering.")
+        stats = guard.stats(accepted_tokens=40)
+        print(f"✅ Restarts: opener at chunk {opener}, channel header at chunk {tagged}, "
+              f"final attempt unguarded: {unguarded is None} ({stats['triggers']})")
+        
+        # Planning phrases later in ordinary prose, or after a memo header, do not restart
+        prose = feed(PlanningStreamGuard(), "The PDA applies to employers with 15 employees. "
+                                            "We need to note that state law may go further.")
+        memo = feed(PlanningStreamGuard(), "To: Partner\nFrom: Associate\nDate: Today\n"
+                                           "Subject: PDA\n\nLet me think about remedies.")
+        print(f"✅ No restart for later phrases: {prose is None}, after a memo header: {memo is None}")
+        
+        return (opener is not None and tagged is not None and unguarded is None and
+                stats['restarts'] == 2 and stats['triggers'][0] == "We need to" and
+                prose is None and memo is None)
+        
+    except Exception as e:
+        print(f"❌ Planning guard test failed: {e}")
+        return False
+
+def test_stream_metrics():
+    """Test TTFT and inter-token latency recorded from the sync client's chat stream (fake session)"""
+    print("\n⏱️ Testing Stream Metrics...")
+    
+    try:
+        import json
+        sys.path.append(os.path.join(os.path.dirname(__file__), 'outputs', 'archive'))
+        from enhanced_ollama_client import OllamaClient
+        from src.generation_metrics import StreamRecorder
+        from src.chat_payload import build_chat_payload
+        
+        chunks = [(0.05, {'message': {'content': 'To:'}, 'done': False}),
+                  (0.02, {'message': {'content': ' Partner'}, 'done': False}),
+                  (0.02, {'message': {'content': '\nFrom:'}, 'done': False}),
+                  (0.0, {'message': {'content': ''}, 'done': True, 'eval_count': 3,
+                         'eval_duration': 60_000_000, 'prompt_eval_count': 100,
+                         'prompt_eval_duration': 50_000_000, 'load_duration': 0})]
+        
+        class FakeResponse:
+            closed = False
+            def raise_for_status(self):
+                pass
+            def iter_lines(self):
+                for delay, chunk in chunks:
+                    time.sleep(delay)
+                    yield json.dumps(chunk).encode('utf-8')
+                    yield b""
+            def close(self):
+                self.closed = True
+        
+        class FakeSession:
+            def post(self, url, json=None, timeout=None, stream=False):
+                self.url, self.payload, self.response = url, json, FakeResponse()
+                return self.response
+        
+        client = OllamaClient(base_url="http://fake:11434", seed=42)
+        client.session = FakeSession()
+        recorder = StreamRecorder()
+        for chunk in client.stream_chat("qwen2.5:14b", "Question", "System", temperature=0.5):
+            recorder.observe(chunk)
+        recorder.finish()
+        metrics = recorder.metrics()
+        
+        print(f"✅ Text: {recorder.text!r}, TTFT {metrics['ttft']:.3f}s, ITL p50 {metrics['itl_p50']:.3f}s, "
+              f"{metrics['tokens_per_second']:.0f} tok/s, {metrics['prompt_tokens_per_second']:.0f} prompt tok/s")
+        print(f"✅ Stream closed after the final chunk: {client.session.response.closed}")
+        sent_payload = build_chat_payload("qwen2.5:14b", "Question", "System", 0.5, 42, stream=True)
+        print(f"✅ Sent payload matches build_chat_payload: {client.session.payload == sent_payload}")
+        
+        return (recorder.text == "To: Partner\nFrom:" and 0.05 <= metrics['ttft'] < 0.5 and
+                0.015 <= metrics['itl_p50'] < 0.2 and metrics['stream_chunks'] == 3 and
+                metrics['tokens_per_second'] == 50.0 and metrics['prompt_tokens_per_second'] == 2000.0 and
+                client.session.payload == sent_payload and client.session.response.closed)
+        
+    except Exception as e:
+        print(f"❌ Stream metrics test failed: {e}")
+        return False
+
 def test_evaluator():
     """Test enhanced evaluator"""
     print("\n📊 Testing Enhanced Evaluator...")
@@ -171,12 +396,743 @@ def test_evaluator():
         comprehensive_score = evaluation['comprehensive_score']
         print(f"✅ Comprehensive Score: {comprehensive_score:.2f}/10")
         
-        return True
+        # Metrics give the same scores from a shared feature pass
+        from src.enhanced_evaluator import ResponseFeatures
+        features = ResponseFeatures.from_response(test_response)
+        same_scores = (evaluator.evaluate_clarity(features) == clarity and
+                       evaluator.evaluate_citations(features) == citations)
+        print(f"✅ Shared features match: {same_scores}")
+        
+        return same_scores
         
     except Exception as e:
         print(f"❌ Evaluator test failed: {e}")
         return False
 
+def test_batch_evaluator():
+    """Test columnar batch scoring against per-response scoring"""
+    print("\n📊 Testing Batch Evaluator...")
+    
+    try:
+        from src.enhanced_evaluator import EnhancedEvaluator
+        
+        evaluator = EnhancedEvaluator()
+        responses = [
+            "MEMORANDUM\nTo: Partner\n\n### Analysis\nThe PDA and FMLA apply (42 U.S.C. § 2000e(k)). Source: database.\n\n### Conclusion\nDone.",
+            "We need to think about this.",
+            ""
+        ]
+        questions = ["Federal PDA and FMLA analysis", "New York accommodation", ""]
+        categories = ["PDA Memo", "Accommodation Analysis", "unknown"]
+        contexts = ["test context"] * 3
+        aspects = [["PDA coverage", "FMLA"], ["reasonable accommodations"], []]
+        
+        columns = evaluator.evaluate_batch(responses, questions, categories, contexts, aspects, [1.0, 2.0, 3.0])
+        print(f"✅ Batch scores: {[round(float(s), 2) for s in columns['comprehensive_score']]}")
+        
+        same_scores = True
+        for row in range(len(responses)):
+            evaluation = evaluator.evaluate_benchmark_result(
+                responses[row], questions[row], categories[row], contexts[row], aspects[row], row + 1.0
+            )
+            same_scores = same_scores and evaluation['comprehensive_score'] == columns['comprehensive_score'][row]
+            same_scores = same_scores and all(
+                value == columns[metric][row] for metric, value in evaluation['metrics'].items()
+            )
+        print(f"✅ Batch matches per-response scoring: {same_scores}")
+        
+        return same_scores
+        
+    except Exception as e:
+        print(f"❌ Batch evaluator test failed: {e}")
+        return False
+
+def test_weight_sweep():
+    """Test metric weight sweep over a small metric matrix"""
+    print("\n⚖️ Testing Weight Sweep...")
+    
+    try:
+        import numpy as np
+        from config import Config
+        from src.weight_sweep import WeightSweep, sample_weights, weight_vector
+        
+        # Model a wins on completeness, model b on everything else
+        models = ["a", "a", "b", "b"]
+        matrix = np.array([
+            [10, 2, 2, 2, 2, 2, 0.2],
+            [10, 2, 2, 2, 2, 2, 0.2],
+            [2, 8, 8, 8, 8, 8, 0.8],
+            [2, 8, 8, 8, 8, 8, 0.8]
+        ])
+        sweep = WeightSweep(models, matrix)
+        report = sweep.analyze(sample_weights(2000), Config.METRIC_WEIGHTS)
+        
+        expected = float(matrix[2] @ weight_vector(Config.METRIC_WEIGHTS))
+        print(f"✅ Baseline: {report['baseline']['ranking']} "
+              f"({report['models']['b']['baseline_score']:.2f})")
+        print(f"✅ Win fractions: { {m: round(s['win_fraction'], 2) for m, s in report['models'].items()} }")
+        
+        profile = report['completeness_profile']
+        flips = profile[0]['best_model'] == "b" and profile[-1]['best_model'] == "a"
+        print(f"✅ Completeness profile flips the winner: {flips}")
+        
+        return abs(report['models']['b']['baseline_score'] - expected) < 1e-9 and flips
+        
+    except Exception as e:
+        print(f"❌ Weight sweep test failed: {e}")
+        return False
+
+def test_rescore():
+    """Test archive normalization and offline re-scoring"""
+    print("\n🔁 Testing Offline Re-scoring...")
+    
+    try:
+        from pathlib import Path
+        from config import Config
+        from src.rescore import normalize_record, rescore_records
+        
+        scenario = Config.BENCHMARK_SCENARIOS[0]
+        response = "MEMORANDUM\nTo: Partner\n\nThe PDA amended Title VII (42 U.S.C. § 2000e(k))."
+        legacy = normalize_record(
+            {'question': scenario['question'], 'response': response, 'response_time_seconds': 4.0},
+            Path("streamlit_benchmark_qwen2.5_14b_20250806.json"), 0, {'temperature': 0.3}
+        )
+        current = normalize_record(
+            {'question': scenario['question'], 'final_content': response, 'response_time': 4.0,
+             'model': "qwen2.5:14b", 'temperature': 0.3},
+            Path("enhanced_benchmark_results.json"), 0, {}
+        )
+        same_schema = all(legacy[k] == current[k] for k in
+                          ['model', 'temperature', 'category', 'original_response', 'response_time', 'expected_aspects'])
+        print(f"✅ Schemas normalize alike: {same_schema} ({legacy['model']}, {legacy['category']})")
+        
+        rescored = rescore_records([legacy])[0]
+        print(f"✅ Re-scored offline: {rescored['comprehensive_score']:.2f}/10")
+        
+        return same_schema and 'metrics' in rescored
+        
+    except Exception as e:
+        print(f"❌ Re-scoring test failed: {e}")
+        return False
+
+def test_results_store():
+    """Test columnar results store round trip and column queries"""
+    print("\n📦 Testing Results Store...")
+    
+    try:
+        import tempfile
+        from src.results_store import ResultsStore
+        
+        results = [
+            {'model': "llama3.1:8b", 'temperature': 0.3, 'category': "PDA Memo", 'status': 'success',
+             'comprehensive_score': 6.0, 'response_time': 2.0, 'final_content': "memo",
+             'metrics': {'accuracy': 5.0, 'word_count': 1}, 'generation_metrics': {'ttft': None}},
+            {'model': "qwen2.5:14b", 'temperature': 0.5, 'category': "PDA Memo", 'status': 'success',
+             'comprehensive_score': 8.0, 'response_time': 4.0, 'final_content': "longer memo",
+             'metrics': {'accuracy': 7.0, 'word_count': 2}, 'generation_metrics': {'ttft': 0.5}},
+            {'model': "qwen2.5:14b", 'temperature': 0.5, 'category': "PDA Memo", 'status': 'error',
+             'error': "timeout"}
+        ]
+        
+        with tempfile.TemporaryDirectory() as directory:
+            store = ResultsStore.write(directory, results)
+            round_trip = list(store.records()) == results
+            print(f"✅ Round trip lossless: {round_trip}")
+            
+            successful = store.mask(status='success')
+            best = store.best_model(["llama3.1:8b", "qwen2.5:14b"], successful)
+            by_temperature = store.group_mean('comprehensive_score', 'temperature', successful)
+            ttft = store.mean('generation_metrics.ttft', successful)
+            print(f"✅ Best model: {best}, by temperature: {by_temperature}, avg TTFT: {ttft}")
+            
+            # The error row has no word count: it must not pull the mean or total toward 0
+            words = store.mean('metrics.word_count')
+            total_words = store.total('metrics.word_count')
+            counts_typed = all(isinstance(r['metrics']['word_count'], int) for r in store.records(range(2)))
+            print(f"✅ Word counts: mean {words}, total {total_words}, read back as ints: {counts_typed}")
+            
+            return (round_trip and best == "qwen2.5:14b" and by_temperature == {0.3: 6.0, 0.5: 8.0} and
+                    ttft == 0.5 and words == 1.5 and total_words == 3 and counts_typed)
+        
+    except Exception as e:
+        print(f"❌ Results store test failed: {e}")
+        return False
+
+def test_benchmark_database():
+    """Test cross-run SQLite history and trend queries"""
+    print("\n🗄️ Testing Benchmark Database...")
+    
+    try:
+        import tempfile
+        from datetime import datetime, timedelta
+        from src.benchmark_database import BenchmarkDatabase
+        
+        with tempfile.TemporaryDirectory() as directory:
+            database = BenchmarkDatabase(Path(directory) / "history.sqlite")
+            started = datetime(2025, 8, 6, 12, 0)
+            for run in range(3):
+                results = [
+                    {'model': "qwen2.5:14b", 'temperature': 0.3, 'category': "PDA Memo", 'status': 'success',
+                     'response_time': 10.0 + run, 'comprehensive_score': 7.0,
+                     'metrics': {'accuracy': 6.0}, 'generation_metrics': {'ttft': 0.5 * (run + 1)}},
+                    {'model': "llama3.1:8b", 'temperature': 0.3, 'category': "PDA Memo", 'status': 'error',
+                     'error': "timeout"}
+                ]
+                database.record_run(f"20250806_1{run}0000", results, {'overall': {'best_model': "qwen2.5:14b"}},
+                                    started + timedelta(hours=run))
+            # Recording a run again (e.g. after resuming it) replaces its tasks instead of duplicating them
+            database.record_run("20250806_120000", results, {'overall': {'best_model': "qwen2.5:14b"}},
+                                started + timedelta(hours=2))
+            
+            response_times = database.trend('response_time', model="qwen2.5:14b", last=2)
+            ttft = database.trend('ttft', model="qwen2.5:14b")
+            runs = database.runs()
+            database.close()
+        
+        print(f"✅ Runs recorded: {[r['run_id'] for r in runs]}, tasks per run: {[r['tasks'] for r in ttft]}")
+        print(f"✅ response_time trend: {[r['average'] for r in response_times]}")
+        print(f"✅ ttft trend: {[r['average'] for r in ttft]}")
+        
+        return ([r['average'] for r in response_times] == [11.0, 12.0] and
+                [r['average'] for r in ttft] == [0.5, 1.0, 1.5] and [r['tasks'] for r in ttft] == [1, 1, 1] and
+                len(runs) == 3 and runs[0]['total_tests'] == 2)
+        
+    except Exception as e:
+        print(f"❌ Benchmark database test failed: {e}")
+        return False
+
+def test_response_cache():
+    """Test LRU eviction of the response cache, including recency restored from file mtimes"""
+    print("\n🗃️ Testing Response Cache...")
+    
+    try:
+        import os
+        import tempfile
+        from src.response_cache import ResponseCache
+        
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResponseCache(directory, max_entries=3)
+            for key in ["a", "b", "c"]:
+                cache.put(key, {'response': key})
+            cache.get("a")
+            cache.put("d", {'response': "d"})
+            kept = sorted(cache._sizes)
+            
+            # A new process orders existing entries by mtime
+            for age, key in enumerate(["d", "c", "a"]):
+                os.utime(os.path.join(directory, f"{key}.json"), (1000 - age, 1000 - age))
+            reopened = ResponseCache(directory, max_entries=2)
+            reopened.put("e", {'response': "e"})
+            after_restart = sorted(reopened._sizes)
+        
+        print(f"✅ Recently read entry kept: {kept}")
+        print(f"✅ Oldest entries evicted after restart: {after_restart}")
+        
+        return kept == ["a", "c", "d"] and after_restart == ["d", "e"]
+        
+    except Exception as e:
+        print(f"❌ Response cache test failed: {e}")
+        return False
+
+def test_context_stage():
+    """Test single-flight retrieval and pinning contexts and prompts from an earlier run"""
+    print("\n📚 Testing Context Retrieval Stage...")
+    
+    try:
+        import tempfile
+        import threading
+        from pathlib import Path
+        from concurrent.futures import ThreadPoolExecutor
+        from src.context_stage import ContextRetrievalStage
+        
+        calls = {'retrieve': 0, 'build': 0, 'fail': 1}
+        release = threading.Event()
+        
+        def retrieve(question):
+            calls['retrieve'] += 1
+            release.wait(1)
+            if question == "flaky" and calls['fail']:
+                calls['fail'] -= 1
+                raise ConnectionError("vector store down")
+            return f"context for {question}"
+        
+        def build_prompt(model, question, context):
+            calls['build'] += 1
+            return f"{model} prompt | {context}"
+        
+        stage = ContextRetrievalStage(retrieve, build_prompt)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(stage.get_prompt, model, "PDA?")
+                       for model in ["llama3.1:8b", "qwen2.5:14b"] * 4]
+            release.set()
+            prompts = {future.result() for future in futures}
+        retrievals, builds = calls['retrieve'], calls['build']
+        single_flight = retrievals == 1 and builds == 2 and len(prompts) == 2
+        
+        # A failed retrieval is not cached; the next caller retries
+        try:
+            stage.get_context("flaky")
+            retried = False
+        except ConnectionError:
+            retried = stage.get_context("flaky") == "context for flaky"
+        print(f"✅ Single flight: {retrievals} retrieval, {builds} prompt builds "
+              f"for 8 concurrent tasks; failure retried: {retried}")
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "contexts.json"
+            stage.save(path)
+            
+            # A later run with different retrieval and templates scores the saved bytes
+            pinned = ContextRetrievalStage(lambda q: "new context", lambda m, q, c: "new prompt")
+            pinned.load(path)
+            same_context = pinned.get_context("PDA?") == "context for PDA?"
+            same_prompt = pinned.get_prompt("llama3.1:8b", "PDA?") == "llama3.1:8b prompt | context for PDA?"
+            new_model = pinned.get_prompt("gpt-oss:20b-q6", "PDA?") == "new prompt"
+        print(f"✅ Pinned context: {same_context}, pinned prompt: {same_prompt}, "
+              f"unsaved model built fresh: {new_model}")
+        
+        return single_flight and retried and same_context and same_prompt and new_model
+        
+    except Exception as e:
+        print(f"❌ Context stage test failed: {e}")
+        return False
+
+def test_run_journal():
+    """Test crash-safe run journal and resume bookkeeping"""
+    print("\n📓 Testing Run Journal...")
+    
+    try:
+        import tempfile
+        from config import Config
+        from src.run_journal import RunJournal, task_id
+        
+        scenario = Config.BENCHMARK_SCENARIOS[0]
+        first, second = task_id("qwen2.5:14b", 0.3, scenario), task_id("qwen2.5:14b", 0.5, scenario)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            journal = RunJournal("20250806_120000", directory)
+            journal.append({'task_id': first, 'status': 'success', 'comprehensive_score': 7.0})
+            journal.append({'task_id': second, 'status': 'error', 'error': "timeout"})
+            journal.close()
+            
+            # Simulate a crash in the middle of writing a line
+            with open(journal.path, 'a') as f:
+                f.write('{"task_id": "torn", "sta')
+            
+            resumed = RunJournal("20250806_120000", directory, resume=True)
+            completed = resumed.completed_ids()
+            resumed.append({'task_id': second, 'status': 'success', 'comprehensive_score': 8.0})
+            resumed.close()
+            results = list(resumed.results())
+        
+        print(f"✅ Deterministic task IDs: {first == task_id('qwen2.5:14b', 0.3, scenario)}")
+        print(f"✅ Completed before resume: {len(completed)}, results after resume: {len(results)}")
+        
+        return (completed == {first} and len(results) == 2 and
+                all(r['status'] == 'success' for r in results))
+        
+    except Exception as e:
+        print(f"❌ Run journal test failed: {e}")
+        return False
+
+def test_task_fingerprint():
+    """Test task fingerprints and prior-result lookup for incremental runs"""
+    print("\n♻️ Testing Task Fingerprints...")
+    
+    try:
+        import tempfile
+        from config import Config
+        from src.run_journal import RunJournal
+        from src.task_fingerprint import PriorResults, task_fingerprint
+        
+        scenario = Config.BENCHMARK_SCENARIOS[0]
+        base = task_fingerprint("qwen2.5:14b", 0.3, scenario, "context", "prompt", "v1")
+        same = task_fingerprint("qwen2.5:14b", 0.3, scenario, "context", "prompt", "v1")
+        changed = [
+            task_fingerprint("qwen2.5:14b", 0.3, scenario, "context", "prompt (tweaked)", "v1"),
+            task_fingerprint("qwen2.5:14b", 0.3, scenario, "context", "prompt", "v2"),
+            task_fingerprint("qwen2.5:14b", 0.5, scenario, "context", "prompt", "v1")
+        ]
+        
+        with tempfile.TemporaryDirectory() as directory:
+            journal = RunJournal("20250806_120000", directory)
+            journal.append({'task_id': "a", 'fingerprint': base, 'status': 'success', 'original_response': "old"})
+            journal.append({'task_id': "b", 'fingerprint': changed[0], 'status': 'error'})
+            journal.close()
+            
+            prior = PriorResults(directory)
+            reused = prior.get(base)
+            missing = prior.get(changed[0])
+        
+        print(f"✅ Stable fingerprint: {base == same}, input changes detected: {base not in changed}")
+        print(f"✅ Reused from run: {reused and reused['reused_from']}, failed result reused: {missing is not None}")
+        
+        return (base == same and len(set(changed + [base])) == 4 and
+                reused['original_response'] == "old" and reused['reused_from'] == "20250806_120000" and
+                missing is None)
+        
+    except Exception as e:
+        print(f"❌ Task fingerprint test failed: {e}")
+        return False
+
+def test_tracer():
+    """Test nested stage spans, per-task stage totals and Chrome trace export"""
+    print("\n🧵 Testing Stage Tracer...")
+    
+    try:
+        import json
+        import time
+        import tempfile
+        from pathlib import Path
+        from src.tracer import Tracer
+        
+        tracer = Tracer()
+        with tracer.task('task', queued_since=time.perf_counter_ns(), model="qwen2.5:14b"):
+            with tracer.span('retrieve'):
+                time.sleep(0.001)
+            with tracer.span('generate'):
+                with tracer.span('stream_attempt'):
+                    time.sleep(0.002)
+            recorded = tracer.task_stages()
+        
+        with tempfile.TemporaryDirectory() as directory:
+            trace = json.loads(tracer.export(Path(directory) / "trace.json").read_text())
+        
+        complete = {e['name']: e for e in trace['traceEvents'] if e['ph'] == 'X'}
+        task, generate, attempt = complete['task'], complete['generate'], complete['stream_attempt']
+        nested = (task['ts'] <= generate['ts'] <= attempt['ts'] and
+                  attempt['ts'] + attempt['dur'] <= generate['ts'] + generate['dur'] <= task['ts'] + task['dur'])
+        queued = [e['ph'] for e in trace['traceEvents'] if e['name'] == 'queue_wait']
+        
+        print(f"✅ Stages: {sorted(recorded)}")
+        print(f"✅ Spans nested: {nested}, queue wait as async pair: {queued}")
+        
+        return (nested and queued == ['b', 'e'] and recorded['generate'] >= recorded['stream_attempt'] >= 0.002 and
+                set(recorded) == {'queue_wait', 'retrieve', 'generate', 'stream_attempt'} and
+                tracer.task_stages() is None)
+        
+    except Exception as e:
+        print(f"❌ Tracer test failed: {e}")
+        return False
+
+def test_latency_histogram():
+    """Test streaming latency percentiles and fixed-bucket histograms"""
+    print("\n⏱️ Testing Latency Histograms...")
+    
+    try:
+        import numpy as np
+        from src.latency_histogram import LatencyHistogram, LatencyReport
+        
+        rng = np.random.default_rng(7)
+        latencies = rng.lognormal(2.5, 0.8, 5000)
+        
+        # Two halves merged must match one histogram over everything
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for i, value in enumerate(latencies):
+            (first if i % 2 else second).add(float(value))
+        first.merge(second)
+        
+        errors = {q: abs(first.percentile(q) / np.percentile(latencies, q, method='inverted_cdf') - 1)
+                  for q in (50, 90, 95, 99)}
+        print(f"✅ Relative percentile errors: { {q: round(float(e), 4) for q, e in errors.items()} }")
+        
+        report = LatencyReport(metrics=('response_time',))
+        report.add_results([
+            {'status': 'success', 'model': "qwen2.5:14b", 'temperature': 0.3, 'category': "PDA Memo", 'response_time': 4.0},
+            {'status': 'success', 'model': "qwen2.5:14b", 'temperature': 0.7, 'category': "PDA Memo", 'response_time': 40.0},
+            {'status': 'error', 'model': "qwen2.5:14b", 'temperature': 0.7, 'category': "PDA Memo"}
+        ])
+        summary = report.summary()['response_time']
+        model = summary['by_model']['qwen2.5:14b']
+        print(f"✅ qwen2.5:14b p50/p99: {model['p50']:.2f}s/{model['p99']:.2f}s, "
+              f"groups: {sorted(k for k in summary if k.startswith('by_'))}")
+        
+        return (max(errors.values()) < 0.01 and first.count == len(latencies) and
+                sum(first.bucket_counts) == len(latencies) and model['count'] == 2 and
+                abs(model['p50'] - 4.0) < 0.05 and abs(model['p99'] - 40.0) < 0.5 and
+                model['histogram']['<=5s'] == 1 and model['histogram']['<=60s'] == 1 and
+                set(summary['by_temperature']) == {'0.3', '0.7'})
+        
+    except Exception as e:
+        print(f"❌ Latency histogram test failed: {e}")
+        return False
+
+def test_load_test():
+    """Test open-loop arrival schedules, phase statistics and knee detection"""
+    print("\n🚦 Testing Open-Loop Load Test...")
+    
+    try:
+        import numpy as np
+        from src.load_generator import PhaseStats, arrival_offsets, find_knee
+        
+        poisson = arrival_offsets(2.0, 600, 'poisson', seed=42)
+        constant = arrival_offsets(2.0, 10, 'constant')
+        print(f"✅ Poisson: {len(poisson)} arrivals in 600s (expected ~1200), constant: {len(constant)} in 10s")
+        
+        # A stable phase and one whose queue keeps growing
+        stable, overloaded = PhaseStats("qwen2.5:14b", 1.0, 60), PhaseStats("qwen2.5:14b", 4.0, 60)
+        for i in range(60):
+            for stats, latency in ((stable, 10.0 + (i % 3) * 0.1), (overloaded, 10.0 + i)):
+                stats.started(0.0)
+                stats.finished(i, {'ttft': 1.0, 'prompt_eval_duration': 0.5}, latency)
+        phases = [stable.report(60.0), {**stable.report(60.0), 'offered_rate': 2.0}, overloaded.report(60.0)]
+        knee = find_knee(phases)
+        print(f"✅ Knee: sustains {knee['max_sustainable_rate']} req/s, saturates at {knee['saturated_at']} "
+              f"({'; '.join(knee['reasons'])})")
+        
+        return (abs(len(poisson) - 1200) < 150 and np.all(np.diff(poisson) >= 0) and len(constant) == 20 and
+                abs(phases[0]['latency_growth'] - 1.0) < 0.05 and phases[2]['latency_growth'] > 1.5 and
+                phases[0]['queue_delay']['p50'] == 0.5 and
+                knee['max_sustainable_rate'] == 2.0 and knee['saturated_at'] == 4.0)
+        
+    except Exception as e:
+        print(f"❌ Load test failed: {e}")
+        return False
+
+def test_concurrency_sweep():
+    """Test concurrency recommendation, the tuned profile and per-model scheduler concurrency"""
+    print("\n🎛️ Testing Concurrency Sweep...")
+    
+    try:
+        import tempfile
+        import threading
+        from pathlib import Path
+        from src.concurrency_sweep import ConcurrencySweep, load_tuned_concurrency, recommend, write_profile
+        from src.task_scheduler import ModelAffinityScheduler
+        
+        # A model with two request slots: throughput stops growing at 2, latency keeps growing
+        slots = threading.Semaphore(2)
+        
+        def run_task(model, temperature, scenario):
+            start = time.perf_counter()
+            with slots:
+                time.sleep(0.02)
+            return {'status': 'success', 'response_time': time.perf_counter() - start,
+                    'generation_metrics': {'eval_count': 100}}
+        
+        report = ConcurrencySweep(run_task).run(["qwen2.5:14b"], [1, 2, 4, 8], 16)
+        chosen = report["qwen2.5:14b"]['recommended']
+        print(f"✅ Recommended concurrency {chosen['concurrency']} "
+              f"({chosen['tasks_per_minute']:.0f} tasks/min, p95 {chosen['p95_latency']:.3f}s)")
+        
+        failing = recommend([{'concurrency': 1, 'errors': 2, 'p95_latency': 1.0, 'tasks_per_minute': 10.0}])
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_profile(report, Path(tmp) / "tuned_profile.json")
+            tuned = load_tuned_concurrency(path)
+            missing = load_tuned_concurrency(Path(tmp) / "absent.json")
+        print(f"✅ Tuned profile: {tuned}")
+        
+        scheduler = ModelAffinityScheduler(max_concurrency=3, model_concurrency=tuned)
+        return (chosen['concurrency'] == 2 and failing is None and tuned == {"qwen2.5:14b": 2} and
+                missing == {} and scheduler.concurrency_for("qwen2.5:14b") == 2 and
+                scheduler.concurrency_for("llama3.1:8b") == 3)
+        
+    except Exception as e:
+        print(f"❌ Concurrency sweep test failed: {e}")
+        return False
+
+def test_task_scheduler():
+    """Test model-affinity ordering, unloads between models and resident-model tracking"""
+    print("\n🗂️ Testing Model-Affinity Scheduler...")
+
+    try:
+        import threading
+        from src.task_scheduler import ModelAffinityScheduler
+        from src.memory_admission import MemoryAdmissionController
+
+        # Interleaved matrix: each model's queue must drain before the next model starts
+        tasks = [(model, temperature, {'category': 'PDA Memo'})
+                 for temperature in (0.3, 0.7) for model in ("qwen2.5:14b", "gpt-oss:20b-q6", "llama3.1:8b")]
+        groups = ModelAffinityScheduler.group_by_model(tasks)
+        print(f"✅ Model order: {list(groups)}")
+
+        unloaded = []
+        admission = MemoryAdmissionController(sample=lambda: {'total_gb': 64.0, 'available_gb': 48.0,
+                                                              'used_percent': 25.0, 'swap_used_gb': 0.0,
+                                                              'swap_out': 0.0},
+                                              reserve_gb=1.5, max_swap_out_mb_s=4, context_tokens=4096)
+        resident_at_unload = []
+
+        def unload(model):
+            resident_at_unload.append(set(admission.resident))
+            unloaded.append(model)
+
+        # qwen + gpt-oss exceed the 20GB budget, gpt-oss + llama fit together
+        scheduler = ModelAffinityScheduler(max_concurrency=2, memory_budget_gb=20.0, unload_model=unload,
+                                           footprints_gb={"qwen2.5:14b": 9.0, "gpt-oss:20b-q6": 13.0,
+                                                          "llama3.1:8b": 5.0},
+                                           admission=admission)
+        started, lock = [], threading.Lock()
+
+        def run_task(model, temperature, scenario):
+            with lock:
+                started.append(model)
+            time.sleep(0.01)
+            return {'model': model, 'status': 'success', 'cache_hit': False, 'response_time': 1.0,
+                    'generation_metrics': {'load_duration': 0.25, 'total_duration': 1.0}}
+
+        results = scheduler.run(tasks, run_task)
+        phases = [model for i, model in enumerate(started) if i == 0 or started[i - 1] != model]
+        report = scheduler.timing_report(results)
+        print(f"✅ Phases: {phases}, unloads: {unloaded}, resident after run: {sorted(admission.resident)}")
+        print(f"✅ qwen2.5:14b timing: {report['qwen2.5:14b']['load_time']:.2f}s load, "
+              f"{report['qwen2.5:14b']['generation_time']:.2f}s generation over {report['qwen2.5:14b']['tasks']} tasks")
+
+        return (list(groups) == ["qwen2.5:14b", "gpt-oss:20b-q6", "llama3.1:8b"] and
+                all(len(group) == 2 for group in groups.values()) and
+                phases == list(groups) and len(results) == 6 and
+                unloaded == ["qwen2.5:14b"] and resident_at_unload == [{"qwen2.5:14b"}] and
+                admission.resident == {"gpt-oss:20b-q6", "llama3.1:8b"} and
+                set(scheduler.phase_times) == set(groups) and
+                report['qwen2.5:14b']['tasks'] == 2 and report['qwen2.5:14b']['load_time'] == 0.5 and
+                report['qwen2.5:14b']['generation_time'] == 1.5)
+
+    except Exception as e:
+        print(f"❌ Model-affinity scheduler test failed: {e}")
+        return False
+
+def test_adaptive_concurrency():
+    """Test AIMD in-flight limits: growth while healthy, cuts on latency spikes and timeouts"""
+    print("\n🎚️ Testing Adaptive Concurrency...")
+    
+    try:
+        from src.adaptive_concurrency import AdaptiveConcurrencyLimiter, latency_signal
+        
+        limiter = AdaptiveConcurrencyLimiter(2, min_limit=1, max_limit=8, latency_tolerance=2.0,
+                                             backoff=0.5, max_error_rate=0.05, min_window=4)
+        for _ in range(12):
+            limiter.record(0.5)
+        grown = limiter.limit
+        for _ in range(grown):
+            limiter.record(2.0)
+        spiked = limiter.limit
+        
+        # A timeout cuts at once, but only once for the requests already in flight
+        limiter.record(None, error=True, timeout=True)
+        limiter.record(None, error=True, timeout=True)
+        after_timeouts = limiter.limit
+        stats = limiter.stats()
+        print(f"✅ Limit 2 -> {grown} while healthy, {spiked} after a latency spike, "
+              f"{after_timeouts} after timeouts ({stats['decreases']} decreases)")
+        
+        signal = latency_signal({'response_time': 30.0, 'generation_metrics': {'ttft': 5.0, 'load_duration': 4.5}})
+        fallback = latency_signal({'response_time': 30.0, 'generation_metrics': {}})
+        
+        return (grown == 5 and spiked == 2 and after_timeouts == 1 and stats['max_limit_reached'] == 5 and
+                stats['baseline_latency'] == 0.5 and signal == 0.5 and fallback == 30.0)
+        
+    except Exception as e:
+        print(f"❌ Adaptive concurrency test failed: {e}")
+        return False
+
+def test_memory_admission():
+    """Test footprint estimates from /api/show and deferral of dispatch under memory pressure"""
+    print("\n🧠 Testing Memory Admission...")
+    
+    try:
+        from src.memory_admission import MemoryAdmissionController, estimate_footprint
+        
+        show = {'details': {'quantization_level': 'Q4_K_M'},
+                'model_info': {'general.architecture': 'llama', 'general.parameter_count': 8030000000,
+                               'llama.block_count': 32, 'llama.attention.head_count': 32,
+                               'llama.attention.head_count_kv': 8, 'llama.embedding_length': 4096}}
+        footprint = estimate_footprint(show, 4096)
+        print(f"✅ llama3.1:8b: {footprint['weights_gb']:.2f}GB weights, "
+              f"{footprint['kv_per_request_gb']:.2f}GB KV per request")
+        
+        # 8GB free: the unloaded model (~5.5GB with one request) fits, and its weights stay committed
+        # until a task finishes; after that each request needs only its KV cache
+        memory = {'total_gb': 24.0, 'available_gb': 8.0, 'used_percent': 66.0, 'swap_used_gb': 0.0, 'swap_out': 0.0}
+        controller = MemoryAdmissionController(get_model_info=lambda model: show, sample=lambda: dict(memory),
+                                               reserve_gb=1.5, max_swap_out_mb_s=4, context_tokens=4096,
+                                               max_wait=0.05)
+        first = controller.admit("llama3.1:8b", 0)
+        while_loading = controller.admit("llama3.1:8b", 1)
+        memory['available_gb'] = 3.0
+        # A cache hit does not load the model, so its weights stay committed until a generation finishes
+        controller.completed("llama3.1:8b", {'status': 'success', 'cache_hit': True})
+        still_loading = "llama3.1:8b" in controller.loading
+        controller.completed("llama3.1:8b", {'status': 'success', 'cache_hit': False})
+        loaded = controller.admit("llama3.1:8b", 1)
+        memory['available_gb'] = 1.8
+        short = controller.admit("llama3.1:8b", 1)
+        waited = controller.admit("llama3.1:8b", 0)
+        time.sleep(0.06)
+        forced = controller.admit("llama3.1:8b", 0)
+        # A cache hit leaves nothing in flight; the wait is not repeated for the same model until it is evicted
+        controller.completed("llama3.1:8b", {'status': 'success', 'cache_hit': True})
+        again = controller.admit("llama3.1:8b", 0)
+        controller.completed("llama3.1:8b", {'status': 'success', 'cache_hit': True})
+        controller.evicted("llama3.1:8b")
+        after_eviction = controller.admit("llama3.1:8b", 0)
+        stats = controller.stats()
+        print(f"✅ Admissions: first={first}, while loading={while_loading}, loaded={loaded}, "
+              f"short={short}, forced after wait={forced}, again without waiting={again}, "
+              f"after eviction={after_eviction} ({stats['deferrals']} deferrals)")
+        
+        # A failed request leaves the model neither loading nor resident
+        failed = MemoryAdmissionController(get_model_info=lambda model: show, sample=lambda: dict(memory),
+                                           reserve_gb=1.5, max_swap_out_mb_s=4, context_tokens=4096)
+        failed.admit("llama3.1:8b", 0)
+        failed.completed("llama3.1:8b", {'status': 'error', 'error': 'Connection refused'})
+        not_resident = not failed.loading and not failed.resident
+        print(f"✅ Residency: cache hit kept loading={still_loading}, error left unloaded={not_resident}")
+        
+        return (abs(footprint['kv_per_request_gb'] - 0.5) < 1e-9 and 4.5 < footprint['weights_gb'] < 5.5 and
+                first and while_loading and still_loading and not_resident and
+                controller.loading == set() and loaded and not short and
+                not waited and forced and again and not after_eviction and
+                stats['forced_admissions'] == 1 and stats['admitted'] == 5 and
+                stats['deferrals'] == 2 and stats['min_available_gb'] == 1.8)
+        
+    except Exception as e:
+        print(f"❌ Memory admission test failed: {e}")
+        return False
+
+def test_resource_sampler():
+    """Test the background resource sampler and aligning its timeline to task windows"""
+    print("\n🖥️ Testing Resource Sampler...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        from pathlib import Path
+        from src.resource_sampler import ResourceSampler, ResourceTimeline, outlier_report
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "resources.jsonl"
+            with ResourceSampler(path, interval=0.05) as sampler:
+                time.sleep(0.3)
+            live = ResourceTimeline.load(path, interval=0.05)
+        print(f"✅ Sampled {sampler.count} times: peak {live.peak()}")
+        
+        # Memory pressure between t=10 and t=20, one sample per second
+        samples = [{'t': float(t), 'cpu_percent': 50.0, 'ollama_rss_gb': 9.0,
+                    'available_gb': 0.5 if 10 <= t <= 20 else 6.0, 'swap_used_gb': 2.0 if 10 <= t <= 20 else 0.0,
+                    'swap_out_mb_s': 40.0 if 10 <= t <= 20 else 0.0} for t in range(30)]
+        timeline = ResourceTimeline(samples, interval=1.0)
+        slow = timeline.annotate({'task_window': {'start': 11.5, 'end': 18.2}})['resources']
+        short = timeline.annotate({'task_window': {'start': 3.2, 'end': 3.4}})['resources']
+        reused = timeline.annotate({'response_time': 1.0})
+        print(f"✅ Slow task window: {slow['available_gb_min']}GB available, {slow['swap_out_mb_s_max']}MB/s swap-out")
+        
+        times = np.array([1.0] * 19 + [9.0])
+        available = np.array([6.0] * 19 + [0.5])
+        report = outlier_report(times, np.array(["qwen2.5:14b"] * 20, dtype=object), {'available_gb_min': available})
+        entry = report["qwen2.5:14b"]
+        print(f"✅ Outliers: {entry['outliers']} above p95 with {entry['outlier_mean']['available_gb_min']}GB available "
+              f"(typical {entry['typical_mean']['available_gb_min']}GB, r={entry['correlation']['available_gb_min']:.2f})")
+        
+        return (sampler.count >= 3 and len(live) == sampler.count and live.peak()['available_gb_min'] > 0 and
+                slow['available_gb_min'] == 0.5 and slow['swap_out_mb_s_max'] == 40.0 and
+                short['available_gb_min'] == 6.0 and 'resources' not in reused and entry['outliers'] == 1 and
+                entry['outlier_mean']['available_gb_min'] == 0.5 and entry['correlation']['available_gb_min'] < -0.9)
+        
+    except Exception as e:
+        print(f"❌ Resource sampler test failed: {e}")
+        return False
+
 def test_benchmark_enhancements():
     """Test benchmark enhancements integration"""
     print("\n🚀 Testing Benchmark Enhancements...")
@@ -216,6 +1172,42 @@ def test_benchmark_enhancements():
         print(f"❌ Benchmark enhancements test failed: {e}")
         return False
 
+def test_async_client():
+    """Test async Ollama client payloads and host balancing (no network)"""
+    print("\n🌐 Testing Async Ollama Client...")
+    
+    try:
+        import asyncio
+        from src.async_ollama_client import AsyncOllamaClient
+        
+        client = AsyncOllamaClient(hosts=["http://host-a:11434", "http://host-b:11434/"], seed=42)
+        
+        # Payload matches the sync client options
+        payload = client.build_payload("qwen2.5:14b", "Question", "System", temperature=0.5)
+        print(f"✅ Payload messages: {[m['role'] for m in payload['messages']]}")
+        print(f"✅ Payload options: {payload['options']}")
+        
+        # Host selection spreads in-flight requests
+        first = client._acquire_host()
+        second = client._acquire_host()
+        print(f"✅ Hosts balanced: {first != second}")
+        client._release_host(first)
+        client._release_host(second)
+        
+        # The timeout bounds idle reads, not a whole streamed generation
+        async def session_timeout():
+            async with AsyncOllamaClient(hosts=["http://host-a:11434"], timeout=120) as pooled:
+                return pooled._session.timeout
+        timeout = asyncio.run(session_timeout())
+        idle_only = timeout.total is None and timeout.sock_read == 120
+        print(f"✅ Idle read timeout only: {idle_only}")
+        
+        return payload['options']['seed'] == 42 and first != second and idle_only
+        
+    except Exception as e:
+        print(f"❌ Async client test failed: {e}")
+        return False
+
 def simulate_sample_run():
     """Simulate a sample benchmark run"""
     print("\n🎯 Simulating Sample Benchmark Run...")
@@ -308,9 +1300,32 @@ def main():
     tests = [
         ("Configuration", test_config),
         ("Prompt Templates", test_prompts),
+        ("Context Truncation", test_context_truncation),
+        ("Token Counter", test_token_counter),
         ("Response Processor", test_response_processor),
+        ("Streaming Response Processor", test_streaming_processor),
+        ("Planning Stream Guard", test_planning_guard),
+        ("Stream Metrics", test_stream_metrics),
         ("Enhanced Evaluator", test_evaluator),
+        ("Batch Evaluator", test_batch_evaluator),
+        ("Weight Sweep", test_weight_sweep),
+        ("Offline Re-scoring", test_rescore),
+        ("Results Store", test_results_store),
+        ("Benchmark Database", test_benchmark_database),
+        ("Context Retrieval Stage", test_context_stage),
+        ("Response Cache", test_response_cache),
+        ("Run Journal", test_run_journal),
+        ("Task Fingerprints", test_task_fingerprint),
+        ("Stage Tracer", test_tracer),
+        ("Latency Histograms", test_latency_histogram),
+        ("Open-Loop Load Test", test_load_test),
+        ("Concurrency Sweep", test_concurrency_sweep),
+        ("Model-Affinity Scheduler", test_task_scheduler),
+        ("Adaptive Concurrency", test_adaptive_concurrency),
+        ("Memory Admission", test_memory_admission),
+        ("Resource Sampler", test_resource_sampler),
         ("Benchmark Enhancements", test_benchmark_enhancements),
+        ("Async Ollama Client", test_async_client),
         ("Sample Run Simulation", simulate_sample_run)
     ]
     